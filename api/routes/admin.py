@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional
@@ -7,7 +8,13 @@ from api.database import get_db
 from app.models.demande import DemandeCompte
 
 from app.models.user import User
-from api.routes.auth import get_password_hash, get_current_user
+from api.routes.auth import get_current_user
+from api.services.compteurs import Compteurs
+from api.services.recherche import Recherche
+from api.services.dossiers_manquants import DossiersManquants
+from api.services.cache_mesures import cache_dernieres_mesures
+from api.services.principal import cache_principaux
+from api.services.mots_de_passe import MotsDePasse
 
 # Schemas
 from api.schemas.admin import (
@@ -42,32 +49,88 @@ def get_admin_stats(
 ):
     require_admin(current_user)
 
-    # Comptage des utilisateurs
-    total_users = db.query(User).count()
-
-    # Comptage des patients, consultations et rendez-vous
-    from app.models.patient import Patient
-    from app.models.consultation import Consultation
-    from app.models.rendezvous import RendezVous
-
-    total_patients = db.query(Patient).count()
-    total_consultations = db.query(Consultation).count()
-    total_rendezvous = db.query(RendezVous).count()
-
-    # Comptage des demandes de comptes
-    demandes_en_attente = (
-        db.query(DemandeCompte).filter(DemandeCompte.statut == "en_attente").count()
+    # Compteurs matérialisés (utilisateurs, patients, consultations, rendez-vous, demandes)
+    compteurs = Compteurs.lire(
+        db,
+        "users_total",
+        "patients_total",
+        "consultations_total",
+        "rendezvous_total",
+        "demandes_en_attente",
     )
 
     return AdminStats(
-        total_users=total_users,
-        total_patients=total_patients,
-        total_consultations=total_consultations,
-        total_rendezvous=total_rendezvous,
-        demandes_en_attente=demandes_en_attente,
+        total_users=int(compteurs["users_total"]),
+        total_patients=int(compteurs["patients_total"]),
+        total_consultations=int(compteurs["consultations_total"]),
+        total_rendezvous=int(compteurs["rendezvous_total"]),
+        demandes_en_attente=int(compteurs["demandes_en_attente"]),
     )
 
 
+# =============================
+# 🔁 Réconciliation des compteurs
+# =============================
+@router.post("/stats/reconcilier")
+def reconcilier_compteurs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    require_admin(current_user)
+    derives = Compteurs.reconcilier(db)
+    return {
+        "corriges": len(derives),
+        "ecarts": {cle: {"avant": avant, "apres": apres} for cle, (avant, apres) in derives.items()},
+    }
+
+
+# =============================
+# 🔎 Index de recherche plein texte
+# =============================
+@router.post("/recherche/reconstruire")
+def reconstruire_recherche(
+    current_user: User = Depends(get_current_user),
+):
+    require_admin(current_user)
+    return {"entrees": Recherche.reconstruire()}
+
+
+# =============================
+# 🗂️ Dossiers médicaux manquants
+# =============================
+@router.post("/dossiers/completer")
+def completer_dossiers(
+    current_user: User = Depends(get_current_user),
+):
+    require_admin(current_user)
+    return {"crees": DossiersManquants.completer()}
+
+
+# =============================
+# ⚡ Caches (dernières mesures, principaux)
+# =============================
+@router.get("/stats/cache")
+def statistiques_cache(
+    current_user: User = Depends(get_current_user),
+):
+    require_admin(current_user)
+    return {
+        "dernieres_mesures": cache_dernieres_mesures.statistiques(),
+        "principaux": cache_principaux.statistiques(),
+    }
+
+
+# =============================
+# 🔑 Pool de hachage des mots de passe
+# =============================
+@router.get("/stats/hachage")
+def statistiques_hachage(
+    current_user: User = Depends(get_current_user),
+):
+    require_admin(current_user)
+    return MotsDePasse.statistiques()
+
+
 # =============================
 # 📥 Liste des demandes de comptes
 # =============================
@@ -84,44 +147,52 @@ def list_demandes(
 # ✅ Valider une demande de compte
 # =============================
 @router.post("/valider/{demande_id}", response_model=DemandeValidationResponse)
-def valider_demande(
+async def valider_demande(
     demande_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     require_admin(current_user)
 
-    demande = db.query(DemandeCompte).filter(DemandeCompte.id == demande_id).first()
-    if not demande:
-        raise HTTPException(status_code=404, detail="Demande introuvable")
-
-    if demande.statut != "en_attente":
-        raise HTTPException(status_code=400, detail="Cette demande a déjà été traitée")
+    def charger_demande() -> DemandeCompte:
+        demande = db.query(DemandeCompte).filter(DemandeCompte.id == demande_id).first()
+        if not demande:
+            raise HTTPException(status_code=404, detail="Demande introuvable")
+
+        if demande.statut != "en_attente":
+            raise HTTPException(status_code=400, detail="Cette demande a déjà été traitée")
+        return demande
+
+    demande = await run_in_threadpool(charger_demande)
+    hashed_password = await MotsDePasse.hacher("changeme123")  # ✅ mot de passe temporaire
+
+    def enregistrer() -> DemandeValidationResponse:
+        # Créer l'utilisateur associé
+        new_user = User(
+            nom=demande.nom,
+            prenom=demande.prenom,
+            email=demande.email,
+            role=demande.role_demande,
+            hashed_password=hashed_password,
+            specialite=demande.specialite,
+            is_verified=True,
+        )
 
-    # Créer l'utilisateur associé
-    new_user = User(
-        nom=demande.nom,
-        prenom=demande.prenom,
-        email=demande.email,
-        role=demande.role_demande,
-        hashed_password=get_password_hash("changeme123"),  # ✅ mot de passe temporaire
-        specialite=demande.specialite,
-        is_verified=True,
-    )
+        db.add(new_user)
 
-    db.add(new_user)
+        # Mettre à jour la demande
+        demande.statut = "valide"
+        demande.date_validation = datetime.utcnow()
+        demande.valide_par_id = current_user.id
+        db.commit()
+        db.refresh(new_user)
 
-    # Mettre à jour la demande
-    demande.statut = "valide"
-    demande.date_validation = datetime.utcnow()
-    demande.valide_par_id = current_user.id
-    db.commit()
-    db.refresh(new_user)
+        return DemandeValidationResponse(
+            message="✅ Demande validée et compte utilisateur créé",
+            user=UserCreated.from_orm(new_user),
+        )
 
-    return DemandeValidationResponse(
-        message="✅ Demande validée et compte utilisateur créé",
-        user=UserCreated.from_orm(new_user),
-    )
+    return await run_in_threadpool(enregistrer)
 
 
 # =============================
@@ -161,7 +232,7 @@ def refuser_demande(
 # 🛡️ Créer un administrateur directement
 # =============================
 @router.post("/creer", response_model=UserCreated)
-def creer_admin(
+async def creer_admin(
     data: AdminCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -169,30 +240,35 @@ def creer_admin(
     require_admin(current_user)
 
     # Vérifie si l'email existe déjà
-    existing = db.query(User).filter(User.email == data.email).first()
-    if existing:
+    def email_pris() -> bool:
+        return db.query(User.id).filter(User.email == data.email).first() is not None
+
+    if await run_in_threadpool(email_pris):
         raise HTTPException(
             status_code=400, detail="Un utilisateur avec cet email existe déjà"
         )
 
-    
-    new_admin = User(
-    nom=data.nom,
-    prenom=data.prenom,
-    email=data.email,
-    hashed_password=get_password_hash(data.mot_de_passe),
-    role="admin",
-    specialite=data.specialite,
-    is_active=True,
-    is_verified=True,
-)
+    hashed_password = await MotsDePasse.hacher(data.mot_de_passe)
+
+    def enregistrer() -> UserCreated:
+        new_admin = User(
+            nom=data.nom,
+            prenom=data.prenom,
+            email=data.email,
+            hashed_password=hashed_password,
+            role="admin",
+            specialite=data.specialite,
+            is_active=True,
+            is_verified=True,
+        )
 
-    
-    db.add(new_admin)
-    db.commit()
-    db.refresh(new_admin)
+        db.add(new_admin)
+        db.commit()
+        db.refresh(new_admin)
+
+        return UserCreated.from_orm(new_admin)
 
-    return UserCreated.from_orm(new_admin)
+    return await run_in_threadpool(enregistrer)
 
 
 # =============================
@@ -1,12 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from fastapi.responses import FileResponse
-import random, os
+import random
 from dotenv import load_dotenv
-from openai import OpenAI
+from api.services.client_openai import client_openai
 
 # ============================================================
 # 🧩 IMPORTS INTERNES
@@ -17,16 +14,15 @@ from app.models.patient import Patient
 from app.models.user import User
 from app.models.analyse_ia import AnalyseIA
 from api.schemas.cross_analysis import CrossAnalysisResult
+from api.services.monitoring import monitoring_hopital
 
 # ============================================================
 # ⚙️ CONFIGURATION
 # ============================================================
 router = APIRouter(prefix="/aetheris", tags=["Aetheris IA — Cerveau Médical Intelligent"])
-PDF_DIR = "exports/pdf"
-os.makedirs(PDF_DIR, exist_ok=True)
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = client_openai  # openai importé au premier appel
 
 # ============================================================
 # ⚙️ UTILITAIRE : ÉVALUER LA GRAVITÉ CLINIQUE
@@ -175,32 +171,22 @@ def realtime_analysis(patient_id: int, db: Session = Depends(get_db), user: User
 # ============================================================
 @router.get("/monitoring")
 def monitoring_realtime_global(
-    db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
     """
-    Retourne une vue d'ensemble en temps réel des constantes vitales moyennes 
-    et du niveau d'alerte global sur l'hôpital.
+    Retourne une vue d'ensemble des constantes vitales moyennes (dernière
+    mesure de chaque patient) et du niveau d'alerte global sur l'hôpital.
+    Instantané SQL servi depuis la mémoire, rafraîchi périodiquement.
     """
-    patients = db.query(Patient).all()
-    if not patients:
+    snapshot = monitoring_hopital.lire()
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Aucun patient trouvé")
 
-    spo2_moy = sum([p.spo2 or random.uniform(94, 98) for p in patients]) / len(patients)
-    hr_moy = sum([p.rythme_cardiaque or random.randint(60, 100) for p in patients]) / len(patients)
-    temp_moy = sum([getattr(p, "temperature", 37.0) for p in patients]) / len(patients)
-
-    anomalies = random.randint(0, 3)
-    alertes = random.choice(["Aucune", "1 alerte", "2 alertes"])
-
     return {
-        "patients_surveillés": len(patients),
-        "SpO₂ moyenne (%)": round(spo2_moy, 1),
-        "Fréquence cardiaque moyenne (bpm)": round(hr_moy, 1),
-        "Température moyenne (°C)": round(temp_moy, 1),
-        "Anomalies détectées": anomalies,
-        "Alertes critiques actives": alertes,
-        "Dernière mise à jour": datetime.utcnow().strftime("%H:%M:%S"),
+        **snapshot,
+        "Dernière mise à jour": monitoring_hopital.genere_le.strftime("%H:%M:%S"),
+        "genere_le": monitoring_hopital.genere_le,
+        "fraicheur_secondes": round(monitoring_hopital.age(), 1),
     }
 # ============================================================
 # 🔮 6️⃣ ANALYSE PRÉDICTIVE (pour AetherisPredictive.tsx)
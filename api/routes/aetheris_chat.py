@@ -8,8 +8,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from langdetect import detect
 from dotenv import load_dotenv
-from openai import OpenAI
-import os
+from api.services.client_openai import client_openai
 
 from api.database import get_db
 from api.routes.auth import get_current_user
@@ -25,7 +24,7 @@ router = APIRouter(
 
 # Charger la clé OpenAI
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = client_openai  # openai importé au premier appel
 
 # ============================================================
 # 🧩 Modèle Pydantic pour la requête chat
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import desc
 from typing import List, Optional
 from datetime import datetime
 
@@ -9,6 +9,7 @@ from api.routes.auth import get_current_user
 from app.models.ambulance import Ambulance
 from api.schemas.ambulance import AmbulanceCreate, AmbulanceUpdate, AmbulanceOut
 from app.models.user import User
+from api.services.compteurs import Compteurs
 
 router = APIRouter(prefix="/ambulances", tags=["🚑 Gestion Ambulances"])
 
@@ -227,10 +228,17 @@ def analyse_parc_ambulances(
     user: User = Depends(get_current_user),
 ):
     check_permissions(user)
-    total = db.query(func.count(Ambulance.id)).scalar()
-    dispo = db.query(func.count(Ambulance.id)).filter(Ambulance.etat == "Disponible").scalar()
-    mission = db.query(func.count(Ambulance.id)).filter(Ambulance.etat == "En mission").scalar()
-    maintenance = db.query(func.count(Ambulance.id)).filter(Ambulance.etat == "Maintenance").scalar()
+    compteurs = Compteurs.lire(
+        db,
+        "ambulances_total",
+        "ambulances_etat:Disponible",
+        "ambulances_etat:En mission",
+        "ambulances_etat:Maintenance",
+    )
+    total = int(compteurs["ambulances_total"])
+    dispo = int(compteurs["ambulances_etat:Disponible"])
+    mission = int(compteurs["ambulances_etat:En mission"])
+    maintenance = int(compteurs["ambulances_etat:Maintenance"])
 
     taux_dispo = round((dispo / total) * 100, 2) if total > 0 else 0
 
@@ -1,12 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
 from typing import List
-import os
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 
 from api.database import get_db
 from app.models.analyse_ia import AnalyseIA
@@ -14,20 +10,18 @@ from app.models.patient import Patient
 from app.models.user import User
 from api.schemas.analyse_ia import AnalyseIACreate, AnalyseIARead, AnalyseIAUpdate
 from api.routes.auth import get_current_user
+from api.services.monitoring import risques_globaux
 
 router = APIRouter(prefix="/analyse-ia", tags=["Analyse IA"])
 
-PDF_DIR = "exports/pdf"
-os.makedirs(PDF_DIR, exist_ok=True)
-
 # ============================================================
 # 🧠 8. ROUTE HYBRIDE — ANALYSE EXISTANTE OU GÉNÉRATION AUTOMATIQUE
 # ============================================================
 from dotenv import load_dotenv
-from openai import OpenAI
+from api.services.client_openai import client_openai
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = client_openai  # openai importé au premier appel
 
 def evaluer_gravite(spo2: float | None, hr: int | None, temp: float | None):
     score, niveau, triage = 0, "vert", "Patient stable"
@@ -148,22 +142,17 @@ def creer_analyse(
 # ============================================================
 @router.get("/global/risks")
 def global_risks(
-    db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    analyses = db.query(AnalyseIA).all()
-    if not analyses:
+    # Répartition par score de gravité (agrégat SQL mis en cache)
+    snapshot = risques_globaux.lire()
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Aucune analyse trouvée")
 
-    nb_eleve = sum(1 for a in analyses if a.score >= 70)
-    nb_modere = sum(1 for a in analyses if 40 <= a.score < 70)
-    nb_faible = sum(1 for a in analyses if a.score < 40)
-
     return {
-        "total_analyses": len(analyses),
-        "risque_eleve": nb_eleve,
-        "risque_modere": nb_modere,
-        "risque_faible": nb_faible,
+        **snapshot,
+        "genere_le": risques_globaux.genere_le,
+        "fraicheur_secondes": round(risques_globaux.age(), 1),
     }
 
 
@@ -1,22 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 import os
 
 from api.database import get_db
 from app.models.user import User
 from api.schemas.user import UserCreate, UserOut, UserLogin
+from api.services.limiteur import limiteur_connexions
+from api.services.mots_de_passe import MotsDePasse, pwd_context
+from api.services.principal import Principal, cache_principaux, charger_principal, version_jeton
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 # =============================
 # CONFIG
 # =============================
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 SECRET_KEY = os.getenv("AUTH_SECRET_KEY", "supersecret")
 ALGORITHM = os.getenv("AUTH_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
@@ -26,6 +27,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 # =============================
 # HELPERS
 # =============================
+# Versions synchrones (démarrage, scripts) ; les routes passent par MotsDePasse
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -38,6 +40,9 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def jeton_utilisateur(user: User) -> str:
+    return create_access_token({"sub": str(user.id), "ver": version_jeton(user.role, user.is_active)})
+
 def decode_token(token: str) -> dict:
     try:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -54,17 +59,22 @@ def decode_token(token: str) -> dict:
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme),
-) -> User:
+) -> Principal:
+    """Principal de l'appelant, servi par le cache (aucune requête SQL en cas de succès)."""
     payload = decode_token(token)
     user_id: str | None = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalide (sub manquant)")
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if not user:
+    try:
+        uid = int(user_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalide (sub incorrect)")
+    principal = cache_principaux.obtenir(uid, str(payload.get("ver", "")), lambda: charger_principal(db, uid))
+    if not principal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Utilisateur introuvable")
-    if getattr(user, "is_active", True) is False:
+    if not principal.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Compte désactivé")
-    return user
+    return principal
 
 # =============================
 # ROUTES
@@ -72,60 +82,79 @@ def get_current_user(
 
 # 📝 Enregistrement
 @router.post("/register", response_model=UserOut)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    def email_pris() -> bool:
+        return db.query(User.id).filter(User.email == user.email).first() is not None
+
+    if await run_in_threadpool(email_pris):
         raise HTTPException(status_code=400, detail="Email déjà utilisé")
 
-    new_user = User(
-        nom=user.nom,
-        prenom=user.prenom,
-        email=user.email,
-        hashed_password=get_password_hash(user.password),
-        specialite=user.specialite,  # relation ou string → UserOut gère la conversion
-        role=getattr(user, "role", "medecin"),
-        is_active=True,
-        is_verified=True,
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return UserOut.from_orm(new_user)  # ✅ conversion propre
+    hashed_password = await MotsDePasse.hacher(user.password)
+
+    def enregistrer() -> UserOut:
+        new_user = User(
+            nom=user.nom,
+            prenom=user.prenom,
+            email=user.email,
+            hashed_password=hashed_password,
+            specialite=user.specialite,  # relation ou string → UserOut gère la conversion
+            role=getattr(user, "role", "medecin"),
+            is_active=True,
+            is_verified=True,
+        )
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+        return UserOut.from_orm(new_user)  # ✅ conversion propre
+
+    return await run_in_threadpool(enregistrer)
+
+async def _connecter(request: Request, db: Session, email: str, password: str) -> dict:
+    """Vérification bcrypt dans le pool dédié ; empreinte recalculée si le coût configuré a changé."""
+    # Échecs comptés par (IP, email) dans l'état partagé : la limite vaut pour tous les workers,
+    # sans permettre à un tiers de bloquer le compte d'un autre
+    ip = request.client.host if request.client else "inconnue"
+    identifiant = f"{ip}|{email.strip().lower()}"
+    await run_in_threadpool(limiteur_connexions.verifier, identifiant)
+
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.email == email).first())
+    valide, nouvelle_empreinte = await MotsDePasse.verifier(password, user.hashed_password if user else None)
+    if not user or not valide:
+        await run_in_threadpool(limiteur_connexions.compter, identifiant)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Identifiants invalides")
+
+    def reponse() -> dict:
+        limiteur_connexions.reinitialiser(identifiant)
+        if nouvelle_empreinte:
+            user.hashed_password = nouvelle_empreinte
+            db.commit()
+        return {
+            "access_token": jeton_utilisateur(user),
+            "token_type": "bearer",
+            "user": UserOut.from_orm(user),  # ✅ conversion via schema
+        }
+
+    return await run_in_threadpool(reponse)
 
 # 🔑 Connexion avec formulaire OAuth2 (Swagger UI)
 @router.post("/login")
-def login_form(
+async def login_form(
+    request: Request,
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
-    email = form_data.username
-    password = form_data.password
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Identifiants invalides")
-
-    token = create_access_token({"sub": str(user.id)})
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "user": UserOut.from_orm(user),  # ✅ conversion via schema
-    }
+    return await _connecter(request, db, form_data.username, form_data.password)
 
 # 🔑 Connexion JSON (React frontend)
 @router.post("/login-json")
-def login_json(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.hashed_password):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Identifiants invalides")
-
-    token = create_access_token({"sub": str(user.id)})
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "user": UserOut.from_orm(user),  # ✅ conversion via schema
-    }
+async def login_json(request: Request, credentials: UserLogin, db: Session = Depends(get_db)):
+    return await _connecter(request, db, credentials.email, credentials.password)
 
 # 👤 Récupérer utilisateur connecté
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)) -> UserOut:
-    return UserOut.from_orm(current_user)  # ✅ conversion via schema
+def me(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)) -> UserOut:
+    # Profil complet : seule route qui a besoin de l'objet User
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Utilisateur introuvable")
+    return UserOut.from_orm(user)  # ✅ conversion via schema
@@ -8,6 +8,7 @@ from app.models.biologie import Biologie
 from app.models.patient import Patient
 from api.schemas.biologie import BiologieCreate, BiologieUpdate, BiologieOut
 from api.routes.auth import get_current_user
+from api.services.pagination import PageParams, paginate
 
 router = APIRouter(
     prefix="/biologie",
@@ -16,8 +17,8 @@ router = APIRouter(
 
 # 📌 Récupérer toutes les analyses
 @router.get("/", response_model=List[BiologieOut])
-def get_all_biologies(db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
-    return db.query(Biologie).all()
+def get_all_biologies(page: PageParams = Depends(), db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    return paginate(db.query(Biologie), page, Biologie.id, descending=False, schema=BiologieOut)
 
 # 📌 Récupérer une analyse par ID
 @router.get("/{biologie_id}", response_model=BiologieOut)
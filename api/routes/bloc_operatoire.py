@@ -5,6 +5,7 @@ from api.database import get_db
 from app.models.bloc_operatoire import BlocOperatoire
 from api.schemas import bloc_operatoire as schemas
 from typing import List
+from api.services.pagination import PageParams, paginate
 
 router = APIRouter(
     prefix="/bloc-operatoire",
@@ -20,8 +21,11 @@ def create_bloc(data: schemas.BlocOperatoireCreate, db: Session = Depends(get_db
     return bloc
 
 @router.get("/", response_model=List[schemas.BlocOperatoireRead])
-def list_blocs(db: Session = Depends(get_db)):
-    return db.query(BlocOperatoire).all()
+def list_blocs(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    return paginate(
+        db.query(BlocOperatoire), page, BlocOperatoire.id, descending=False,
+        schema=schemas.BlocOperatoireRead,
+    )
 
 @router.get("/{bloc_id}", response_model=schemas.BlocOperatoireRead)
 def get_bloc(bloc_id: int, db: Session = Depends(get_db)):
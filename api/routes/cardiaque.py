@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from api.database import get_db
@@ -10,6 +10,9 @@ from app.models.patient import Patient
 from app.models.user import User
 from api.schemas.cardiaque import CardiaqueCreate, CardiaqueRead, CardiaqueUpdate
 from api.routes.auth import get_current_user
+from api.services.downsampling import Downsampler
+from api.services.pagination import PageParams, paginate
+from api.services.cache_mesures import cache_dernieres_mesures
 
 
 router = APIRouter(
@@ -50,6 +53,7 @@ def creer_donnees_cardiaques(
         db.add(cardiaque)
         db.commit()
         db.refresh(cardiaque)
+        cache_dernieres_mesures.mettre("cardiaque", patient.id, cardiaque, CardiaqueRead)
 
         print(f"✅ Données cardiaques ajoutées pour patient ID {patient.id}")
         return cardiaque
@@ -68,35 +72,44 @@ def obtenir_derniere_cardiaque(
     user: User = Depends(get_current_user)
 ):
     """Renvoie la dernière mesure cardiaque pour un patient."""
-    get_patient_or_404(db, patient_id)
+    def charger():
+        get_patient_or_404(db, patient_id)
+
+        cardiaque = (
+            db.query(CardiaqueData)
+            .filter(CardiaqueData.patient_id == patient_id)
+            .order_by(desc(CardiaqueData.created_at))
+            .first()
+        )
 
-    cardiaque = (
-        db.query(CardiaqueData)
-        .filter(CardiaqueData.patient_id == patient_id)
-        .order_by(desc(CardiaqueData.created_at))
-        .first()
-    )
+        if not cardiaque:
+            raise HTTPException(status_code=404, detail="Aucune donnée cardiaque trouvée pour ce patient.")
+        return cardiaque
 
-    if not cardiaque:
-        raise HTTPException(status_code=404, detail="Aucune donnée cardiaque trouvée pour ce patient.")
-    return cardiaque
+    return cache_dernieres_mesures.obtenir("cardiaque", patient_id, charger, CardiaqueRead)
 
 
 # 📜 3️⃣ Historique complet des mesures cardiaques
 @router.get("/{patient_id}", response_model=List[CardiaqueRead])
 def historique_cardiaque(
     patient_id: int,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Nombre de points pour les graphiques (sous-échantillonnage)"),
+    mode: str = Query("lttb", pattern="^(lttb|minmax)$", description="Méthode : lttb ou minmax"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Renvoie tout l’historique cardiaque du patient."""
+    """Renvoie l’historique cardiaque du patient (paginé ou sous-échantillonné)."""
     get_patient_or_404(db, patient_id)
-    data = (
-        db.query(CardiaqueData)
-        .filter(CardiaqueData.patient_id == patient_id)
-        .order_by(desc(CardiaqueData.created_at))
-        .all()
-    )
+    if points:
+        data = Downsampler.historique(
+            db, CardiaqueData, patient_id, CardiaqueData.frequence_cardiaque, points=points, mode=mode
+        )
+    else:
+        data = paginate(
+            db.query(CardiaqueData).filter(CardiaqueData.patient_id == patient_id),
+            page, CardiaqueData.id, CardiaqueData.created_at, schema=CardiaqueRead,
+        )
 
     if not data:
         raise HTTPException(status_code=404, detail="Aucun historique cardiaque trouvé.")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, lazyload, load_only
 from typing import List
 
 from api.database import get_db
@@ -8,6 +8,7 @@ from api.schemas.consultation import ConsultationCreate, ConsultationRead, Consu
 from app.models.user import User
 from app.models.patient import Patient
 from api.routes.auth import get_current_user
+from api.services.budget_requetes import BudgetRoute
 
 router = APIRouter(prefix="/consultations", tags=["Consultations"])
 
@@ -19,7 +20,7 @@ def build_consultation_read(c: Consultation) -> ConsultationRead:
         patient_id=c.patient_id,
         medecin_id=c.medecin_id,
         motif=c.motif,
-        notes=c.notes,
+        notes=getattr(c, "notes", None),  # pas de colonne `notes` sur le modèle
         diagnostic=c.diagnostic,
         traitement=c.traitement,
         date_consultation=c.date_consultation,
@@ -29,6 +30,29 @@ def build_consultation_read(c: Consultation) -> ConsultationRead:
     )
 
 
+def requete_lecture(db: Session):
+    """
+    Forme de requête de ConsultationRead : les colonnes du schéma, le nom du
+    patient et du médecin en une seule requête (jointures + contains_eager),
+    sans la jointure aetheris_ia ni les relations chargées par défaut de User.
+    """
+    return (
+        db.query(Consultation)
+        .outerjoin(Consultation.patient)
+        .outerjoin(Consultation.medecin)
+        .options(
+            load_only(
+                Consultation.id, Consultation.patient_id, Consultation.medecin_id, Consultation.motif,
+                Consultation.diagnostic, Consultation.traitement,
+                Consultation.date_consultation,
+            ),
+            contains_eager(Consultation.patient).options(load_only(Patient.nom, Patient.prenom), lazyload("*")),
+            contains_eager(Consultation.medecin).options(load_only(User.nom), lazyload("*")),
+            lazyload("*"),
+        )
+    )
+
+
 # 📥 Créer une consultation
 @router.post("/", response_model=ConsultationRead)
 def create_consultation(
@@ -69,23 +93,23 @@ def create_consultation(
 
 
 # 📤 Liste des consultations
-@router.get("/", response_model=List[ConsultationRead])
+@router.get("/", response_model=List[ConsultationRead], dependencies=[Depends(BudgetRoute(2))])
 def list_consultations(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    consultations = db.query(Consultation).all()
+    consultations = requete_lecture(db).all()
     return [build_consultation_read(c) for c in consultations]
 
 
 # 📤 Consultation par ID
-@router.get("/{consultation_id}", response_model=ConsultationRead)
+@router.get("/{consultation_id}", response_model=ConsultationRead, dependencies=[Depends(BudgetRoute(2))])
 def get_consultation(
     consultation_id: int,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    c = db.query(Consultation).filter(Consultation.id == consultation_id).first()
+    c = requete_lecture(db).filter(Consultation.id == consultation_id).first()
     if not c:
         raise HTTPException(status_code=404, detail="Consultation non trouvée")
 
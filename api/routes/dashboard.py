@@ -6,8 +6,10 @@ from typing import List, Dict
 
 from api.database import get_db
 from api.routes.auth import get_current_user
-from app.models import Patient, Consultation, Medecin, Diagnostic, User
+from app.models import Patient, Consultation, Medecin, User
 from app.models.analyse_ia import AnalyseIA  # ✅ Pour synthèse IA
+from api.services.compteurs import Compteurs
+from api.services.dernieres_mesures import DernieresMesures
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -20,10 +22,13 @@ def stats_overview(
     user: User = Depends(get_current_user)
 ):
     try:
-        total_patients = db.query(func.count(Patient.id)).scalar()
-        total_medecins = db.query(func.count(Medecin.id)).scalar()
-        total_consultations = db.query(func.count(Consultation.id)).scalar()
-        total_alertes = db.query(func.count(Diagnostic.id)).scalar()
+        compteurs = Compteurs.lire(
+            db, "patients_total", "medecins_total", "consultations_total", "diagnostics_total"
+        )
+        total_patients = int(compteurs["patients_total"])
+        total_medecins = int(compteurs["medecins_total"])
+        total_consultations = int(compteurs["consultations_total"])
+        total_alertes = int(compteurs["diagnostics_total"])
 
         derniers_patients = db.query(Patient).order_by(Patient.id.desc()).limit(5).all()
         derniers_medecins = db.query(Medecin).order_by(Medecin.id.desc()).limit(5).all()
@@ -187,29 +192,31 @@ def consultations_per_month(
 # ======================================================
 # 🧠 FONCTIONS MÉDICALES GÉNÉRALES
 # ======================================================
+# Synthèses calculées sur l'index des dernières mesures (une ligne par
+# patient et par fonction), mises en cache quelques secondes.
 @router.get("/stats/cardiac")
-def cardiac_stats():
-    return {"frequence": 78, "rythme": "Régulier", "pression": "120/80", "alerte": None}
+def cardiac_stats(user: User = Depends(get_current_user)):
+    return DernieresMesures.synthese("cardiaque")
 
 @router.get("/stats/pulmonary")
-def pulmonary_stats():
-    return {"spo2": 96, "frequence_respiratoire": 18, "alerte": None}
+def pulmonary_stats(user: User = Depends(get_current_user)):
+    return DernieresMesures.synthese("pulmonaire")
 
 @router.get("/stats/renal")
-def renal_stats():
-    return {"creatinine": 1.1, "uree": 30, "debit_filtration": 90, "alerte": None}
+def renal_stats(user: User = Depends(get_current_user)):
+    return DernieresMesures.synthese("renale")
 
 @router.get("/stats/digestive")
-def digestive_stats():
-    return {"acidite": 3.5, "motricite": "Normale", "inflammation": False, "alerte": None}
+def digestive_stats(user: User = Depends(get_current_user)):
+    return DernieresMesures.synthese("digestive")
 
 @router.get("/stats/metabolic")
-def metabolic_stats():
-    return {"glucose": 95, "insuline": 12, "alerte": None}
+def metabolic_stats(user: User = Depends(get_current_user)):
+    return DernieresMesures.synthese("metabolique")
 
 @router.get("/stats/neurological")
-def neurological_stats():
-    return {"eeg": "Normal", "stress_level": "Modéré", "alerte": None}
+def neurological_stats(user: User = Depends(get_current_user)):
+    return DernieresMesures.synthese("neurologique")
 
 
 # ======================================================
@@ -234,12 +241,9 @@ def patients_critiques(db: Session = Depends(get_db)):
 # 👁 HUMAN DIAGRAM (synthèse vitale)
 # ======================================================
 @router.get("/human")
-def get_human_stats():
+def get_human_stats(user: User = Depends(get_current_user)):
+    syntheses = DernieresMesures.syntheses.lire()
     return {
-        "cardiaque": {"status": "normal", "valeur": "72 bpm"},
-        "pulmonaire": {"status": "alerte", "valeur": "SpO₂ 90%"},
-        "neurologique": {"status": "normal", "valeur": "EEG stable"},
-        "renale": {"status": "critique", "valeur": "Créatinine ↑"},
-        "digestive": {"status": "normal", "valeur": "Pas d’anomalie"},
-        "metabolique": {"status": "normal", "valeur": "Glucose 1.1 g/L"},
+        systeme: {"status": synthese["statut"], "valeur": synthese["valeur"]}
+        for systeme, synthese in syntheses.items()
     }
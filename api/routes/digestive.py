@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from api.database import get_db
@@ -10,6 +10,9 @@ from app.models.patient import Patient
 from api.schemas.digestive import DigestiveCreate, DigestiveRead, DigestiveUpdate
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.downsampling import Downsampler
+from api.services.pagination import PageParams, paginate
+from api.services.cache_mesures import cache_dernieres_mesures
 
 router = APIRouter(prefix="/digestive", tags=["Fonction Digestive"])
 
@@ -91,6 +94,7 @@ def creer_donnee_digestive(
         db.add(digestive)
         db.commit()
         db.refresh(digestive)
+        cache_dernieres_mesures.mettre("digestive", patient.id, digestive, DigestiveRead)
 
         print(f"✅ Donnée digestive créée pour patient ID {patient.id}")
         return digestive
@@ -109,35 +113,44 @@ def derniere_donnee_digestive(
     user: User = Depends(get_current_user)
 ):
     """Récupère la dernière donnée digestive enregistrée pour un patient."""
-    get_patient_or_404(db, patient_id)
+    def charger():
+        get_patient_or_404(db, patient_id)
+
+        data = (
+            db.query(DigestiveData)
+            .filter(DigestiveData.patient_id == patient_id)
+            .order_by(desc(DigestiveData.created_at))
+            .first()
+        )
 
-    data = (
-        db.query(DigestiveData)
-        .filter(DigestiveData.patient_id == patient_id)
-        .order_by(desc(DigestiveData.created_at))
-        .first()
-    )
+        if not data:
+            raise HTTPException(status_code=404, detail="Aucune donnée digestive trouvée.")
+        return data
 
-    if not data:
-        raise HTTPException(status_code=404, detail="Aucune donnée digestive trouvée.")
-    return data
+    return cache_dernieres_mesures.obtenir("digestive", patient_id, charger, DigestiveRead)
 
 
 # 📜 3️⃣ Historique complet du patient
 @router.get("/{patient_id}", response_model=List[DigestiveRead])
 def historique_digestif(
     patient_id: int,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Nombre de points pour les graphiques (sous-échantillonnage)"),
+    mode: str = Query("lttb", pattern="^(lttb|minmax)$", description="Méthode : lttb ou minmax"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Renvoie tout l’historique digestif du patient."""
+    """Renvoie l’historique digestif du patient (paginé ou sous-échantillonné)."""
     get_patient_or_404(db, patient_id)
-    historiques = (
-        db.query(DigestiveData)
-        .filter(DigestiveData.patient_id == patient_id)
-        .order_by(desc(DigestiveData.created_at))
-        .all()
-    )
+    if points:
+        historiques = Downsampler.historique(
+            db, DigestiveData, patient_id, DigestiveData.acidite, points=points, mode=mode
+        )
+    else:
+        historiques = paginate(
+            db.query(DigestiveData).filter(DigestiveData.patient_id == patient_id),
+            page, DigestiveData.id, DigestiveData.created_at, schema=DigestiveRead,
+        )
 
     if not historiques:
         raise HTTPException(status_code=404, detail="Aucun historique digestif trouvé.")
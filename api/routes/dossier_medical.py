@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 from typing import List
 
 from api.database import get_db
 from api.schemas import dossier_medical as schemas
 from api.routes.auth import get_current_user
 from app import models
+from api.services.budget_requetes import BudgetRoute
+from api.services.pagination import PageParams, paginate
 
 router = APIRouter(
     prefix="/dossiers",
@@ -31,35 +33,19 @@ def create_dossier(dossier: schemas.DossierMedicalCreate, db: Session = Depends(
     return db_dossier
 
 
-# 🟢 Lister tous les dossiers — crée automatiquement ceux manquants
-@router.get("/", response_model=List[schemas.DossierMedicalRead])
-def list_dossiers(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+# 🟢 Lister les dossiers (lecture seule, paginée par curseur)
+@router.get("/", response_model=List[schemas.DossierMedicalRead], dependencies=[Depends(BudgetRoute(2))])
+def list_dossiers(page: PageParams = Depends(), db: Session = Depends(get_db)):
     """
-    Retourne tous les dossiers médicaux.
-    Si un patient n’a pas encore de dossier, il est automatiquement créé.
+    Retourne une page de dossiers médicaux.
+    Les dossiers sont créés avec le patient (POST /patients) ; ceux des
+    patients importés hors API sont complétés par DossiersManquants
+    (amorçage, POST /admin/dossiers/completer).
     """
-    patients = db.query(models.Patient).all()
-    dossiers = db.query(models.DossierMedical).all()
-
-    # Indexation rapide des dossiers existants
-    dossier_map = {d.patient_id: d for d in dossiers}
-
-    for patient in patients:
-        if patient.id not in dossier_map:
-            new_dossier = models.DossierMedical(
-                patient_id=patient.id,
-                resume=f"Dossier automatique du patient {patient.prenom} {patient.nom}",
-                antecedents="Non renseigné",
-                traitements="Non renseigné",
-                allergies="Non renseigné",
-                notes="Créé automatiquement par le système Aetheris IA.",
-            )
-            db.add(new_dossier)
-            db.commit()
-            db.refresh(new_dossier)
-            dossier_map[patient.id] = new_dossier
-
-    return list(dossier_map.values())[skip: skip + limit]
+    return paginate(
+        db.query(models.DossierMedical).options(lazyload("*")), page, models.DossierMedical.id,
+        descending=False, schema=schemas.DossierMedicalRead,
+    )
 
 
 # 🟢 Récupérer un dossier par ID
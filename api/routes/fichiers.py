@@ -0,0 +1,54 @@
+import os
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from api.database import get_db
+from api.routes.auth import get_current_user, oauth2_scheme
+from api.services.reponse_fichier import FichierResponse
+from api.services.stockage import UPLOAD_DIR
+
+router = APIRouter(prefix="/fichiers", tags=["Fichiers"])
+
+RACINE = os.path.realpath(UPLOAD_DIR)
+
+# Blob adressé par contenu ("ab/ab….ext") : l'empreinte sert d'ETag fort
+_BLOB = re.compile(r"^([0-9a-f]{2})/(\1[0-9a-f]{62})(?:\.\w+)?$")
+# Dérivé d'un blob ("derives/ab/ab…_256.jpg")
+_DERIVE = re.compile(r"^derives/([0-9a-f]{2})/\1[0-9a-f]{62}_\d+\.jpg$")
+
+
+def resoudre(chemin: str) -> str:
+    """Chemin absolu d'un fichier de static/uploads (refuse toute sortie du répertoire)."""
+    absolu = os.path.realpath(os.path.join(RACINE, chemin))
+    if not absolu.startswith(RACINE + os.sep) or not os.path.isfile(absolu):
+        raise HTTPException(status_code=404, detail="Fichier introuvable")
+    return absolu
+
+
+async def acces_fichier(chemin: str, request: Request, db: Session = Depends(get_db)) -> None:
+    """
+    Blobs et dérivés servis sans authentification : leur chemin contient
+    l'empreinte SHA-256 du contenu, non devinable. Tout autre fichier
+    (anciens téléversements sous leur nom d'origine, radio_<uuid>.png…)
+    exige un jeton valide.
+    """
+    if _BLOB.match(chemin) or _DERIVE.match(chemin):
+        return
+    jeton = await oauth2_scheme(request)
+    await run_in_threadpool(get_current_user, db, jeton)
+
+
+# 📁 Fichiers téléversés et dérivés (vignettes, aperçus), avec plages HTTP
+@router.api_route("/{chemin:path}", methods=["GET", "HEAD"], dependencies=[Depends(acces_fichier)])
+def servir_fichier(chemin: str):
+    absolu = resoudre(chemin)
+    blob = _BLOB.match(chemin)
+    # Contenu jamais réécrit sous le même chemin : cache immuable côté navigateur
+    return FichierResponse(
+        absolu,
+        etag=f'"{blob.group(2)}"' if blob else None,
+        immuable=blob is not None or _DERIVE.match(chemin) is not None,
+    )
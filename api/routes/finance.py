@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func
 from datetime import datetime, timedelta
 from typing import Optional
 from api.database import get_db
-from api.schemas.finance import FinanceCreate
+from api.schemas.finance import FinanceCreate, FinanceRead
 from app.models.user import User
 from app.models.facture import Facture
 from app.models.finance import Finance
+from api.services.pagination import PageParams, paginate
+from api.services.compteurs import Compteurs
 router = APIRouter(prefix="/finance", tags=["Finance & Comptabilité"])
 
 # ============================================================
@@ -122,64 +124,14 @@ def create_operation(
 
 @router.get("/")
 def get_all_operations(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     
 ):
     
-    return db.query(Finance).order_by(desc(Finance.date_operation)).all()
-
-
-@router.get("/{op_id}")
-def get_operation(
-    op_id: int,
-    db: Session = Depends(get_db),
-    
-):
-    
-    op = db.query(Finance).filter(Finance.id == op_id).first()
-    if not op:
-        raise HTTPException(status_code=404, detail="Opération introuvable.")
-    return op
-
-
-@router.put("/{op_id}")
-def update_operation(
-    op_id: int,
-    data: dict,
-    db: Session = Depends(get_db),
-    
-):
-    
-    op = db.query(Finance).filter(Finance.id == op_id).first()
-    if not op:
-        raise HTTPException(status_code=404, detail="Opération introuvable.")
-
-    for key, value in data.items():
-        if hasattr(op, key):
-            setattr(op, key, value)
-    db.commit()
-    db.refresh(op)
-    return {"message": "✅ Opération mise à jour avec succès.", "operation": op}
-
-
-@router.delete("/{op_id}")
-def delete_operation(
-    op_id: int,
-    db: Session = Depends(get_db),
-    
-):
-    
-    op = db.query(Finance).filter(Finance.id == op_id).first()
-    if not op:
-        raise HTTPException(status_code=404, detail="Opération introuvable.")
-    db.delete(op)
-    db.commit()
-    return {"message": "🗑️ Opération supprimée avec succès."}
-
-
-
-
-
+    return paginate(
+        db.query(Finance), page, Finance.id, Finance.date_operation, schema=FinanceRead
+    )
 
 
 # ============================================================
@@ -218,7 +170,6 @@ def prediction_financiere_ia(db: Session = Depends(get_db)):
     }
 
 
-
 # ============================================================
 # 💼 4️⃣ Bilan comptable global
 # ============================================================
@@ -229,9 +180,10 @@ def bilan_comptable(
 ):
     
 
-    total_ht = db.query(func.sum(Finance.montant_ht)).scalar() or 0
-    total_taxe = db.query(func.sum(Finance.taxe)).scalar() or 0
-    total_ttc = db.query(func.sum(Finance.montant_total)).scalar() or 0
+    compteurs = Compteurs.lire(db, "finance_montant_ht", "finance_taxe", "finance_montant_total")
+    total_ht = compteurs["finance_montant_ht"]
+    total_taxe = compteurs["finance_taxe"]
+    total_ttc = compteurs["finance_montant_total"]
 
     return {
         "periode": f"{datetime.utcnow().month}/{datetime.utcnow().year}",
@@ -240,3 +192,51 @@ def bilan_comptable(
         "total_ttc": round(float(total_ttc), 2),
         "message": "💼 Bilan comptable global généré automatiquement par Aetheris IA Santé",
     }
+
+
+@router.get("/{op_id}")
+def get_operation(
+    op_id: int,
+    db: Session = Depends(get_db),
+    
+):
+    
+    op = db.query(Finance).filter(Finance.id == op_id).first()
+    if not op:
+        raise HTTPException(status_code=404, detail="Opération introuvable.")
+    return op
+
+
+@router.put("/{op_id}")
+def update_operation(
+    op_id: int,
+    data: dict,
+    db: Session = Depends(get_db),
+    
+):
+    
+    op = db.query(Finance).filter(Finance.id == op_id).first()
+    if not op:
+        raise HTTPException(status_code=404, detail="Opération introuvable.")
+
+    for key, value in data.items():
+        if hasattr(op, key):
+            setattr(op, key, value)
+    db.commit()
+    db.refresh(op)
+    return {"message": "✅ Opération mise à jour avec succès.", "operation": op}
+
+
+@router.delete("/{op_id}")
+def delete_operation(
+    op_id: int,
+    db: Session = Depends(get_db),
+    
+):
+    
+    op = db.query(Finance).filter(Finance.id == op_id).first()
+    if not op:
+        raise HTTPException(status_code=404, detail="Opération introuvable.")
+    db.delete(op)
+    db.commit()
+    return {"message": "🗑️ Opération supprimée avec succès."}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, lazyload, load_only
 from sqlalchemy import desc
 from typing import List
 
@@ -13,6 +13,8 @@ from api.schemas.hospitalisation import (
     HospitalisationUpdate,
 )
 from api.routes.auth import get_current_user
+from api.services.pagination import PageParams, paginate
+from api.services.budget_requetes import BudgetRoute
 
 
 router = APIRouter(prefix="/hospitalisations", tags=["Hospitalisations"])
@@ -40,6 +42,25 @@ def build_hospitalisation_read(h: Hospitalisation) -> HospitalisationRead:
     )
 
 
+def requete_lecture(db: Session):
+    """Forme de requête de HospitalisationRead : une seule requête, patient et médecin joints."""
+    return (
+        db.query(Hospitalisation)
+        .outerjoin(Hospitalisation.patient)
+        .outerjoin(Hospitalisation.medecin)
+        .options(
+            load_only(
+                Hospitalisation.id, Hospitalisation.patient_id, Hospitalisation.medecin_id,
+                Hospitalisation.service, Hospitalisation.chambre, Hospitalisation.lit, Hospitalisation.motif,
+                Hospitalisation.observations, Hospitalisation.statut,
+                Hospitalisation.date_entree, Hospitalisation.date_sortie,
+            ),
+            contains_eager(Hospitalisation.patient).options(load_only(Patient.nom, Patient.prenom), lazyload("*")),
+            contains_eager(Hospitalisation.medecin).options(load_only(User.nom), lazyload("*")),
+        )
+    )
+
+
 # 📥 Créer une hospitalisation
 @router.post("/", response_model=HospitalisationRead)
 def creer_hospitalisation(
@@ -70,24 +91,27 @@ def creer_hospitalisation(
 
 
 # 📤 Liste des hospitalisations (tous patients)
-@router.get("/", response_model=List[HospitalisationRead])
+@router.get("/", response_model=List[HospitalisationRead], dependencies=[Depends(BudgetRoute(3))])
 def list_all_hospitalisations(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    hospitalisations = db.query(Hospitalisation).order_by(desc(Hospitalisation.date_entree)).all()
-    return [build_hospitalisation_read(h) for h in hospitalisations]
+    return paginate(
+        requete_lecture(db), page, Hospitalisation.id, Hospitalisation.date_entree,
+        serialize=build_hospitalisation_read,
+    )
 
 
 # 📤 Liste des hospitalisations d’un patient
-@router.get("/patient/{patient_id}", response_model=List[HospitalisationRead])
+@router.get("/patient/{patient_id}", response_model=List[HospitalisationRead], dependencies=[Depends(BudgetRoute(2))])
 def list_hospitalisations_patient(
     patient_id: int,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     hospitalisations = (
-        db.query(Hospitalisation)
+        requete_lecture(db)
         .filter(Hospitalisation.patient_id == patient_id)
         .order_by(desc(Hospitalisation.date_entree))
         .all()
@@ -96,13 +120,13 @@ def list_hospitalisations_patient(
 
 
 # 📤 Détail d’une hospitalisation
-@router.get("/{hosp_id}", response_model=HospitalisationRead)
+@router.get("/{hosp_id}", response_model=HospitalisationRead, dependencies=[Depends(BudgetRoute(2))])
 def get_hospitalisation(
     hosp_id: int,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    hosp = db.query(Hospitalisation).filter(Hospitalisation.id == hosp_id).first()
+    hosp = requete_lecture(db).filter(Hospitalisation.id == hosp_id).first()
     if not hosp:
         raise HTTPException(status_code=404, detail="Hospitalisation introuvable")
     return build_hospitalisation_read(hosp)
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from api.database import get_db
+from api.routes.auth import get_current_user
 from app.models.imagerie import Imagerie
+from app.models.user import User
 from api.schemas.imagerie import ImagerieCreate, ImagerieUpdate, ImagerieRead
-from typing import List
+from typing import List, Optional
+from api.services.pagination import PageParams, paginate
+from api.services.stockage import StockageFichiers, OPENAPI_FICHIER, UPLOAD_IMAGERIE_MAX_OCTETS
+from api.services.vignettes import Vignettes
 
 router = APIRouter(
     prefix="/imageries",
@@ -21,10 +27,42 @@ def create_imagerie(data: ImagerieCreate, db: Session = Depends(get_db)):
     return imagerie
 
 
+# 📤 Téléverser un examen (DICOM, PNG...) et créer l'imagerie
+@router.post("/upload", response_model=ImagerieRead, openapi_extra=OPENAPI_FICHIER)
+async def upload_imagerie(
+    request: Request,
+    patient_id: int,
+    type_examen: str,
+    autre_examen: Optional[str] = None,
+    description: Optional[str] = None,
+    effectue_par: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    fichier = await StockageFichiers.televerser(request, db, taille_max=UPLOAD_IMAGERIE_MAX_OCTETS)
+    Vignettes.planifier(fichier)
+
+    def enregistrer() -> Imagerie:
+        imagerie = Imagerie(
+            patient_id=patient_id,
+            type_examen=type_examen,
+            autre_examen=autre_examen,
+            fichier_url=fichier.chemin,
+            description=description,
+            effectue_par=effectue_par,
+        )
+        db.add(imagerie)
+        db.commit()
+        db.refresh(imagerie)
+        return imagerie
+
+    return await run_in_threadpool(enregistrer)
+
+
 # 📋 Liste des imageries
 @router.get("/", response_model=List[ImagerieRead])
-def list_imageries(db: Session = Depends(get_db)):
-    return db.query(Imagerie).all()
+def list_imageries(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    return paginate(db.query(Imagerie), page, Imagerie.id, descending=False, schema=ImagerieRead)
 
 
 # 👁️ Voir une imagerie par ID
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from api.database import get_db
@@ -11,6 +11,9 @@ from app.models.notification import Notification
 from api.schemas.metabolique import MetaboliqueCreate, MetaboliqueRead, MetaboliqueUpdate
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.downsampling import Downsampler
+from api.services.pagination import PageParams, paginate
+from api.services.cache_mesures import cache_dernieres_mesures
 
 router = APIRouter(prefix="/metabolique", tags=["Fonction Métabolique"])
 
@@ -83,6 +86,7 @@ def creer_donnee_metabolique(
         db.add(metabolique)
         db.commit()
         db.refresh(metabolique)
+        cache_dernieres_mesures.mettre("metabolique", patient.id, metabolique, MetaboliqueRead)
 
         # 🔔 Notification IA Aetheris
         notification = Notification(
@@ -115,36 +119,45 @@ def derniere_donnee_metabolique(
     user: User = Depends(get_current_user)
 ):
     """Renvoie la dernière donnée métabolique pour un patient."""
-    get_patient_or_404(db, patient_id)
+    def charger():
+        get_patient_or_404(db, patient_id)
+
+        data = (
+            db.query(MetaboliqueData)
+            .filter(MetaboliqueData.patient_id == patient_id)
+            .order_by(desc(MetaboliqueData.created_at))
+            .first()
+        )
 
-    data = (
-        db.query(MetaboliqueData)
-        .filter(MetaboliqueData.patient_id == patient_id)
-        .order_by(desc(MetaboliqueData.created_at))
-        .first()
-    )
+        if not data:
+            raise HTTPException(status_code=404, detail="Aucune donnée métabolique trouvée.")
+        return data
 
-    if not data:
-        raise HTTPException(status_code=404, detail="Aucune donnée métabolique trouvée.")
-    return data
+    return cache_dernieres_mesures.obtenir("metabolique", patient_id, charger, MetaboliqueRead)
 
 
 # 📜 3️⃣ Historique complet
 @router.get("/{patient_id}", response_model=List[MetaboliqueRead])
 def historique_metabolique(
     patient_id: int,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Nombre de points pour les graphiques (sous-échantillonnage)"),
+    mode: str = Query("lttb", pattern="^(lttb|minmax)$", description="Méthode : lttb ou minmax"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Renvoie tout l’historique métabolique du patient."""
+    """Renvoie l’historique métabolique du patient (paginé ou sous-échantillonné)."""
     get_patient_or_404(db, patient_id)
 
-    historiques = (
-        db.query(MetaboliqueData)
-        .filter(MetaboliqueData.patient_id == patient_id)
-        .order_by(desc(MetaboliqueData.created_at))
-        .all()
-    )
+    if points:
+        historiques = Downsampler.historique(
+            db, MetaboliqueData, patient_id, MetaboliqueData.glucose, points=points, mode=mode
+        )
+    else:
+        historiques = paginate(
+            db.query(MetaboliqueData).filter(MetaboliqueData.patient_id == patient_id),
+            page, MetaboliqueData.id, MetaboliqueData.created_at, schema=MetaboliqueRead,
+        )
 
     if not historiques:
         raise HTTPException(status_code=404, detail="Aucun historique métabolique trouvé.")
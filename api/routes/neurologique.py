@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from api.database import get_db
@@ -10,6 +10,9 @@ from app.models.patient import Patient
 from api.schemas.neurologique import NeurologiqueCreate, NeurologiqueRead, NeurologiqueUpdate
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.downsampling import Downsampler
+from api.services.pagination import PageParams, paginate
+from api.services.cache_mesures import cache_dernieres_mesures
 
 router = APIRouter(prefix="/neurologique", tags=["Fonction Neurologique"])
 
@@ -86,6 +89,7 @@ def creer_donnee_neuro(
         db.add(neuro)
         db.commit()
         db.refresh(neuro)
+        cache_dernieres_mesures.mettre("neurologique", patient.id, neuro, NeurologiqueRead)
 
         print(f"✅ Donnée neurologique créée pour patient ID {patient.id}")
         return neuro
@@ -104,36 +108,45 @@ def derniere_donnee_neuro(
     user: User = Depends(get_current_user)
 ):
     """Récupère la dernière donnée neurologique enregistrée pour un patient."""
-    get_patient_or_404(db, patient_id)
+    def charger():
+        get_patient_or_404(db, patient_id)
+
+        neuro = (
+            db.query(NeurologiqueData)
+            .filter(NeurologiqueData.patient_id == patient_id)
+            .order_by(desc(NeurologiqueData.created_at))
+            .first()
+        )
 
-    neuro = (
-        db.query(NeurologiqueData)
-        .filter(NeurologiqueData.patient_id == patient_id)
-        .order_by(desc(NeurologiqueData.created_at))
-        .first()
-    )
+        if not neuro:
+            raise HTTPException(status_code=404, detail="Aucune donnée neurologique trouvée.")
+        return neuro
 
-    if not neuro:
-        raise HTTPException(status_code=404, detail="Aucune donnée neurologique trouvée.")
-    return neuro
+    return cache_dernieres_mesures.obtenir("neurologique", patient_id, charger, NeurologiqueRead)
 
 
 # 📜 3️⃣ Historique complet
 @router.get("/{patient_id}", response_model=List[NeurologiqueRead])
 def historique_neuro(
     patient_id: int,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Nombre de points pour les graphiques (sous-échantillonnage)"),
+    mode: str = Query("lttb", pattern="^(lttb|minmax)$", description="Méthode : lttb ou minmax"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Renvoie l’historique complet des données neurologiques."""
+    """Renvoie l’historique des données neurologiques (paginé ou sous-échantillonné)."""
     get_patient_or_404(db, patient_id)
 
-    historiques = (
-        db.query(NeurologiqueData)
-        .filter(NeurologiqueData.patient_id == patient_id)
-        .order_by(desc(NeurologiqueData.created_at))
-        .all()
-    )
+    if points:
+        historiques = Downsampler.historique(
+            db, NeurologiqueData, patient_id, NeurologiqueData.eeg, points=points, mode=mode
+        )
+    else:
+        historiques = paginate(
+            db.query(NeurologiqueData).filter(NeurologiqueData.patient_id == patient_id),
+            page, NeurologiqueData.id, NeurologiqueData.created_at, schema=NeurologiqueRead,
+        )
 
     if not historiques:
         raise HTTPException(status_code=404, detail="Aucun historique neurologique trouvé.")
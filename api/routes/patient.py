@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from fastapi.responses import FileResponse
-import os, random
+import hashlib
+import json
+import random
 
 from api.database import get_db
 from app import models
 from app.models.user import User
 from api.schemas import patient as schemas
 from api.routes.auth import get_current_user
+from api.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, PageParams, paginate
+from api.services.pdf_jobs import PdfJobs
+from api.services.fiche_patient import FichePatient, FICHE_PATIENT_LIMITE
+from api.services.budget_requetes import BudgetRoute
+from api.services.timeline import Timeline, decoder_curseur
+from api.services.noms_patients import IndexNoms
+from api.services.dossiers_manquants import DossiersManquants
 
 router = APIRouter(prefix="/patients", tags=["Patients"])
 
@@ -17,12 +27,8 @@ router = APIRouter(prefix="/patients", tags=["Patients"])
 # 🧠 Création d’un patient avec initialisation automatique des fonctions vitales
 @router.post("/", response_model=schemas.PatientRead)
 def create_patient(patient: schemas.PatientCreate, db: Session = Depends(get_db)):
-    # Vérifier si le patient existe déjà
-    existing = db.query(models.Patient).filter(
-        models.Patient.nom == patient.nom,
-        models.Patient.prenom == patient.prenom
-    ).first()
-    if existing:
+    # Vérifier si le patient existe déjà (accents, casse et ponctuation ignorés)
+    if IndexNoms.doublon(db, patient.nom, patient.prenom):
         raise HTTPException(status_code=400, detail="Un patient avec ce nom existe déjà.")
 
     try:
@@ -86,6 +92,7 @@ def create_patient(patient: schemas.PatientCreate, db: Session = Depends(get_db)
         )
 
         db.add_all([cardiaque, pulmonaire, renal, digestive, metabolique, neuro])
+        DossiersManquants.creer(db, pid)  # 🗂️ dossier médical par défaut
         db.commit()
 
         # ✅ Étape 3 : Génération automatique de l’analyse IA
@@ -131,8 +138,22 @@ def create_patient(patient: schemas.PatientCreate, db: Session = Depends(get_db)
 
 # 📤 Récupérer tous les patients
 @router.get("/", response_model=List[schemas.PatientRead])
-def list_patients(skip: int = 0, limit: int = 50, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return db.query(models.Patient).offset(skip).limit(limit).all()
+def list_patients(page: PageParams = Depends(), db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return paginate(
+        db.query(models.Patient), page, models.Patient.id, descending=False,
+        schema=schemas.PatientRead,
+    )
+
+
+# 🔤 Autocomplétion des noms (tolère accents, variantes phonétiques et fautes de frappe)
+@router.get("/autocomplete", dependencies=[Depends(BudgetRoute(8))])
+def autocomplete_patients(
+    q: str = Query(..., min_length=1, max_length=100, description="Début du nom et/ou du prénom"),
+    k: int = Query(10, ge=1, le=50, description="Nombre de suggestions"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    return IndexNoms.chercher(db, q, k)
 
 
 # 📤 Récupérer un patient
@@ -153,25 +174,85 @@ def get_patient_dossier(patient_id: int, db: Session = Depends(get_db), user: Us
     return patient
 
 
-# 📑 Export PDF
-@router.get("/{patient_id}/export-pdf")
-def export_patient_pdf(patient_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
-    if not patient:
+# 🗂️ Fiche agrégée (ouverture d'un patient dans le frontend)
+@router.get("/{patient_id}/chart", dependencies=[Depends(BudgetRoute(15))])
+def get_patient_chart(
+    patient_id: int,
+    request: Request,
+    sections: Optional[str] = Query(None, description="Sections séparées par des virgules (défaut : toutes)"),
+    limite: int = Query(FICHE_PATIENT_LIMITE, ge=1, le=200, description="Éléments par liste"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Patient, dossier, dernière mesure des six fonctions vitales, synthèses,
+    analyses, rendez-vous, hospitalisations, documents et notifications en
+    une réponse. ETag fort sur le contenu : If-None-Match → 304.
+    """
+    try:
+        choisies = FichePatient.sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    fiche = FichePatient.construire(db, patient_id, choisies, limite)
+    if fiche is None:
         raise HTTPException(status_code=404, detail="Patient introuvable")
 
-    filename = f"patient_{patient.id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
-    filepath = os.path.join("exports", filename)
+    corps = json.dumps(jsonable_encoder(fiche), ensure_ascii=False, separators=(",", ":")).encode()
+    etag = f'"{hashlib.sha1(corps).hexdigest()}"'
+    entetes = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=entetes)
+    return Response(corps, media_type="application/json", headers=entetes)
+
+
+# 🕰️ Frise chronologique (toutes sources, paginée par curseur composite)
+@router.get("/{patient_id}/timeline", dependencies=[Depends(BudgetRoute(17))])
+def get_patient_timeline(
+    patient_id: int,
+    request: Request,
+    response: Response,
+    types: Optional[str] = Query(None, description="Sources séparées par des virgules (défaut : toutes)"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque de la page suivante"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Taille de page"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    try:
+        sources = Timeline.types(types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        curseur = decoder_curseur(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+    if not db.query(models.Patient.id).filter(models.Patient.id == patient_id).first():
+        raise HTTPException(status_code=404, detail="Patient introuvable")
 
-    os.makedirs("exports", exist_ok=True)
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(f"Dossier du patient {patient.prenom} {patient.nom}\n")
-        f.write(f"Âge: {patient.age} ans\n")
-        f.write(f"Téléphone: {patient.telephone or '—'}\n")
-        f.write(f"Adresse: {patient.adresse or '—'}\n")
-        f.write(f"Créé le: {patient.created_at.strftime('%d/%m/%Y %H:%M')}\n")
+    evenements, suivant = Timeline.page(db, patient_id, sources, limit, curseur)
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=suivant, limit=limit)}>; rel="next"'
+    return evenements
 
-    return FileResponse(filepath, filename=filename, media_type="application/pdf")
+
+# 📑 Export PDF
+@router.get("/{patient_id}/export-pdf")
+async def export_patient_pdf(patient_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    def charger():
+        patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
+        if not patient:
+            raise HTTPException(status_code=404, detail="Patient introuvable")
+        champs = ("id", "nom", "prenom", "age", "telephone", "adresse", "created_at")
+        return {"patient": {c: getattr(patient, c) for c in champs}}
+
+    donnees = await run_in_threadpool(charger)
+    filename = f"patient_{patient_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
+
+    # Rendu ReportLab en mémoire dans le pool PDF, diffusé sans fichier intermédiaire
+    contenu = await PdfJobs.rendre_en_memoire("dossier", donnees)
+    return PdfJobs.reponse_flux(contenu, filename)
 
 
 # ✏️ Modifier un patient
@@ -4,7 +4,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import List
 
 from api.database import get_db
@@ -17,6 +16,7 @@ from api.schemas.patient_critique import (
 )
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.pagination import PageParams, paginate
 from services.aetheris_ia import AetherisIA
 from api.schemas.patient_critique import DossierCritiqueRead
 from app.models.etat_clinique import EtatClinique
@@ -47,10 +47,14 @@ def ajouter_patient_critique(
 # 📤 Liste de tous les patients critiques
 @router.get("/", response_model=List[PatientCritiqueRead])
 def list_patients_critiques(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    return db.query(PatientCritique).order_by(desc(PatientCritique.created_at)).all()
+    return paginate(
+        db.query(PatientCritique), page, PatientCritique.id, PatientCritique.created_at,
+        schema=PatientCritiqueRead,
+    )
 
 
 # 📤 Détails d’un patient critique
@@ -1,18 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 from datetime import datetime
-from io import BytesIO
+from typing import Any, Callable, Dict, List, Tuple, Union
 import os
-import qrcode
-from matplotlib import pyplot as plt
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.utils import ImageReader
-from reportlab.platypus import Table, TableStyle
-from reportlab.lib.units import cm
 
 from api.database import get_db
 from api.routes.auth import get_current_user
@@ -21,20 +16,128 @@ from app.models.user import User
 from app.models.facture import Facture
 from app.models.analyse_ia import AnalyseIA
 from app.models.dossier_medical import DossierMedical
+from app.models import CardiaqueData, PulmonaryData, MetaboliqueData, RenalData
 from app import models
+from api.services.downsampling import Downsampler
+from api.services.pdf_cache import PdfCache, PDF_CACHE_PERSISTANT
+from api.services.pdf_jobs import PdfJob, PdfJobs, PDF_DIR
+from api.services.reponse_fichier import FichierResponse, disposition_piece_jointe
+from api.services.pdf_zip import Entree, ExportsGroupes
+from api.schemas.pdf_export import ExportGroupeRequest
 
 router = APIRouter(prefix="/pdf", tags=["PDF Export"])
-PDF_DIR = "exports/pdf"
 os.makedirs(PDF_DIR, exist_ok=True)
 
+Donnees = Dict[str, Any]
+# (versions des lignes sources, nom du fichier, données ou fonction qui les charge)
+Preparation = Tuple[List[Any], str, Union[Donnees, Callable[[], Donnees]]]
+
+ASYNCHRONE = Query(False, description="true : renvoie 202 et l'URL du job au lieu d'attendre le PDF")
+
+# Points par courbe dans les graphiques de tendance (historique sous-échantillonné)
+PDF_GRAPHIQUE_POINTS = int(os.getenv("PDF_GRAPHIQUE_POINTS", "200"))
+# (titre, unité, modèle, colonne) des constantes tracées dans les rapports d'analyse et de synthèse
+TENDANCES = [
+    ("Fréquence cardiaque", "bpm", CardiaqueData, CardiaqueData.frequence_cardiaque),
+    ("SpO2", "%", PulmonaryData, PulmonaryData.spo2),
+    ("Glycémie", "mg/dL", MetaboliqueData, MetaboliqueData.glucose),
+    ("Créatinine", "mg/dL", RenalData, RenalData.creatinine),
+]
+
+
 # ============================================================
-# 🧠 1️⃣ Rapport d’analyse IA Aetheris
+# ⚙️ Préparation des données (thread) → cache → rendu (pool de processus)
 # ============================================================
-@router.get("/analysis/{patient_id}/export")
-def export_pdf_analysis(patient_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def _colonnes(obj: Any, *noms: str) -> Donnees:
+    return {n: getattr(obj, n, None) for n in noms}
+
+
+def _patient(patient: Patient) -> Donnees:
+    return _colonnes(patient, "id", "nom", "prenom", "age", "sexe")
+
+
+def _get_patient(db: Session, patient_id: int) -> Patient:
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(status_code=404, detail="Patient non trouvé")
+    return patient
+
+
+async def _exporter(request: Request, type_rendu: str, preparation: Preparation, asynchrone: bool):
+    """
+    Sert le PDF depuis le cache adressé par contenu (ETag / 304), sinon
+    le fait rendre par le pool. Les données ne sont chargées qu'en cas d'absence.
+
+    - synchrone : rendu en mémoire, diffusé par blocs, puis persisté dans le
+      cache après l'envoi (sauf PDF_CACHE_PERSISTANT=0)
+    - asynchrone : job écrit directement dans le cache, téléchargé plus tard
+    """
+    sources, nom, donnees = preparation
+    cle = PdfCache.cle(type_rendu, sources)
+    entetes = {"ETag": f'"{cle}"', "Cache-Control": "private, no-cache"}
+
+    if f'"{cle}"' in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=entetes)
+
+    chemin = PdfCache.trouver(cle)
+    if chemin is not None:
+        if asynchrone:
+            job = PdfJob(type_rendu, nom, cle)
+            job.statut = "termine"
+            return JSONResponse(content=jsonable_encoder(job.to_dict()))
+        return FichierResponse(chemin, media_type="application/pdf", filename=nom, etag=f'"{cle}"', headers=entetes)
+
+    if callable(donnees):
+        donnees = await run_in_threadpool(donnees)
+
+    if asynchrone:
+        job = await run_in_threadpool(PdfJobs.soumettre, type_rendu, donnees, nom, cle)
+        return JSONResponse(status_code=202, content=jsonable_encoder(job.to_dict()))
+
+    try:
+        contenu = await PdfJobs.rendre_en_memoire(type_rendu, donnees)
+    except Exception as e:
+        print(f"❌ Rendu PDF {type_rendu} en échec : {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors du rendu PDF : {e}")
+
+    reponse = PdfJobs.reponse_flux(contenu, nom, entetes)
+    if PDF_CACHE_PERSISTANT:
+        reponse.background = BackgroundTask(PdfCache.enregistrer, cle, contenu)
+    return reponse
+
+
+def _horodatage() -> str:
+    return datetime.utcnow().strftime('%Y%m%d%H%M%S')
+
+
+def _version_tendances(db: Session, patient_id: int) -> List[List[Any]]:
+    """Version des séries sans les lire : nombre, dernier id, dernière date, somme des valeurs."""
+    return [
+        list(
+            db.query(func.count(colonne), func.max(model.id), func.max(model.created_at), func.sum(colonne))
+            .filter(model.patient_id == patient_id)
+            .one()
+        )
+        for _, _, model, colonne in TENDANCES
+    ]
+
+
+def _tendances(db: Session, patient_id: int, version: List[List[Any]]) -> Donnees:
+    """Séries sous-échantillonnées à tracer ; `cle` identifie le graphique dans le cache des workers."""
+    series = []
+    for (titre, unite, model, colonne), (total, *_) in zip(TENDANCES, version):
+        if total < 2:
+            continue
+        points = Downsampler.serie(db, model, patient_id, colonne, PDF_GRAPHIQUE_POINTS)
+        series.append({"titre": titre, "unite": unite, "points": points})
+    return {"cle": PdfCache.empreinte(["tendances", PDF_GRAPHIQUE_POINTS, version]), "series": series}
+
+
+# ============================================================
+# 🧠 1️⃣ Rapport d’analyse IA Aetheris
+# ============================================================
+def _preparer_analyse(db: Session, patient_id: int, user: User) -> Preparation:
+    patient = _get_patient(db, patient_id)
 
     analyse = (
         db.query(AnalyseIA)
@@ -45,176 +148,118 @@ def export_pdf_analysis(patient_id: int, db: Session = Depends(get_db), user: Us
     if not analyse:
         raise HTTPException(status_code=404, detail="Aucune analyse IA trouvée pour ce patient")
 
-    filename = f"{PDF_DIR}/Analyse_Aetheris_{patient.nom}_{patient.prenom}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
-    c = canvas.Canvas(filename, pagesize=A4)
-    width, height = A4
-
-    # --- Bandeau bleu ---
-    c.setFillColor(colors.HexColor("#1e3a8a"))
-    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
-
-    logo_path = "assets/logo_aetheris.png"
-    if os.path.exists(logo_path):
-        c.drawImage(logo_path, 40, height - 70, width=90, height=50, mask="auto")
-
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(150, height - 45, "RAPPORT D’ANALYSE IA — AETHERIS")
-    c.setFont("Helvetica", 11)
-    c.drawString(150, height - 65, f"Dr {user.nom}  |  {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-
-    y = height - 120
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(50, y, f"👤 Patient : {patient.prenom} {patient.nom} ({patient.age or '?'} ans, {patient.sexe or '-'})")
-
-    y -= 30
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Diagnostic :")
-    y -= 15
-    c.setFont("Helvetica", 11)
-    c.drawString(70, y, analyse.diagnostic or "—")
-
-    y -= 30
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Prédictions & Risques :")
-    y -= 15
-    c.setFont("Helvetica", 11)
-    for line in (analyse.prediction or "—").split("\n"):
-        c.drawString(70, y, f"- {line}")
-        y -= 15
-
-    y -= 20
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Plan de prise en charge :")
-    y -= 15
-    c.setFont("Helvetica", 11)
-    for step in (analyse.plan or "—").split("\n"):
-        c.drawString(70, y, f"- {step}")
-        y -= 15
-
-    y -= 20
-    c.setFont("Helvetica-Oblique", 10)
-    c.setFillColor(colors.grey)
-    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé — Validation médicale requise.")
-    c.save()
-    return FileResponse(filename, media_type="application/pdf", filename=os.path.basename(filename))
+    donnees = {
+        "patient": _patient(patient),
+        "analyse": _colonnes(analyse, "id", "diagnostic", "prediction", "plan", "created_at"),
+        "medecin": user.nom,
+        "genere_le": datetime.now().strftime('%d/%m/%Y %H:%M'),
+    }
+    version = _version_tendances(db, patient_id)
+    sources = [
+        PdfCache.version_ligne("patients", patient, donnees["patient"]),
+        PdfCache.version_ligne("analyses_ia", analyse, donnees["analyse"]),
+        ["medecin", user.nom],
+        ["tendances", version],
+    ]
+
+    def charger() -> Donnees:
+        return {**donnees, "tendances": _tendances(db, patient_id, version)}
+
+    return sources, f"Analyse_Aetheris_{patient.nom}_{patient.prenom}_{_horodatage()}.pdf", charger
+
+
+@router.get("/analysis/{patient_id}/export")
+async def export_pdf_analysis(
+    patient_id: int,
+    request: Request,
+    asynchrone: bool = ASYNCHRONE,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    preparation = await run_in_threadpool(_preparer_analyse, db, patient_id, user)
+    return await _exporter(request, "analyse", preparation, asynchrone)
 
 
 # ============================================================
 # 💳 2️⃣ Export PDF Facture Médicale
 # ============================================================
-@router.get("/facture/{facture_id}")
-def export_facture_pdf(facture_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def _preparer_facture(db: Session, facture_id: int) -> Preparation:
     facture = db.query(Facture).filter(Facture.id == facture_id).first()
     if not facture:
         raise HTTPException(status_code=404, detail="Facture introuvable")
 
-    patient = facture.patient
     medecin = facture.medecin
-    filename = f"{PDF_DIR}/Facture_Aetheris_{facture.id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
-    c = canvas.Canvas(filename, pagesize=A4)
-    width, height = A4
-
-    c.setFillColor(colors.HexColor("#0f172a"))
-    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 20)
-    c.drawCentredString(width / 2, height - 50, "FACTURE MÉDICALE — AETHERIS")
-
-    y = height - 120
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(50, y, f"Patient : {patient.prenom} {patient.nom}")
-    y -= 25
-    c.drawString(50, y, f"Médecin : {medecin.nom if medecin else '—'} ({medecin.specialite if medecin else '—'})")
-    y -= 35
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Détails de la Facture :")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    data = [
-        ["Numéro", facture.numero_facture],
-        ["Date émission", facture.date_emission.strftime("%d/%m/%Y") if facture.date_emission else "—"],
-        ["Montant HT", f"{facture.montant_ht:.2f} €"],
-        ["Taxe", f"{facture.taxe:.2f} €"],
-        ["Total TTC", f"{facture.montant_total:.2f} €"],
-        ["Statut", facture.statut],
-        ["Paiement", facture.methode_paiement or "—"],
+    donnees = {
+        "facture": _colonnes(
+            facture, "id", "numero_facture", "date_emission", "montant_ht", "taxe",
+            "montant_total", "statut", "methode_paiement",
+        ),
+        "patient": _patient(facture.patient),
+        "medecin": _colonnes(medecin, "nom", "specialite") if medecin else None,
+    }
+    sources = [
+        PdfCache.version_ligne("factures", facture, donnees["facture"]),
+        PdfCache.version_ligne("patients", facture.patient, donnees["patient"]),
+        PdfCache.version_ligne("users", medecin, donnees["medecin"]) if medecin else None,
     ]
-    for k, v in data:
-        c.drawString(70, y, f"{k} : {v}")
-        y -= 15
+    return sources, f"Facture_Aetheris_{facture.id}_{_horodatage()}.pdf", donnees
+
 
-    c.setFont("Helvetica-Oblique", 10)
-    c.setFillColor(colors.grey)
-    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé")
-    c.save()
-    return FileResponse(filename, media_type="application/pdf", filename=os.path.basename(filename))
+@router.get("/facture/{facture_id}")
+async def export_facture_pdf(
+    facture_id: int,
+    request: Request,
+    asynchrone: bool = ASYNCHRONE,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    preparation = await run_in_threadpool(_preparer_facture, db, facture_id)
+    return await _exporter(request, "facture", preparation, asynchrone)
 
 
 # ============================================================
 # 📚 3️⃣ Historique complet des analyses IA
 # ============================================================
-@router.get("/analysis/{patient_id}/export-history")
-def export_analysis_history(patient_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient non trouvé")
+def _preparer_historique(db: Session, patient_id: int) -> Preparation:
+    patient = _get_patient(db, patient_id)
 
-    analyses = (
-        db.query(AnalyseIA)
+    # Version de l'historique sans charger les lignes : nombre, dernier id, dernière modification
+    total, dernier_id, derniere_maj = (
+        db.query(func.count(AnalyseIA.id), func.max(AnalyseIA.id), func.max(AnalyseIA.updated_at))
         .filter(AnalyseIA.patient_id == patient_id)
-        .order_by(desc(AnalyseIA.created_at))
-        .all()
+        .one()
     )
-    if not analyses:
+    if not total:
         raise HTTPException(status_code=404, detail="Aucune analyse IA trouvée")
 
-    filename = f"{PDF_DIR}/Historique_Aetheris_{patient.nom}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
-    c = canvas.Canvas(filename, pagesize=A4)
-    width, height = A4
-
-    c.setFont("Helvetica-Bold", 18)
-    c.setFillColor(colors.HexColor("#1e3a8a"))
-    c.drawCentredString(width / 2, height - 50, f"Historique d’Analyses IA — {patient.prenom} {patient.nom}")
-    c.setFillColor(colors.black)
-
-    y = height - 100
-    for i, a in enumerate(analyses, start=1):
-        if y < 150:
-            c.showPage()
-            y = height - 100
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, y, f"Analyse #{i} — {a.created_at.strftime('%d/%m/%Y %H:%M')}")
-        y -= 20
-        c.setFont("Helvetica", 11)
-        c.drawString(70, y, f"Diagnostic : {a.diagnostic or '—'}")
-        y -= 15
-        c.drawString(70, y, f"Prédiction : {a.prediction or '—'}")
-        y -= 15
-        c.drawString(70, y, f"Plan : {a.plan or '—'}")
-        y -= 25
-
-    c.setFont("Helvetica-Oblique", 10)
-    c.setFillColor(colors.grey)
-    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé")
-    c.save()
-    return FileResponse(filename, media_type="application/pdf", filename=os.path.basename(filename))
-# ============================================================
-# 🧬 4️⃣ Export PDF Synthèse IA (SyntheseDetail.tsx)
-# ============================================================
-@router.get("/synthese/{patient_id}/export")
-def export_synthese_ia_pdf(
+    # Rendu Platypus dans le pool : le processus lit lui-même les analyses par lots
+    donnees = {"patient": _patient(patient), "total": total, "dernier_id": dernier_id}
+    sources = [
+        PdfCache.version_ligne("patients", patient, donnees["patient"]),
+        ["analyses_ia", total, dernier_id, derniere_maj],
+    ]
+    return sources, f"Historique_Aetheris_{patient.nom}_{_horodatage()}.pdf", donnees
+
+
+@router.get("/analysis/{patient_id}/export-history")
+async def export_analysis_history(
     patient_id: int,
+    request: Request,
+    asynchrone: bool = ASYNCHRONE,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: User = Depends(get_current_user),
 ):
+    preparation = await run_in_threadpool(_preparer_historique, db, patient_id)
+    return await _exporter(request, "historique", preparation, asynchrone)
+
+
+# ============================================================
+# 🧬 4️⃣ Export PDF Synthèse IA (SyntheseDetail.tsx)
+# ============================================================
+def _preparer_synthese(db: Session, patient_id: int, user: User) -> Preparation:
     from app.models.synthese_ia import SyntheseIA  # import local pour éviter boucles
 
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient non trouvé")
+    patient = _get_patient(db, patient_id)
 
     synthese = (
         db.query(SyntheseIA)
@@ -225,104 +270,162 @@ def export_synthese_ia_pdf(
     if not synthese:
         raise HTTPException(status_code=404, detail="Aucune synthèse IA trouvée pour ce patient")
 
-    # 📄 Nom de fichier
-    filename = f"{PDF_DIR}/Synthese_Aetheris_{patient.nom}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.pdf"
-    c = canvas.Canvas(filename, pagesize=A4)
-    width, height = A4
-
-    # 🟦 Bandeau supérieur
-    c.setFillColor(colors.HexColor("#1e3a8a"))
-    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
-
-    logo_path = "assets/logo_aetheris.png"
-    if os.path.exists(logo_path):
-        c.drawImage(logo_path, 40, height - 70, width=90, height=50, mask="auto")
-
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(150, height - 45, "RAPPORT DE SYNTHÈSE IA — AETHERIS")
-    c.setFont("Helvetica", 11)
-    c.drawString(150, height - 65, f"Dr {user.nom} | {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-
-    # 👤 Infos patient
-    y = height - 120
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(50, y, f"👤 Patient : {patient.prenom} {patient.nom} ({patient.age or '?'} ans, {patient.sexe or '-'})")
-
-    # 📊 Score et gravité
-    y -= 30
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Score global IA :")
-    c.setFont("Helvetica", 11)
-    c.drawString(180, y, f"{(synthese.score_global or 0) * 100:.1f}%")
-
-    y -= 20
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Niveau de gravité :")
-    c.setFont("Helvetica", 11)
-    c.drawString(180, y, synthese.niveau_gravite or "—")
-
-    # 🧠 Résumé clinique
-    y -= 40
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Résumé clinique IA :")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    for line in (synthese.resume or "—").split("\n"):
-        c.drawString(70, y, line)
-        y -= 15
-
-    # ⚠️ Alertes & Anomalies
-    y -= 20
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Alertes critiques :")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    alertes = synthese.alertes_critiques
-    if isinstance(alertes, str):
-        alertes = [alertes]
-    for a in (alertes or ["Aucune alerte détectée."]):
-        c.drawString(70, y, f"- {a}")
-        y -= 15
-
-    y -= 10
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Anomalies détectées :")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    anomalies = synthese.anomalies_detectees
-    if isinstance(anomalies, str):
-        anomalies = [anomalies]
-    for a in (anomalies or ["Aucune anomalie détectée."]):
-        c.drawString(70, y, f"- {a}")
-        y -= 15
-
-    # 🧩 Recommandations IA
-    y -= 20
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Recommandations IA :")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    if synthese.recommandations_ia:
-        try:
-            for r in synthese.recommandations_ia:
-                if isinstance(r, dict):
-                    c.drawString(70, y, f"• [{r.get('urgence', 'Standard')}] {r.get('texte', '')}")
-                else:
-                    c.drawString(70, y, f"• {r}")
-                y -= 15
-        except Exception:
-            c.drawString(70, y, "Erreur de parsing recommandations.")
-            y -= 15
+    donnees = {
+        "patient": _patient(patient),
+        "synthese": _colonnes(
+            synthese, "id", "score_global", "niveau_gravite", "resume", "alertes_critiques",
+            "anomalies_detectees", "recommandations_ia", "created_at",
+        ),
+        "medecin": user.nom,
+        "genere_le": datetime.now().strftime('%d/%m/%Y %H:%M'),
+    }
+    version = _version_tendances(db, patient_id)
+    sources = [
+        PdfCache.version_ligne("patients", patient, donnees["patient"]),
+        PdfCache.version_ligne("syntheses_ia", synthese, donnees["synthese"]),
+        ["medecin", user.nom],
+        ["tendances", version],
+    ]
+
+    def charger() -> Donnees:
+        return {**donnees, "tendances": _tendances(db, patient_id, version)}
+
+    return sources, f"Synthese_Aetheris_{patient.nom}_{_horodatage()}.pdf", charger
+
+
+@router.get("/synthese/{patient_id}/export")
+async def export_synthese_ia_pdf(
+    patient_id: int,
+    request: Request,
+    asynchrone: bool = ASYNCHRONE,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    preparation = await run_in_threadpool(_preparer_synthese, db, patient_id, user)
+    return await _exporter(request, "synthese", preparation, asynchrone)
+
+
+# ============================================================
+# 📦 5️⃣ Export groupé multi-patients (archive ZIP diffusée)
+# ============================================================
+def _preparer_groupe(db: Session, demande: ExportGroupeRequest, user: User) -> Tuple[List[Entree], Dict[str, str]]:
+    if demande.patient_ids:
+        patient_ids = list(dict.fromkeys(demande.patient_ids))[:demande.limite]
     else:
-        c.drawString(70, y, "Aucune recommandation enregistrée.")
-        y -= 15
+        query = db.query(Patient.id)
+        if demande.statut_clinique:
+            query = query.filter(Patient.statut_clinique == demande.statut_clinique)
+        if demande.niveau_gravite:
+            query = query.filter(Patient.niveau_gravite == demande.niveau_gravite)
+        if demande.actif is not None:
+            query = query.filter(Patient.actif == demande.actif)
+        patient_ids = [pid for (pid,) in query.order_by(Patient.id).limit(demande.limite)]
+
+    entrees: List[Entree] = []
+    erreurs: Dict[str, str] = {}
+    for patient_id in patient_ids:
+        try:
+            if demande.rapport == "analyse":
+                sources, nom, donnees = _preparer_analyse(db, patient_id, user)
+            else:
+                sources, nom, donnees = _preparer_synthese(db, patient_id, user)
+        except HTTPException as e:
+            erreurs[f"patient_{patient_id}"] = e.detail  # patient sans rapport : signalé dans erreurs.txt
+            continue
+        cle = PdfCache.cle(demande.rapport, sources)
+        if callable(donnees):
+            # Données chargées (séries comprises) seulement si le PDF n'est pas déjà en cache
+            donnees = donnees() if PdfCache.trouver(cle) is None else {}
+        entrees.append((f"{patient_id}_{nom}", cle, demande.rapport, donnees))
+    return entrees, erreurs
+
+
+@router.post("/export-groupe")
+async def export_groupe_pdf(
+    demande: ExportGroupeRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Archive ZIP des rapports d'une liste de patients (ou d'un filtre).
+    Les PDF sont rendus en parallèle par le pool et écrits dans l'archive
+    au fil de l'eau ; progression : GET /pdf/exports/{export_id}/progression.
+    """
+    entrees, erreurs = await run_in_threadpool(_preparer_groupe, db, demande, user)
+    if not entrees and not erreurs:
+        raise HTTPException(status_code=404, detail="Aucun patient ne correspond à la demande")
+
+    export = await run_in_threadpool(ExportsGroupes.creer, len(entrees) + len(erreurs), erreurs)
+    nom = f"Export_Aetheris_{demande.rapport}_{_horodatage()}.zip"
+    return StreamingResponse(
+        ExportsGroupes.diffuser(export, entrees),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": disposition_piece_jointe(nom),
+            "X-Export-Id": export.id,
+            "X-Export-Total": str(export.total),
+        },
+    )
+
+
+@router.get("/exports/{export_id}/progression")
+def progression_export_groupe(
+    export_id: str = Path(..., pattern="^[0-9a-f]{32}$"),
+    user: User = Depends(get_current_user),
+):
+    progression = ExportsGroupes.progression(export_id)
+    if progression is None:
+        raise HTTPException(status_code=404, detail="Export introuvable")
+    return progression
+
+
+# ============================================================
+# ⏳ 6️⃣ Suivi et téléchargement des rendus
+# ============================================================
+JOB_ID = Path(..., pattern="^[0-9a-f]{64}$", description="Identifiant du job PDF (clé du cache)")
 
-    # 🕓 Footer
-    c.setFont("Helvetica-Oblique", 10)
-    c.setFillColor(colors.grey)
-    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé — Rapport généré automatiquement.")
-    c.save()
 
-    return FileResponse(filename, media_type="application/pdf", filename=os.path.basename(filename))
+@router.get("/jobs/{job_id}")
+async def statut_job_pdf(
+    job_id: str = JOB_ID,
+    attendre: float = Query(0, ge=0, le=60, description="Secondes d'attente maximale de la fin du rendu"),
+    user: User = Depends(get_current_user),
+):
+    job = PdfJobs.obtenir(job_id)
+    if job is None:
+        # Job soumis à un autre worker : statut publié dans l'état partagé, sinon le cache fait foi
+        statut = await run_in_threadpool(PdfJobs.statut_partage, job_id)
+        if statut is not None:
+            statut.pop("nom_fichier", None)
+            return statut
+        if PdfCache.trouver(job_id):
+            return {"job_id": job_id, "statut": "termine", "telechargement_url": f"/pdf/jobs/{job_id}/fichier"}
+        raise HTTPException(status_code=404, detail="Job PDF introuvable")
+
+    if attendre and job.statut == "en_cours":
+        await PdfJobs.attendre(job, timeout=attendre)
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/fichier")
+def telecharger_job_pdf(
+    request: Request,
+    job_id: str = JOB_ID,
+    user: User = Depends(get_current_user),
+):
+    job = PdfJobs.obtenir(job_id)
+    statut = job.to_dict() if job is not None else PdfJobs.statut_partage(job_id)
+    if statut is not None and statut["statut"] == "en_cours":
+        raise HTTPException(status_code=409, detail="Rendu PDF en cours")
+    if statut is not None and statut["statut"] != "termine":
+        raise HTTPException(status_code=500, detail=f"Erreur lors du rendu PDF : {statut['erreur'] or statut['statut']}")
+
+    entetes = {"ETag": f'"{job_id}"', "Cache-Control": "private, no-cache"}
+    if f'"{job_id}"' in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=entetes)
+
+    chemin = PdfCache.trouver(job_id)
+    if chemin is None:
+        raise HTTPException(status_code=404, detail="Fichier PDF introuvable")
+    nom = job.nom_fichier if job else (statut or {}).get("nom_fichier") or f"{job_id}.pdf"
+    return FichierResponse(chemin, media_type="application/pdf", filename=nom, etag=f'"{job_id}"', headers=entetes)
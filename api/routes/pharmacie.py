@@ -7,6 +7,7 @@ from api.database import get_db
 from api.routes.auth import get_current_user
 from app.models.pharmacie import Pharmacie
 from api.schemas.pharmacie import PharmacieCreate, PharmacieUpdate, PharmacieOut
+from api.services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/pharmacie", tags=["Pharmacie"])
 
@@ -28,10 +29,11 @@ def create_medicament(
 # 📋 Lister tous les médicaments
 @router.get("/", response_model=List[PharmacieOut])
 def list_medicaments(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
-    return db.query(Pharmacie).all()
+    return paginate(db.query(Pharmacie), page, Pharmacie.id, descending=False, schema=PharmacieOut)
 
 
 # 🔍 Voir un médicament par ID
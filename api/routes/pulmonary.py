@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from api.database import get_db
@@ -10,6 +10,9 @@ from app.models.patient import Patient
 from api.schemas.pulmonary import PulmonaryCreate, PulmonaryRead, PulmonaryUpdate
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.downsampling import Downsampler
+from api.services.pagination import PageParams, paginate
+from api.services.cache_mesures import cache_dernieres_mesures
 
 router = APIRouter(prefix="/pulmonaire", tags=["Fonction Pulmonaire"])
 
@@ -86,6 +89,7 @@ def creer_donnee_pulmonaire(
         db.add(pulmo)
         db.commit()
         db.refresh(pulmo)
+        cache_dernieres_mesures.mettre("pulmonaire", patient.id, pulmo, PulmonaryRead)
 
         print(f"✅ Donnée pulmonaire créée pour patient ID {patient.id}")
         return pulmo
@@ -104,36 +108,45 @@ def derniere_donnee_pulmonaire(
     user: User = Depends(get_current_user)
 ):
     """Récupère la dernière donnée pulmonaire enregistrée pour un patient."""
-    get_patient_or_404(db, patient_id)
+    def charger():
+        get_patient_or_404(db, patient_id)
+
+        data = (
+            db.query(PulmonaryData)
+            .filter(PulmonaryData.patient_id == patient_id)
+            .order_by(desc(PulmonaryData.created_at))
+            .first()
+        )
 
-    data = (
-        db.query(PulmonaryData)
-        .filter(PulmonaryData.patient_id == patient_id)
-        .order_by(desc(PulmonaryData.created_at))
-        .first()
-    )
+        if not data:
+            raise HTTPException(status_code=404, detail="Aucune donnée pulmonaire trouvée.")
+        return data
 
-    if not data:
-        raise HTTPException(status_code=404, detail="Aucune donnée pulmonaire trouvée.")
-    return data
+    return cache_dernieres_mesures.obtenir("pulmonaire", patient_id, charger, PulmonaryRead)
 
 
 # 📜 3️⃣ Historique complet
 @router.get("/{patient_id}", response_model=List[PulmonaryRead])
 def historique_pulmonaire(
     patient_id: int,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Nombre de points pour les graphiques (sous-échantillonnage)"),
+    mode: str = Query("lttb", pattern="^(lttb|minmax)$", description="Méthode : lttb ou minmax"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    """Renvoie tout l’historique pulmonaire du patient."""
+    """Renvoie l’historique pulmonaire du patient (paginé ou sous-échantillonné)."""
     get_patient_or_404(db, patient_id)
 
-    historiques = (
-        db.query(PulmonaryData)
-        .filter(PulmonaryData.patient_id == patient_id)
-        .order_by(desc(PulmonaryData.created_at))
-        .all()
-    )
+    if points:
+        historiques = Downsampler.historique(
+            db, PulmonaryData, patient_id, PulmonaryData.spo2, points=points, mode=mode
+        )
+    else:
+        historiques = paginate(
+            db.query(PulmonaryData).filter(PulmonaryData.patient_id == patient_id),
+            page, PulmonaryData.id, PulmonaryData.created_at, schema=PulmonaryRead,
+        )
 
     if not historiques:
         raise HTTPException(status_code=404, detail="Aucun historique pulmonaire trouvé.")
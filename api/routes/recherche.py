@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from api.database import get_db
+from app.models.user import User
+from api.routes.auth import get_current_user
+from api.services.budget_requetes import BudgetRoute
+from api.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from api.services.recherche import Recherche, decoder_curseur, expression
+
+router = APIRouter(prefix="/recherche", tags=["Recherche"])
+
+
+# 🔎 Recherche plein texte (patients, dossiers, consultations, documents, synthèses)
+@router.get("/", dependencies=[Depends(BudgetRoute(2))])
+def rechercher(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Mots recherchés (préfixes acceptés)"),
+    types: Optional[str] = Query(None, description="Types séparés par des virgules (défaut : tous)"),
+    patient_id: Optional[int] = Query(None, description="Restreindre à un patient"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque de la page suivante"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Taille de page"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    requete = expression(q)
+    if requete is None:
+        raise HTTPException(status_code=400, detail="Recherche vide")
+    try:
+        choisis = Recherche.types(types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        curseur = decoder_curseur(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+    resultats, suivant = Recherche.chercher(db, requete, choisis, limit, curseur, patient_id)
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=suivant, limit=limit)}>; rel="next"'
+    return resultats
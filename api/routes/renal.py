@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from typing import List, Dict, Any
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from api.database import get_db
@@ -9,6 +9,9 @@ from app.models.renal import RenalData
 from app.models.patient import Patient
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.downsampling import Downsampler
+from api.services.pagination import PageParams, paginate
+from api.services.cache_mesures import cache_dernieres_mesures
 from api.schemas.renal import RenalCreate, RenalRead, RenalUpdate
 
 router = APIRouter(prefix="/renal", tags=["Fonction Rénale"])
@@ -77,6 +80,11 @@ def get_patient_or_404(db: Session, patient_id: int) -> Patient:
     return patient
 
 
+# 🧠 Donnée rénale enrichie de son analyse IA
+def _avec_analyse(obj: RenalData) -> Dict[str, Any]:
+    return {**obj.__dict__, **analyse_ia_renale(obj.creatinine, obj.filtration_glomerulaire, getattr(obj, "uree", None))}
+
+
 # 📥 1️⃣ Création d’une donnée rénale
 @router.post("/{patient_id}", response_model=RenalRead)
 def creer_renal(
@@ -106,6 +114,7 @@ def creer_renal(
         db.add(renal)
         db.commit()
         db.refresh(renal)
+        cache_dernieres_mesures.mettre("renale", patient.id, _avec_analyse(renal), RenalRead)
 
         print(f"✅ Donnée rénale créée pour patient ID {patient.id}")
         return renal
@@ -124,40 +133,47 @@ def derniere_donnee_renale(
     user: User = Depends(get_current_user),
 ):
     """Récupère la dernière donnée rénale du patient."""
-    get_patient_or_404(db, patient_id)
+    def charger():
+        get_patient_or_404(db, patient_id)
+
+        obj = (
+            db.query(RenalData)
+            .filter(RenalData.patient_id == patient_id)
+            .order_by(desc(RenalData.created_at))
+            .first()
+        )
 
-    obj = (
-        db.query(RenalData)
-        .filter(RenalData.patient_id == patient_id)
-        .order_by(desc(RenalData.created_at))
-        .first()
-    )
+        if not obj:
+            raise HTTPException(status_code=404, detail="Aucune donnée rénale trouvée.")
 
-    if not obj:
-        raise HTTPException(status_code=404, detail="Aucune donnée rénale trouvée.")
+        return _avec_analyse(obj)
 
-    analyse = analyse_ia_renale(obj.creatinine, obj.filtration_glomerulaire, getattr(obj, "uree", None))
-    return {**obj.__dict__, **analyse}
+    return cache_dernieres_mesures.obtenir("renale", patient_id, charger, RenalRead)
 
 
 # 📜 3️⃣ Historique complet
 @router.get("/{patient_id}", response_model=List[RenalRead])
 def historique_renal(
     patient_id: int,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Nombre de points pour les graphiques (sous-échantillonnage)"),
+    mode: str = Query("lttb", pattern="^(lttb|minmax)$", description="Méthode : lttb ou minmax"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Renvoie l’historique complet des données rénales du patient."""
+    """Renvoie l’historique des données rénales du patient (paginé ou sous-échantillonné)."""
     get_patient_or_404(db, patient_id)
 
-    data = (
-        db.query(RenalData)
-        .filter(RenalData.patient_id == patient_id)
-        .order_by(desc(RenalData.created_at))
-        .all()
-    )
+    if points:
+        data = Downsampler.historique(
+            db, RenalData, patient_id, RenalData.creatinine, points=points, mode=mode
+        )
+        return [_avec_analyse(obj) for obj in data]
 
-    return [{**obj.__dict__, **analyse_ia_renale(obj.creatinine, obj.filtration_glomerulaire, getattr(obj, "uree", None))} for obj in data]
+    return paginate(
+        db.query(RenalData).filter(RenalData.patient_id == patient_id),
+        page, RenalData.id, RenalData.created_at, serialize=_avec_analyse, schema=RenalRead,
+    )
 
 
 # ✏️ 4️⃣ Mise à jour d’une donnée rénale
@@ -8,6 +8,7 @@ from app.models.rendezvous import RendezVous
 from api.schemas.rendezvous import RendezVousCreate, RendezVousRead, RendezVousUpdate
 from app.models.user import User
 from api.routes.auth import get_current_user
+from api.services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/rendezvous", tags=["Rendez-vous"])
 
@@ -42,10 +43,13 @@ def create_rendezvous(
 # 🟣 Liste globale des rendez-vous
 @router.get("/", response_model=List[RendezVousRead])
 def list_rendezvous(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    return db.query(RendezVous).order_by(RendezVous.date_rdv.desc()).all()
+    return paginate(
+        db.query(RendezVous), page, RendezVous.id, RendezVous.date_rdv, schema=RendezVousRead
+    )
 
 
 # 🔵 Liste des rendez-vous d’un patient
@@ -11,6 +11,8 @@ from app.models.patient import Patient
 from app.models.patient_critique import PatientCritique
 from app.models.user import User
 from api.schemas.synthese_ia import SyntheseIACreate, SyntheseIARead, SyntheseIAUpdate
+from api.services.pagination import PageParams, paginate
+from api.services.budget_requetes import BudgetRoute
 
 router = APIRouter(prefix="/synthese-ia", tags=["Synthèse IA"])
 
@@ -23,7 +25,7 @@ def _tags_to_str(tags: Optional[List[str]]) -> Optional[str]:
 
 
 # 🧠 Liste globale de toutes les synthèses IA (vue Aetheris)
-@router.get("/all", response_model=List[SyntheseIARead])
+@router.get("/all", response_model=List[SyntheseIARead], dependencies=[Depends(BudgetRoute(2))])
 def get_all_syntheses(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
@@ -235,19 +237,19 @@ def derniere_synthese(
 
 
 # 📜 Historique complet d’un patient
-@router.get("/{patient_id}", response_model=List[SyntheseIARead])
+@router.get("/{patient_id}", response_model=List[SyntheseIARead], dependencies=[Depends(BudgetRoute(3))])
 def historique_syntheses(
     patient_id: int,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    syntheses = (
-        db.query(SyntheseIA)
-        .filter(SyntheseIA.patient_id == patient_id)
-        .order_by(desc(SyntheseIA.created_at))
-        .all()
+    syntheses = paginate(
+        db.query(SyntheseIA).filter(SyntheseIA.patient_id == patient_id),
+        page, SyntheseIA.id, SyntheseIA.created_at, schema=SyntheseIARead,
     )
-    if not syntheses:
+    # Page vide après un curseur : fin de l'historique, pas une 404
+    if not syntheses and page.cursor is None:
         raise HTTPException(status_code=404, detail="Aucune synthèse trouvée pour ce patient")
     return syntheses
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import func
 from datetime import datetime
 from typing import List, Optional
 
@@ -10,6 +10,7 @@ from app.models.urgence import Urgence
 from app.models.patient import Patient
 from app.models.user import User
 from api.schemas.urgence import UrgenceCreate, UrgenceUpdate, UrgenceRead
+from api.services.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/urgences", tags=["Urgences Médicales"])
 
@@ -78,6 +79,12 @@ def creer_urgence(
     return urgence
 
 
+# ✅ Conversion lisible pour le frontend (Oui/Non)
+def _avec_risque_affiche(u: Urgence) -> Urgence:
+    u.risque_vital_affiche = "Oui" if u.risque_vital else "Non"
+    return u
+
+
 # ============================================================
 # 🔍 2️⃣ Liste ou filtrage des urgences
 # ============================================================
@@ -85,23 +92,21 @@ def creer_urgence(
 def lister_urgences(
     statut: Optional[str] = None,
     niveau_gravite: Optional[str] = None,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Retourne toutes les urgences avec filtres facultatifs (statut, gravité)."""
+    """Retourne les urgences (paginées) avec filtres facultatifs (statut, gravité)."""
     query = db.query(Urgence)
     if statut:
         query = query.filter(Urgence.statut == statut)
     if niveau_gravite:
         query = query.filter(Urgence.niveau_gravite == niveau_gravite)
 
-    urgences = query.order_by(desc(Urgence.date_signalement)).all()
-
-    # ✅ Conversion lisible pour le frontend (Oui/Non)
-    for u in urgences:
-        u.risque_vital_affiche = "Oui" if u.risque_vital else "Non"
-
-    return urgences
+    return paginate(
+        query, page, Urgence.id, Urgence.date_signalement,
+        serialize=_avec_risque_affiche, schema=UrgenceRead,
+    )
 
 
 # ============================================================
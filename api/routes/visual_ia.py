@@ -1,19 +1,19 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
-import os
 from app import models
 from api.database import get_db
 from api.routes.auth import get_current_user
 from app.models.visual_ia import VisualIA
 from api.schemas.visual_ia import VisualIACreate, VisualIAUpdate, VisualIAOut
+from api.services.pagination import PageParams, paginate
+from api.services.stockage import StockageFichiers, OPENAPI_FICHIER
+from api.services.vignettes import Vignettes
 from pydantic import BaseModel, Field
 
-UPLOAD_DIR = "static/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 router = APIRouter(prefix="/modules-ia", tags=["Visual IA"])
 
 # 🧠 Schéma Pydantic pour validation
@@ -38,39 +38,42 @@ def create_visual(
     db.refresh(analyse)
     return analyse
 
-# 📂 Upload fichier lié
-@router.post("/visual/upload", response_model=VisualIAOut)
-def upload_visual(
+# 📂 Upload fichier lié (flux, dédupliqué par contenu)
+@router.post("/visual/upload", response_model=VisualIAOut, openapi_extra=OPENAPI_FICHIER)
+async def upload_visual(
+    request: Request,
     patient_id: int,
     diagnostic: str,
     domaine: str,
-    file: UploadFile = File(...),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
-    file_path = f"{UPLOAD_DIR}/{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+    fichier = await StockageFichiers.televerser(request, db)
+    Vignettes.planifier(fichier)
 
-    analyse = VisualIA(
-        patient_id=patient_id,
-        diagnostic=diagnostic,
-        domaine=domaine,
-        file_path=file.filename,
-        date=datetime.utcnow(),
-    )
-    db.add(analyse)
-    db.commit()
-    db.refresh(analyse)
-    return analyse
+    def enregistrer() -> VisualIA:
+        analyse = VisualIA(
+            patient_id=patient_id,
+            diagnostic=diagnostic,
+            domaine=domaine,
+            file_path=fichier.chemin,
+            date=datetime.utcnow(),
+        )
+        db.add(analyse)
+        db.commit()
+        db.refresh(analyse)
+        return analyse
+
+    return await run_in_threadpool(enregistrer)
 
 # 📋 Liste historique
 @router.get("/visual-history", response_model=List[VisualIAOut])
 def get_history(
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
-    return db.query(VisualIA).order_by(VisualIA.date.desc()).all()
+    return paginate(db.query(VisualIA), page, VisualIA.id, VisualIA.date, schema=VisualIAOut)
 
 # 🔍 Détail par ID
 # 🧠 Route premium : détails enrichis d'une analyse IA visuelle
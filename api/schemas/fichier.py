@@ -0,0 +1,19 @@
+from pydantic import BaseModel, computed_field
+from typing import ClassVar, Optional
+
+from api.services.vignettes import Vignettes
+
+
+# 🖼️ URLs des dérivés d'imagerie (vignette / aperçu), présentes une fois générées
+class DerivesImage(BaseModel):
+    champ_fichier: ClassVar[str] = "fichier_url"
+
+    @computed_field
+    @property
+    def vignette_url(self) -> Optional[str]:
+        return Vignettes.url(getattr(self, self.champ_fichier, None), "vignette")
+
+    @computed_field
+    @property
+    def apercu_url(self) -> Optional[str]:
+        return Vignettes.url(getattr(self, self.champ_fichier, None), "apercu")
@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+from api.schemas.fichier import DerivesImage
+
 
 class ImagerieBase(BaseModel):
     patient_id: int
@@ -24,7 +26,7 @@ class ImagerieUpdate(BaseModel):
     effectue_par: Optional[str] = None
 
 
-class ImagerieRead(ImagerieBase):
+class ImagerieRead(ImagerieBase, DerivesImage):
     id: int
     date_examen: datetime
 
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+# 📦 Export PDF groupé (archive ZIP)
+class ExportGroupeRequest(BaseModel):
+    patient_ids: Optional[List[int]] = None           # liste explicite de patients
+    statut_clinique: Optional[str] = None             # ou filtre : "Stable", "Critique"...
+    niveau_gravite: Optional[str] = None
+    actif: Optional[bool] = None
+    rapport: str = Field("synthese", pattern="^(synthese|analyse)$")
+    limite: int = Field(500, ge=1, le=5000)
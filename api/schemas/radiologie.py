@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+from api.schemas.fichier import DerivesImage
+
 
 class RadiologieBase(BaseModel):
     patient_id: int
@@ -28,7 +30,7 @@ class RadiologieUpdate(BaseModel):
     niveau_risque: Optional[str] = None  # ✅ ajouté aussi ici
 
 
-class RadiologieRead(RadiologieBase):
+class RadiologieRead(RadiologieBase, DerivesImage):
     id: int
     date_examen: datetime
 
@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 
+from api.schemas.fichier import DerivesImage
+
 class VisualIABase(BaseModel):
     patient_id: int
     diagnostic: str
@@ -16,7 +18,9 @@ class VisualIAUpdate(BaseModel):
     domaine: Optional[str] = None
     file_path: Optional[str] = None
 
-class VisualIAOut(VisualIABase):
+class VisualIAOut(VisualIABase, DerivesImage):
+    champ_fichier = "file_path"
+
     id: int
     date: datetime
 
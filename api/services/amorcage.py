@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from api.database import Base, SessionLocal, engine, DATABASE_URL
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Verrou inter-processus de l'amorçage : un par base (workers d'un même nœud)
+AMORCAGE_VERROU = os.getenv(
+    "AMORCAGE_VERROU",
+    os.path.join(tempfile.gettempdir(), f"aetheris-amorcage-{hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]}.lock"),
+)
+# Marqueur écrit par le worker élu : {"pid": ..., "etat": "en_cours" | "fait"}
+AMORCAGE_ETAT = f"{AMORCAGE_VERROU}.etat"
+# Intervalle de scrutation du marqueur par les workers qui attendent l'élu
+AMORCAGE_ATTENTE = 0.2
+
+
+class VerrouFichier:
+    """Verrou exclusif sur un fichier (flock / msvcrt), libéré par le système si le processus meurt."""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self._fichier = None
+
+    def acquerir(self, bloquant: bool = True) -> bool:
+        self._fichier = open(self.chemin, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fichier.fileno(), fcntl.LOCK_EX | (0 if bloquant else fcntl.LOCK_NB))
+                return True
+            self._fichier.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._fichier.fileno(), msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    if not bloquant:
+                        raise
+                    time.sleep(0.1)
+        except OSError:
+            self._fichier.close()
+            self._fichier = None
+            return False
+
+    def liberer(self) -> None:
+        if self._fichier is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fichier.fileno(), fcntl.LOCK_UN)
+        else:
+            self._fichier.seek(0)
+            msvcrt.locking(self._fichier.fileno(), msvcrt.LK_UNLCK, 1)
+        self._fichier.close()
+        self._fichier = None
+
+
+# =============================
+# 🧱 Tâches d'amorçage
+# =============================
+def creer_tables() -> None:
+    from app import models  # noqa: F401  ✅ charge tous les modèles via app/models/__init__.py
+
+    Base.metadata.create_all(bind=engine)
+    # create_all ne touche pas aux tables existantes : index ajoutés depuis à créer à part
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def get_or_create_specialite(db: Session, nom: str):
+    """Créer ou récupérer une spécialité par son nom"""
+    from app.models.specialite import Specialite
+
+    specialite = db.query(Specialite).filter(Specialite.nom == nom).first()
+    if not specialite:
+        specialite = Specialite(nom=nom)
+        db.add(specialite)
+        db.commit()
+        db.refresh(specialite)
+    return specialite
+
+
+def create_default_users() -> None:
+    from app.models.user import User
+    from api.routes.auth import get_password_hash
+
+    db: Session = SessionLocal()
+    try:
+        crees = []
+
+        # ✅ Utilisateur générique
+        default_email = "acces@aetheris.com"
+        user = db.query(User.id).filter(User.email == default_email).first()
+        if not user:
+            default_user = User(
+                nom="Accès",
+                prenom="Générique",
+                email=default_email,
+                hashed_password=get_password_hash("motdepasse123"),
+                role="acces",
+                specialite_id=None,   # pas de spécialité
+                is_active=True,
+                is_verified=True,
+            )
+            db.add(default_user)
+            crees.append(default_email)
+
+        # ✅ Super administrateur
+        admin_email = "superadmin@aetheris.com"
+        admin = db.query(User.id).filter(User.email == admin_email).first()
+        if not admin:
+            spec = get_or_create_specialite(db, "Administration")
+            superadmin = User(
+                nom="Admin",
+                prenom="Suprême",
+                email=admin_email,
+                hashed_password=get_password_hash("admin123"),
+                role="admin",
+                specialite_id=spec.id,  # ✅ relation propre avec la table spécialités
+                is_active=True,
+                is_verified=True,
+            )
+            db.add(superadmin)
+            crees.append(admin_email)
+
+        db.commit()
+        if crees:
+            print(f"✅ Utilisateurs par défaut créés : {', '.join(crees)}")
+
+    finally:
+        db.close()
+
+
+def creer_recherche() -> None:
+    from api.services.recherche import installer_recherche
+
+    installer_recherche()
+
+
+def verifier_index_noms() -> None:
+    from api.services.noms_patients import IndexNoms
+
+    db = SessionLocal()
+    try:
+        IndexNoms.verifier(db)
+    finally:
+        db.close()
+
+
+def completer_dossiers() -> None:
+    from api.services.dossiers_manquants import DossiersManquants
+
+    DossiersManquants.completer()
+
+
+def reconcilier_compteurs() -> None:
+    from api.services.compteurs import Compteurs
+
+    db = SessionLocal()
+    try:
+        Compteurs.reconcilier(db)
+    finally:
+        db.close()
+
+
+def reconstruire_dernieres_mesures() -> None:
+    from api.services.dernieres_mesures import DernieresMesures
+
+    db = SessionLocal()
+    try:
+        DernieresMesures.reconstruire(db)
+    finally:
+        db.close()
+
+
+# Ordre d'exécution : les utilisateurs et les index de recherche supposent les tables créées,
+# les compteurs sont réconciliés une fois toutes les écritures d'amorçage faites
+TACHES: List[Tuple[str, Callable[[], None]]] = [
+    ("tables", creer_tables),
+    ("recherche", creer_recherche),
+    ("index_noms", verifier_index_noms),
+    ("dossiers_manquants", completer_dossiers),
+    ("utilisateurs_defaut", create_default_users),
+    ("compteurs", reconcilier_compteurs),
+    ("dernieres_mesures", reconstruire_dernieres_mesures),
+]
+
+
+class Amorcage:
+    """
+    🚀 Tâches uniques de démarrage (tables, index, comptes par défaut,
+    réconciliation des compteurs, index des dernières mesures).
+    Exécutées par le lifespan de l'application et non plus à l'import de
+    main : importer l'application n'écrit rien en base. Le verrou garantit
+    une seule exécution par processus, même si plusieurs applications sont
+    créées (tests, rechargement).
+    Entre processus (`uvicorn --workers N`), un seul worker est élu : celui
+    qui prend sans attendre le verrou fichier AMORCAGE_VERROU. Il le garde
+    jusqu'à sa sortie, exécute les tâches puis écrit « fait » dans le
+    marqueur AMORCAGE_ETAT. Les autres ne rejouent rien : ils attendent le
+    marqueur. Si l'élu meurt, le premier worker à reprendre le verrou est élu
+    à son tour (tâches idempotentes).
+    """
+
+    _verrou = threading.Lock()
+    _faites: Dict[str, float] = {}
+    _election: Optional[VerrouFichier] = None
+
+    @classmethod
+    def est_elu(cls) -> bool:
+        """Ce processus a exécuté l'amorçage (et porte les tâches périodiques uniques)."""
+        return cls._election is not None
+
+    # -----------------------------
+    # Marqueur de l'élu
+    # -----------------------------
+    @staticmethod
+    def _lire_etat() -> Dict[str, Any]:
+        try:
+            with open(AMORCAGE_ETAT, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _ecrire_etat(etat: str) -> None:
+        temporaire = f"{AMORCAGE_ETAT}.{os.getpid()}"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "etat": etat}, f)
+        os.replace(temporaire, AMORCAGE_ETAT)  # remplacement atomique : jamais lu à moitié écrit
+
+    @staticmethod
+    def _vivant(pid: Any) -> bool:
+        if fcntl is None:
+            return True  # Windows : os.kill(pid, 0) enverrait un signal, le verrou tenu suffit
+        try:
+            os.kill(int(pid), 0)
+        except PermissionError:
+            return True
+        except (OSError, TypeError, ValueError):
+            return False
+        return True
+
+    @classmethod
+    def _fait_ailleurs(cls) -> bool:
+        """Appelé verrou refusé : l'élu en vie a-t-il fini ? (un marqueur d'un ancien élu mort ne compte pas)"""
+        etat = cls._lire_etat()
+        return etat.get("etat") == "fait" and cls._vivant(etat.get("pid"))
+
+    @classmethod
+    def executer(cls) -> Dict[str, float]:
+        """Exécute les tâches pas encore faites (élu) ou attend l'élu ; renvoie leur durée (secondes)."""
+        with cls._verrou:
+            if all(nom in cls._faites for nom, _ in TACHES):
+                return dict(cls._faites)
+
+            attente_signalee = False
+            while cls._election is None:
+                verrou = VerrouFichier(AMORCAGE_VERROU)
+                if verrou.acquerir(bloquant=False):
+                    cls._election = verrou
+                    break
+                if cls._fait_ailleurs():
+                    return {}
+                if not attente_signalee:
+                    print(f"⏳ Amorçage en cours dans un autre worker, attente (pid {os.getpid()})")
+                    attente_signalee = True
+                time.sleep(AMORCAGE_ATTENTE)
+
+            cls._ecrire_etat("en_cours")
+            for nom, tache in TACHES:
+                if nom in cls._faites:
+                    continue
+                debut = time.perf_counter()
+                tache()
+                cls._faites[nom] = time.perf_counter() - debut
+            cls._ecrire_etat("fait")
+            return dict(cls._faites)
@@ -0,0 +1,129 @@
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# off (défaut) | log : signale les routes hors budget | strict : lève BudgetRequetesDepasse (tests)
+BUDGET_REQUETES = os.getenv("BUDGET_REQUETES", "off")
+# Budget des routes qui n'en déclarent pas (0 = illimité)
+BUDGET_REQUETES_DEFAUT = int(os.getenv("BUDGET_REQUETES_DEFAUT", "0"))
+
+
+class BudgetRequetesDepasse(AssertionError):
+    """Une route ou un bloc a émis plus de requêtes SQL que son budget (N+1 probable)."""
+
+
+class CompteurRequetes:
+    """Requêtes SQL émises dans un contexte (requête HTTP ou bloc `with`)."""
+
+    def __init__(self, budget: Optional[int] = None, libelle: str = ""):
+        self.budget = budget
+        self.libelle = libelle
+        self.requetes: List[str] = []
+
+    @property
+    def nombre(self) -> int:
+        return len(self.requetes)
+
+    def depasse(self) -> bool:
+        return bool(self.budget) and self.nombre > self.budget
+
+    def rapport(self) -> str:
+        lignes = "\n".join(f"   {i + 1:3d}. {' '.join(r.split())[:160]}" for i, r in enumerate(self.requetes))
+        return f"{self.libelle} : {self.nombre} requêtes SQL pour un budget de {self.budget}\n{lignes}"
+
+
+# Le contexte suit la requête jusque dans run_in_threadpool (contextvars copiés par anyio)
+_compteur: ContextVar[Optional[CompteurRequetes]] = ContextVar("compteur_requetes", default=None)
+_installe = False
+_verrou = threading.Lock()
+
+
+def _avant_execution(conn, cursor, statement, parameters, context, executemany):
+    compteur = _compteur.get()
+    if compteur is not None:
+        compteur.requetes.append(statement)
+
+
+def installer() -> None:
+    """Écoute toutes les connexions (quel que soit le moteur) ; idempotent."""
+    global _installe
+    with _verrou:
+        if not _installe:
+            event.listen(Engine, "before_cursor_execute", _avant_execution)
+            _installe = True
+
+
+@contextmanager
+def budget_requetes(budget: int, libelle: str = "bloc") -> Iterator[CompteurRequetes]:
+    """
+    Compte les requêtes émises dans le bloc et lève BudgetRequetesDepasse au-delà
+    de `budget`. Pour les tests de services :
+
+        with budget_requetes(2, "timeline"):
+            construire_timeline(db, patient_id)
+    """
+    installer()
+    compteur = CompteurRequetes(budget, libelle)
+    jeton = _compteur.set(compteur)
+    try:
+        yield compteur
+    finally:
+        _compteur.reset(jeton)
+    if compteur.depasse():
+        raise BudgetRequetesDepasse(compteur.rapport())
+
+
+class BudgetRoute:
+    """
+    📏 Dépendance déclarant le budget de requêtes d'une route :
+
+        @router.get("/", dependencies=[Depends(BudgetRoute(3))])
+
+    Sans effet si BUDGET_REQUETES=off. Le budget couvre toute la requête
+    (authentification comprise) et doit rester constant quel que soit le
+    nombre de lignes renvoyées.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+
+    async def __call__(self) -> None:
+        compteur = _compteur.get()
+        if compteur is not None:
+            compteur.budget = self.budget
+
+
+class BudgetRequetesMiddleware:
+    """
+    Ouvre un compteur par requête HTTP et le contrôle une fois la réponse
+    envoyée (flux compris). Activé par BUDGET_REQUETES=log|strict.
+    """
+
+    def __init__(self, app, mode: str = BUDGET_REQUETES):
+        self.app = app
+        self.mode = mode
+        installer()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        compteur = CompteurRequetes(BUDGET_REQUETES_DEFAUT or None)
+        jeton = _compteur.set(compteur)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _compteur.reset(jeton)
+
+        if compteur.depasse():
+            route = scope.get("route")
+            compteur.libelle = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+            if self.mode == "strict":
+                raise BudgetRequetesDepasse(compteur.rapport())
+            print(f"⚠️ Budget de requêtes dépassé — {compteur.rapport()}")
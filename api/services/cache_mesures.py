@@ -0,0 +1,254 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api.services.dernieres_mesures import SYSTEMES
+from api.services.etat_partage import etat_partage
+from app.models import Patient
+
+TAILLE_MAX = int(os.getenv("CACHE_DERNIERES_MESURES_TAILLE", "5000"))
+# Durée de vie d'une entrée : borne la péremption si aucune invalidation n'arrive
+TTL = float(os.getenv("CACHE_DERNIERES_MESURES_TTL", "30"))
+# Canal optionnel d'invalidation poussée entre workers (ex: redis://localhost:6379/0) ;
+# à défaut, chaque succès vérifie le jeton de la clé dans l'état partagé
+INVALIDATION_URL = os.getenv("CACHE_INVALIDATION_URL")
+INVALIDATION_CANAL = os.getenv("CACHE_INVALIDATION_CANAL", "aetheris:dernieres-mesures")
+
+Cle = Tuple[str, int]
+Version = Tuple[datetime, int]  # (created_at, id) de la mesure
+
+_PAR_MODELE = {s.model: nom for nom, s in SYSTEMES.items()}
+
+
+def _version(obj: Any) -> Version:
+    return obj.created_at or datetime.min, obj.id or 0
+
+
+class CacheMesures:
+    """
+    ⚡ Cache LRU borné de la dernière mesure par (fonction vitale, patient).
+    - rempli à la lecture (`obtenir`) et à la création (`mettre`)
+    - invalidé au commit de toute écriture sur les tables de mesures ; les
+      autres workers le voient par le jeton de la clé dans l'état partagé
+      (ou par le canal Redis si CACHE_INVALIDATION_URL est défini)
+    - entrées expirées après TTL secondes dans tous les cas
+    - un succès ne fait aucune requête SQL
+    """
+
+    def __init__(self, taille_max: int = TAILLE_MAX, ttl: float = TTL):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        # clé → (valeur, expiration, jeton partagé lu au remplissage)
+        self._entrees: "OrderedDict[Cle, Tuple[Dict[str, Any], float, Optional[str]]]" = OrderedDict()
+        # Mesure la plus récente connue par clé, conservée après invalidation
+        self._versions: "OrderedDict[Cle, Version]" = OrderedDict()
+        self._verrou = threading.Lock()
+        self._invalidations = 0  # incrémenté à chaque invalidation (anti-écriture périmée)
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self._canal = None
+        self._instance = uuid.uuid4().hex
+
+    # -----------------------------
+    # Lecture / écriture
+    # -----------------------------
+    def _stocker(self, cle: Cle, valeur: Dict[str, Any], jeton: Optional[str]) -> None:
+        self._entrees[cle] = (valeur, time.monotonic() + self.ttl, jeton)
+        self._entrees.move_to_end(cle)
+        while len(self._entrees) > self.taille_max:
+            self._entrees.popitem(last=False)
+            self.evictions += 1
+
+    def _noter(self, cle: Cle, version: Version, forcer: bool = False) -> bool:
+        """Retient `version` si elle n'est pas plus ancienne que la plus récente connue (ou si `forcer`)."""
+        connue = self._versions.get(cle)
+        if not forcer and connue is not None and version < connue:
+            return False
+        self._versions[cle] = version
+        self._versions.move_to_end(cle)
+        while len(self._versions) > self.taille_max:
+            self._versions.popitem(last=False)
+        return True
+
+    @staticmethod
+    def _cle_partagee(cle: Cle) -> str:
+        return f"mesures:{cle[0]}:{cle[1]}"
+
+    def _jeton(self, cle: Cle) -> Optional[str]:
+        """Jeton d'invalidation courant de la clé (None si le canal Redis s'en charge)."""
+        if self._canal is not None:
+            return None
+        return etat_partage().lire(self._cle_partagee(cle))
+
+    def obtenir(
+        self,
+        systeme: str,
+        patient_id: int,
+        charger: Callable[[], Any],
+        schema: Type[BaseModel],
+    ) -> Dict[str, Any]:
+        """Valeur en cache, sinon `charger()` (qui peut lever une 404) puis mise en cache."""
+        cle = (systeme, patient_id)
+        jeton = self._jeton(cle)
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None:
+                valeur, expire, jeton_entree = entree
+                if expire > time.monotonic() and jeton_entree == jeton:
+                    self._entrees.move_to_end(cle)
+                    self.succes += 1
+                    return valeur
+                # Expirée, ou invalidée par un autre worker
+                del self._entrees[cle]
+            self.echecs += 1
+            invalidations = self._invalidations
+
+        mesure = charger()
+        valeur = schema.model_validate(mesure, from_attributes=True).model_dump()
+
+        with self._verrou:
+            # Une écriture a été validée pendant la lecture : on ne met pas en cache.
+            # Sinon la base fait foi, y compris après suppression de la plus récente.
+            if invalidations == self._invalidations:
+                self._noter(cle, _version(mesure), forcer=True)
+                self._stocker(cle, valeur, jeton)
+        return valeur
+
+    def mettre(self, systeme: str, patient_id: int, obj: Any, schema: Type[BaseModel]) -> None:
+        """
+        Écriture directe après création d'une mesure (write-through), sauf si
+        une mesure plus récente du patient est déjà connue : deux créations
+        concurrentes laissent en cache la plus récente, pas la dernière validée.
+        """
+        cle = (systeme, patient_id)
+        try:
+            valeur = schema.model_validate(obj, from_attributes=True).model_dump()
+        except Exception as e:
+            # La mesure est déjà enregistrée : on laisse simplement la clé vide
+            print(f"⚠️ Mise en cache impossible ({systeme}, {patient_id}) : {e}")
+            self.invalider({cle})
+            return
+        with self._verrou:
+            if not self._noter(cle, _version(obj)):
+                return
+        # Le commit vient de publier un nouveau jeton : on le relit pour l'entrée
+        jeton = self._jeton(cle)
+        with self._verrou:
+            if self._versions.get(cle) == _version(obj):
+                self._stocker(cle, valeur, jeton)
+
+    def invalider(self, cles: Set[Cle], publier: bool = True) -> None:
+        if not cles:
+            return
+        with self._verrou:
+            self._invalidations += 1
+            for cle in cles:
+                self._entrees.pop(cle, None)
+        if publier:
+            self._publier(cles)
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._invalidations += 1
+            self._entrees.clear()
+
+    def statistiques(self) -> Dict[str, Any]:
+        total = self.succes + self.echecs
+        return {
+            "entrees": len(self._entrees),
+            "taille_max": self.taille_max,
+            "ttl_secondes": self.ttl,
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux_succes": round(self.succes / total, 3) if total else None,
+            "evictions": self.evictions,
+            "invalidations": self._invalidations,
+            "canal_inter_workers": "redis" if self._canal is not None else etat_partage().nom,
+        }
+
+    # -----------------------------
+    # Invalidation entre workers
+    # -----------------------------
+    def _publier(self, cles: Any) -> None:
+        if self._canal is None:
+            # Nouveau jeton par clé : les entrées des autres workers ne correspondent plus
+            etat = etat_partage()
+            for cle in cles:
+                etat.ecrire(self._cle_partagee(cle), uuid.uuid4().hex, ttl=2 * self.ttl)
+            return
+        try:
+            for systeme, patient_id in cles:
+                self._canal.publish(INVALIDATION_CANAL, f"{self._instance}|{systeme}|{patient_id}")
+        except Exception as e:
+            print(f"⚠️ Publication d'invalidation impossible : {e}")
+
+    def demarrer_invalidation(self, url: Optional[str] = INVALIDATION_URL) -> Optional[threading.Thread]:
+        """Abonne ce worker au canal Redis d'invalidation si CACHE_INVALIDATION_URL est défini."""
+        if not url or self._canal is not None:
+            return None
+        try:
+            import redis
+        except ImportError:
+            print("⚠️ CACHE_INVALIDATION_URL défini mais le paquet 'redis' est absent — cache local uniquement.")
+            return None
+
+        self._canal = redis.Redis.from_url(url)
+        abonnement = self._canal.pubsub(ignore_subscribe_messages=True)
+        abonnement.subscribe(INVALIDATION_CANAL)
+
+        def boucle():
+            for message in abonnement.listen():
+                try:
+                    instance, systeme, patient_id = message["data"].decode().split("|")
+                    if instance != self._instance:
+                        self.invalider({(systeme, int(patient_id))}, publier=False)
+                except Exception as e:
+                    print(f"❌ Message d'invalidation invalide : {e}")
+
+        thread = threading.Thread(target=boucle, name="cache-mesures-invalidation", daemon=True)
+        thread.start()
+        print(f"⚡ Cache des dernières mesures : invalidation partagée sur {INVALIDATION_CANAL}")
+        return thread
+
+
+cache_dernieres_mesures = CacheMesures()
+
+
+# =============================
+# 🪝 Invalidation au commit
+# =============================
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    cles: Set[Cle] = session.info.setdefault("mesures_modifiees", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Patient) and obj in session.deleted:
+            cles.update((systeme, obj.id) for systeme in SYSTEMES)
+            continue
+        systeme = _PAR_MODELE.get(type(obj))
+        if systeme and obj.patient_id is not None:
+            cles.add((systeme, obj.patient_id))
+
+
+def _apres_commit(session: Session) -> None:
+    cache_dernieres_mesures.invalider(session.info.pop("mesures_modifiees", set()))
+
+
+def _apres_rollback(session: Session) -> None:
+    session.info.pop("mesures_modifiees", None)
+
+
+for _nom, _hook in (
+    ("after_flush", _apres_flush),
+    ("after_commit", _apres_commit),
+    ("after_rollback", _apres_rollback),
+):
+    if not event.contains(Session, _nom, _hook):
+        event.listen(Session, _nom, _hook)
@@ -0,0 +1,32 @@
+import os
+import threading
+from typing import Any
+
+
+class ClientOpenAI:
+    """
+    🤖 Client OpenAI partagé, créé à la première utilisation.
+    Le paquet openai (≈ 0,4 s d'import) n'est chargé qu'au premier appel
+    d'une route IA, et l'API démarre même sans OPENAI_API_KEY : seule la
+    route appelée échoue alors.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._verrou = threading.Lock()
+
+    def obtenir(self) -> Any:
+        if self._client is None:
+            with self._verrou:
+                if self._client is None:
+                    from openai import OpenAI
+
+                    self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    def __getattr__(self, nom: str) -> Any:
+        # client.chat.completions.create(...) : délégué au vrai client
+        return getattr(self.obtenir(), nom)
+
+
+client_openai = ClientOpenAI()
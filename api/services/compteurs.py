@@ -0,0 +1,265 @@
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, insert, update
+from sqlalchemy.orm import Session
+
+from api.database import SessionLocal
+from app.models.compteur import Compteur
+from app.models import (
+    Patient,
+    Medecin,
+    Consultation,
+    Diagnostic,
+    RendezVous,
+    User,
+    DemandeCompte,
+    Ambulance,
+    Finance,
+)
+
+Contributions = Dict[str, float]
+
+RECONCILIATION_SECONDES = int(os.getenv("COMPTEURS_RECONCILIATION_SECONDES", "3600"))
+
+
+class _Suivi:
+    """
+    Décrit ce qu'une ligne d'un modèle apporte aux compteurs.
+    - `attributs`     : colonnes dont un changement modifie la contribution
+    - `contributions` : valeurs de la ligne → {clé: contribution}
+    - `recalcul`      : requête SQL de référence (réconciliation)
+    """
+
+    def __init__(
+        self,
+        attributs: Tuple[str, ...],
+        contributions: Callable[[Dict[str, Any]], Contributions],
+        recalcul: Callable[[Session], Contributions],
+    ):
+        self.attributs = attributs
+        self.contributions = contributions
+        self.recalcul = recalcul
+
+
+def _comptage(model: Any, cle: str) -> _Suivi:
+    return _Suivi(
+        (),
+        lambda v: {cle: 1},
+        lambda db: {cle: db.query(func.count(model.id)).scalar() or 0},
+    )
+
+
+def _recalcul_ambulances(db: Session) -> Contributions:
+    valeurs = {"ambulances_total": db.query(func.count(Ambulance.id)).scalar() or 0}
+    for etat, total in db.query(Ambulance.etat, func.count(Ambulance.id)).group_by(Ambulance.etat):
+        valeurs[f"ambulances_etat:{etat}"] = total
+    return valeurs
+
+
+def _recalcul_finance(db: Session) -> Contributions:
+    ht, taxe, ttc = db.query(
+        func.sum(Finance.montant_ht), func.sum(Finance.taxe), func.sum(Finance.montant_total)
+    ).one()
+    return {"finance_montant_ht": ht or 0, "finance_taxe": taxe or 0, "finance_montant_total": ttc or 0}
+
+
+_SUIVIS: Dict[type, _Suivi] = {
+    Patient: _comptage(Patient, "patients_total"),
+    Medecin: _comptage(Medecin, "medecins_total"),
+    Consultation: _comptage(Consultation, "consultations_total"),
+    Diagnostic: _comptage(Diagnostic, "diagnostics_total"),
+    RendezVous: _comptage(RendezVous, "rendezvous_total"),
+    User: _comptage(User, "users_total"),
+    DemandeCompte: _Suivi(
+        ("statut",),
+        lambda v: {"demandes_en_attente": 1 if v["statut"] == "en_attente" else 0},
+        lambda db: {
+            "demandes_en_attente": db.query(func.count(DemandeCompte.id))
+            .filter(DemandeCompte.statut == "en_attente")
+            .scalar() or 0
+        },
+    ),
+    Ambulance: _Suivi(
+        ("etat",),
+        lambda v: {"ambulances_total": 1, f"ambulances_etat:{v['etat']}": 1},
+        _recalcul_ambulances,
+    ),
+    Finance: _Suivi(
+        ("montant_ht", "taxe", "montant_total"),
+        lambda v: {
+            "finance_montant_ht": v["montant_ht"] or 0,
+            "finance_taxe": v["taxe"] or 0,
+            "finance_montant_total": v["montant_total"] or 0,
+        },
+        _recalcul_finance,
+    ),
+}
+
+
+# =============================
+# 🪝 Maintenance incrémentale
+# =============================
+def _valeurs(obj: Any, attributs: Iterable[str], ancien: bool) -> Dict[str, Any]:
+    """Valeurs avant (ancien=True) ou après flush des attributs suivis."""
+    state = inspect(obj)
+    valeurs = {}
+    for attr in attributs:
+        hist = state.attrs[attr].load_history()
+        if ancien:
+            courant = hist.deleted or hist.unchanged
+        else:
+            courant = hist.added or hist.unchanged
+        valeur = courant[0] if courant else None
+
+        # Défaut de colonne pas encore appliqué sur un objet en attente d'INSERT
+        if valeur is None and not ancien and state.pending:
+            colonne = state.mapper.columns[attr]
+            if colonne.default is not None and colonne.default.is_scalar:
+                valeur = colonne.default.arg
+        valeurs[attr] = valeur
+    return valeurs
+
+
+def _ajouter(deltas: Dict[str, float], contributions: Contributions, signe: int) -> None:
+    for cle, valeur in contributions.items():
+        deltas[cle] += signe * float(valeur)
+
+
+def _avant_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    deltas: Dict[str, float] = defaultdict(float)
+
+    for obj in session.new:
+        suivi = _SUIVIS.get(type(obj))
+        if suivi:
+            _ajouter(deltas, suivi.contributions(_valeurs(obj, suivi.attributs, ancien=False)), +1)
+
+    for obj in session.deleted:
+        suivi = _SUIVIS.get(type(obj))
+        if suivi:
+            _ajouter(deltas, suivi.contributions(_valeurs(obj, suivi.attributs, ancien=True)), -1)
+
+    for obj in session.dirty:
+        suivi = _SUIVIS.get(type(obj))
+        if not suivi or not suivi.attributs or not session.is_modified(obj):
+            continue
+        _ajouter(deltas, suivi.contributions(_valeurs(obj, suivi.attributs, ancien=True)), -1)
+        _ajouter(deltas, suivi.contributions(_valeurs(obj, suivi.attributs, ancien=False)), +1)
+
+    deltas = {cle: delta for cle, delta in deltas.items() if delta}
+    if deltas:
+        # Même connexion / même transaction que les écritures métier
+        Compteurs.incrementer(session.connection(), deltas)
+
+
+if not event.contains(Session, "before_flush", _avant_flush):
+    event.listen(Session, "before_flush", _avant_flush)
+
+
+class Compteurs:
+    """
+    📊 Compteurs matérialisés des tableaux de bord (lecture O(1)).
+    Maintenus par le hook `before_flush`, corrigés par `reconcilier`.
+    """
+
+    _reconciliation: Optional[threading.Thread] = None
+    _arret = threading.Event()
+
+    @staticmethod
+    def incrementer(conn: Any, deltas: Contributions) -> None:
+        table = Compteur.__table__
+        maintenant = datetime.utcnow()
+        for cle, delta in deltas.items():
+            res = conn.execute(
+                update(table)
+                .where(table.c.cle == cle)
+                .values(valeur=table.c.valeur + delta, updated_at=maintenant)
+            )
+            if res.rowcount == 0:
+                conn.execute(insert(table).values(cle=cle, valeur=delta, updated_at=maintenant))
+
+    @staticmethod
+    def lire(db: Session, *cles: str) -> Dict[str, float]:
+        """Valeurs des compteurs demandés (0 si jamais calculés)."""
+        lignes = db.query(Compteur.cle, Compteur.valeur).filter(Compteur.cle.in_(cles)).all()
+        valeurs = {cle: 0.0 for cle in cles}
+        valeurs.update({cle: valeur for cle, valeur in lignes})
+        return valeurs
+
+    @staticmethod
+    def _verrouiller(db: Session) -> None:
+        """Prend le verrou d'écriture (SQLite : BEGIN IMMEDIATE ; ailleurs : lignes compteurs FOR UPDATE)."""
+        db.commit()  # transaction précédente de la session terminée : le verrou ouvre la suivante
+        conn = db.connection()
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            db.query(Compteur.cle).with_for_update().all()
+
+    @staticmethod
+    def reconcilier(db: Session) -> Dict[str, Tuple[float, float]]:
+        """
+        Recalcule tous les compteurs par SQL et corrige les écarts
+        (écritures en masse, SQL brut, cascades...). Renvoie {clé: (avant, après)}.
+
+        Recalcul et écriture dans une même transaction d'écriture, ouverte
+        avant les COUNT/SUM : un incrément concurrent attend la fin de la
+        réconciliation et s'applique sur la valeur corrigée au lieu d'être
+        écrasé par elle.
+        """
+        Compteurs._verrouiller(db)
+        attendus: Contributions = {}
+        for suivi in _SUIVIS.values():
+            attendus.update({cle: float(v) for cle, v in suivi.recalcul(db).items()})
+
+        actuels = dict(db.query(Compteur.cle, Compteur.valeur).all())
+        for cle in actuels:
+            attendus.setdefault(cle, 0.0)
+
+        derives = {}
+        maintenant = datetime.utcnow()
+        for cle, valeur in attendus.items():
+            if cle not in actuels:
+                db.add(Compteur(cle=cle, valeur=valeur, updated_at=maintenant))
+                derives[cle] = (0.0, valeur)
+            elif abs(actuels[cle] - valeur) > 1e-6:
+                db.query(Compteur).filter(Compteur.cle == cle).update(
+                    {Compteur.valeur: valeur, Compteur.updated_at: maintenant},
+                    synchronize_session=False,
+                )
+                derives[cle] = (actuels[cle], valeur)
+        db.commit()
+
+        if derives:
+            print(f"📊 Compteurs réconciliés : {len(derives)} écart(s) corrigé(s)")
+        return derives
+
+    @classmethod
+    def demarrer_reconciliation(cls, intervalle: int = RECONCILIATION_SECONDES) -> threading.Thread:
+        """Lance la réconciliation périodique dans un thread démon (un seul par processus)."""
+        if cls._reconciliation is not None and cls._reconciliation.is_alive():
+            return cls._reconciliation
+        cls._arret.clear()
+
+        def boucle():
+            while not cls._arret.wait(intervalle):
+                db = SessionLocal()
+                try:
+                    cls.reconcilier(db)
+                except Exception as e:
+                    db.rollback()
+                    print(f"❌ Erreur réconciliation compteurs : {e}")
+                finally:
+                    db.close()
+
+        cls._reconciliation = threading.Thread(target=boucle, name="compteurs-reconciliation", daemon=True)
+        cls._reconciliation.start()
+        return cls._reconciliation
+
+    @classmethod
+    def arreter_reconciliation(cls) -> None:
+        cls._arret.set()
+        cls._reconciliation = None
@@ -0,0 +1,363 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from api.services.monitoring import Instantane
+from app.models.derniere_mesure import DerniereMesure
+from app.models import (
+    Patient,
+    CardiaqueData,
+    PulmonaryData,
+    RenalData,
+    DigestiveData,
+    MetaboliqueData,
+    NeurologiqueData,
+)
+
+NIVEAUX = ("normal", "alerte", "critique")
+
+# Part minimale de patients à un niveau pour colorer l'organe (/dashboard/human)
+SEUIL_STATUT = 0.10
+
+
+def _sup(v: Optional[float], seuil: float) -> bool:
+    return v is not None and v > seuil
+
+
+def _inf(v: Optional[float], seuil: float) -> bool:
+    return v is not None and v < seuil
+
+
+# =============================
+# 🩺 Niveaux par fonction vitale (mêmes seuils que les analyses IA des routes)
+# =============================
+def _niveau_cardiaque(v: Dict[str, Any]) -> str:
+    fc, sys = v.get("frequence_cardiaque"), v.get("tension_systolique")
+    if _sup(fc, 130) or _inf(fc, 40) or _sup(sys, 180):
+        return "critique"
+    if _sup(fc, 100) or _inf(fc, 50) or _sup(sys, 140):
+        return "alerte"
+    return "normal"
+
+
+def _niveau_pulmonaire(v: Dict[str, Any]) -> str:
+    spo2, fr = v.get("spo2"), v.get("frequence_respiratoire")
+    if _inf(spo2, 88) or _sup(fr, 30):
+        return "critique"
+    if _inf(spo2, 94) or _sup(fr, 24):
+        return "alerte"
+    return "normal"
+
+
+def _niveau_renal(v: Dict[str, Any]) -> str:
+    filtration = v.get("filtration_glomerulaire")
+    if filtration is None:
+        filtration = v.get("dfg")
+    if _inf(filtration, 60):
+        return "critique"
+    if _sup(v.get("creatinine"), 1.3) or _inf(filtration, 80) or _sup(v.get("uree"), 45):
+        return "alerte"
+    return "normal"
+
+
+def _niveau_digestif(v: Dict[str, Any]) -> str:
+    acidite = v.get("acidite")
+    if _inf(acidite, 1):
+        return "critique"
+    inflammation = v.get("inflammation")
+    if _inf(acidite, 2) or _sup(acidite, 8) or _inf(v.get("motricite"), 50) or inflammation not in (None, "", "Aucune"):
+        return "alerte"
+    return "normal"
+
+
+def _niveau_metabolique(v: Dict[str, Any]) -> str:
+    glucose, insuline = v.get("glucose"), v.get("insuline")
+    if (_sup(glucose, 160) and _inf(insuline, 5)) or _sup(glucose, 250) or _inf(glucose, 54):
+        return "critique"
+    if _sup(glucose, 130) or _inf(glucose, 70):
+        return "alerte"
+    return "normal"
+
+
+def _niveau_neurologique(v: Dict[str, Any]) -> str:
+    eeg, stress = v.get("eeg"), v.get("stress_level")
+    if _inf(eeg, 40) or _sup(stress, 85):
+        return "critique"
+    if _inf(eeg, 55) or _sup(stress, 70):
+        return "alerte"
+    return "normal"
+
+
+class _Systeme:
+    """Table source, colonnes recopiées dans `valeurs` et calcul du niveau."""
+
+    def __init__(self, model: Any, colonnes: Tuple[str, ...], niveau: Callable[[Dict[str, Any]], str]):
+        self.model = model
+        self.colonnes = colonnes
+        self.niveau = niveau
+
+
+SYSTEMES: Dict[str, _Systeme] = {
+    "cardiaque": _Systeme(
+        CardiaqueData,
+        ("frequence_cardiaque", "rythme", "tension_systolique", "tension_diastolique"),
+        _niveau_cardiaque,
+    ),
+    "pulmonaire": _Systeme(PulmonaryData, ("spo2", "frequence_respiratoire"), _niveau_pulmonaire),
+    "renale": _Systeme(
+        RenalData, ("creatinine", "uree", "filtration_glomerulaire", "dfg"), _niveau_renal
+    ),
+    "digestive": _Systeme(DigestiveData, ("acidite", "motricite", "inflammation"), _niveau_digestif),
+    "metabolique": _Systeme(
+        MetaboliqueData, ("glucose", "insuline", "cholesterol"), _niveau_metabolique
+    ),
+    "neurologique": _Systeme(
+        NeurologiqueData, ("eeg", "stress_level", "concentration"), _niveau_neurologique
+    ),
+}
+_PAR_MODELE = {s.model: nom for nom, s in SYSTEMES.items()}
+
+
+# =============================
+# 🪝 Maintenance à chaque flush
+# =============================
+def _ligne(systeme: str, source: Any) -> Dict[str, Any]:
+    """Ligne de `dernieres_mesures` pour un objet ORM ou une ligne SQL source."""
+    lire = source.get if isinstance(source, dict) else lambda c: getattr(source, c, None)
+    definition = SYSTEMES[systeme]
+    valeurs = {c: lire(c) for c in definition.colonnes}
+    return {
+        "mesure_id": lire("id"),
+        "mesure_le": lire("created_at"),
+        "valeurs": valeurs,
+        "niveau": definition.niveau(valeurs),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _enregistrer(conn: Any, systeme: str, patient_id: int, ligne: Dict[str, Any], si_plus_recente: bool) -> None:
+    table = DerniereMesure.__table__
+    cle = (table.c.patient_id == patient_id) & (table.c.systeme == systeme)
+    actuelle = conn.execute(select(table.c.mesure_id, table.c.mesure_le).where(cle)).first()
+
+    if actuelle is None:
+        conn.execute(insert(table).values(patient_id=patient_id, systeme=systeme, **ligne))
+        return
+    if si_plus_recente:
+        ancienne = (actuelle.mesure_le or datetime.min, actuelle.mesure_id)
+        nouvelle = (ligne["mesure_le"] or datetime.min, ligne["mesure_id"])
+        if nouvelle < ancienne:
+            return
+    conn.execute(update(table).where(cle).values(**ligne))
+
+
+def _recalculer(conn: Any, systeme: str, patient_id: int) -> None:
+    """Relit la mesure la plus récente (après modification ou suppression)."""
+    model = SYSTEMES[systeme].model
+    source = conn.execute(
+        select(model.__table__)
+        .where(model.patient_id == patient_id)
+        .order_by(model.created_at.desc(), model.id.desc())
+        .limit(1)
+    ).mappings().first()
+
+    if source is None:
+        table = DerniereMesure.__table__
+        conn.execute(
+            delete(table).where((table.c.patient_id == patient_id) & (table.c.systeme == systeme))
+        )
+    else:
+        _enregistrer(conn, systeme, patient_id, _ligne(systeme, dict(source)), si_plus_recente=False)
+
+
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    nouvelles: List[Tuple[str, Any]] = []
+    a_recalculer: Set[Tuple[str, int]] = set()
+    patients_supprimes: Set[int] = set()
+
+    for obj in session.new:
+        systeme = _PAR_MODELE.get(type(obj))
+        if systeme and obj.patient_id is not None:
+            nouvelles.append((systeme, obj))
+
+    for obj in session.dirty:
+        systeme = _PAR_MODELE.get(type(obj))
+        if not systeme or not session.is_modified(obj):
+            continue
+        hist = inspect(obj).attrs.patient_id.history
+        for pid in list(hist.deleted or ()) + [obj.patient_id]:
+            if pid is not None:
+                a_recalculer.add((systeme, pid))
+
+    for obj in session.deleted:
+        if isinstance(obj, Patient):
+            patients_supprimes.add(obj.id)
+            continue
+        systeme = _PAR_MODELE.get(type(obj))
+        if systeme and obj.patient_id is not None:
+            a_recalculer.add((systeme, obj.patient_id))
+
+    if not (nouvelles or a_recalculer or patients_supprimes):
+        return
+
+    # Même connexion / même transaction que les écritures métier
+    conn = session.connection()
+    for systeme, obj in nouvelles:
+        _enregistrer(conn, systeme, obj.patient_id, _ligne(systeme, obj), si_plus_recente=True)
+    for systeme, patient_id in a_recalculer:
+        if patient_id not in patients_supprimes:
+            _recalculer(conn, systeme, patient_id)
+    if patients_supprimes:
+        table = DerniereMesure.__table__
+        conn.execute(delete(table).where(table.c.patient_id.in_(patients_supprimes)))
+
+
+if not event.contains(Session, "after_flush", _apres_flush):
+    event.listen(Session, "after_flush", _apres_flush)
+
+
+# =============================
+# 📊 Synthèses hospitalières
+# =============================
+def _moyenne(lignes: List[Dict[str, Any]], colonne: str, decimales: int = 1) -> Optional[float]:
+    valeurs = [v[colonne] for v in lignes if isinstance(v.get(colonne), (int, float))]
+    return round(sum(valeurs) / len(valeurs), decimales) if valeurs else None
+
+
+def _statut(repartition: Dict[str, int], total: int) -> str:
+    if not total:
+        return "normal"
+    if repartition["critique"] / total >= SEUIL_STATUT:
+        return "critique"
+    if (repartition["critique"] + repartition["alerte"]) / total >= SEUIL_STATUT:
+        return "alerte"
+    return "normal"
+
+
+def _alerte(repartition: Dict[str, int]) -> Optional[str]:
+    if repartition["critique"]:
+        return f"{repartition['critique']} patient(s) en état critique"
+    if repartition["alerte"]:
+        return f"{repartition['alerte']} patient(s) en alerte"
+    return None
+
+
+def _valeur(systeme: str, moyennes: Dict[str, Any]) -> str:
+    """Libellé court pour le schéma du corps humain."""
+    if systeme == "cardiaque" and moyennes.get("frequence") is not None:
+        return f"{moyennes['frequence']:.0f} bpm"
+    if systeme == "pulmonaire" and moyennes.get("spo2") is not None:
+        return f"SpO₂ {moyennes['spo2']:.0f}%"
+    if systeme == "renale" and moyennes.get("creatinine") is not None:
+        return f"Créatinine {moyennes['creatinine']:.2f} mg/dL"
+    if systeme == "digestive" and moyennes.get("acidite") is not None:
+        return f"pH {moyennes['acidite']:.1f}"
+    if systeme == "metabolique" and moyennes.get("glucose") is not None:
+        return f"Glucose {moyennes['glucose'] / 100:.2f} g/L"
+    if systeme == "neurologique" and moyennes.get("eeg") is not None:
+        return f"EEG {moyennes['eeg']:.0f}"
+    return "Aucune donnée"
+
+
+def _moyennes(systeme: str, lignes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Valeurs hospitalières, sous les clés historiques de /dashboard/stats/*."""
+    if systeme == "cardiaque":
+        sys, dia = _moyenne(lignes, "tension_systolique", 0), _moyenne(lignes, "tension_diastolique", 0)
+        rythmes = Counter(v["rythme"] for v in lignes if v.get("rythme"))
+        return {
+            "frequence": _moyenne(lignes, "frequence_cardiaque"),
+            "rythme": rythmes.most_common(1)[0][0] if rythmes else None,
+            "pression": f"{sys:.0f}/{dia:.0f}" if sys is not None and dia is not None else None,
+        }
+    if systeme == "pulmonaire":
+        return {
+            "spo2": _moyenne(lignes, "spo2"),
+            "frequence_respiratoire": _moyenne(lignes, "frequence_respiratoire"),
+        }
+    if systeme == "renale":
+        filtration = _moyenne(lignes, "filtration_glomerulaire")
+        return {
+            "creatinine": _moyenne(lignes, "creatinine", 2),
+            "uree": _moyenne(lignes, "uree"),
+            "debit_filtration": filtration if filtration is not None else _moyenne(lignes, "dfg"),
+        }
+    if systeme == "digestive":
+        return {
+            "acidite": _moyenne(lignes, "acidite"),
+            "motricite": _moyenne(lignes, "motricite"),
+            "inflammation": any(v.get("inflammation") not in (None, "", "Aucune") for v in lignes),
+        }
+    if systeme == "metabolique":
+        return {"glucose": _moyenne(lignes, "glucose"), "insuline": _moyenne(lignes, "insuline")}
+    return {"eeg": _moyenne(lignes, "eeg"), "stress_level": _moyenne(lignes, "stress_level")}
+
+
+def calculer_syntheses(db: Session) -> Dict[str, Any]:
+    """Une lecture de `dernieres_mesures` (une ligne par patient et par fonction)."""
+    par_systeme: Dict[str, List[Tuple[Dict[str, Any], str]]] = {nom: [] for nom in SYSTEMES}
+    for systeme, valeurs, niveau in db.query(
+        DerniereMesure.systeme, DerniereMesure.valeurs, DerniereMesure.niveau
+    ):
+        if systeme in par_systeme:
+            par_systeme[systeme].append((valeurs or {}, niveau))
+
+    syntheses = {}
+    for systeme, lignes in par_systeme.items():
+        repartition = {n: 0 for n in NIVEAUX}
+        for _, niveau in lignes:
+            repartition[niveau if niveau in repartition else "normal"] += 1
+        moyennes = _moyennes(systeme, [v for v, _ in lignes])
+        syntheses[systeme] = {
+            **moyennes,
+            "alerte": _alerte(repartition),
+            "patients": len(lignes),
+            "repartition": repartition,
+            "statut": _statut(repartition, len(lignes)),
+            "valeur": _valeur(systeme, moyennes),
+        }
+    return syntheses
+
+
+class DernieresMesures:
+    """
+    🫀 Index « dernière mesure par patient et par fonction vitale ».
+    Tenu à jour par le hook `after_flush`, reconstruit au démarrage.
+    """
+
+    syntheses = Instantane(calculer_syntheses)
+
+    @classmethod
+    def synthese(cls, systeme: str) -> Dict[str, Any]:
+        synthese = dict(cls.syntheses.lire()[systeme])
+        synthese["genere_le"] = cls.syntheses.genere_le
+        return synthese
+
+    @staticmethod
+    def reconstruire(db: Session) -> int:
+        """Reconstruit tout l'index en une passe par fonction (ROW_NUMBER)."""
+        table = DerniereMesure.__table__
+        db.execute(delete(table))
+
+        total = 0
+        for systeme, definition in SYSTEMES.items():
+            model = definition.model
+            rang = func.row_number().over(
+                partition_by=model.patient_id, order_by=(model.created_at.desc(), model.id.desc())
+            ).label("rang")
+            sub = select(model.__table__, rang).subquery()
+            lignes = [
+                {"patient_id": row["patient_id"], "systeme": systeme, **_ligne(systeme, dict(row))}
+                for row in db.execute(select(sub).where(sub.c.rang == 1)).mappings()
+                if row["patient_id"] is not None
+            ]
+            if lignes:
+                db.execute(insert(table), lignes)
+                total += len(lignes)
+
+        db.commit()
+        DernieresMesures.syntheses.invalider()
+        print(f"🫀 Index des dernières mesures reconstruit : {total} ligne(s)")
+        return total
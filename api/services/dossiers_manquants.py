@@ -0,0 +1,64 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import exists, false, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from api.database import engine
+from app.models.patient import Patient
+from app.models.dossier_medical import DossierMedical
+
+NON_RENSEIGNE = "Non renseigné"
+log = logging.getLogger("startup")  # s'affiche dans uvicorn
+
+
+class DossiersManquants:
+    """
+    🗂️ Création des dossiers médicaux des patients qui n'en ont pas, en une
+    seule instruction INSERT … SELECT … WHERE NOT EXISTS : idempotente (une
+    seconde exécution n'insère rien), quel que soit le nombre de patients.
+    Exécutée pour chaque nouveau patient (POST /patients, même transaction
+    que ses constantes initiales), puis en rattrapage à l'amorçage et à la
+    demande (POST /admin/dossiers/completer) pour les imports hors API ;
+    les lectures de /dossiers ne créent plus rien.
+    """
+
+    @staticmethod
+    def _instruction(patient_id: Optional[int] = None):
+        maintenant = datetime.utcnow()
+        sans_dossier = ~exists().where(DossierMedical.patient_id == Patient.id)
+        valeurs = select(
+            Patient.id,
+            "Dossier automatique du patient "
+            + func.coalesce(Patient.prenom, "") + " " + func.coalesce(Patient.nom, ""),
+            literal(NON_RENSEIGNE),
+            literal(NON_RENSEIGNE),
+            literal(NON_RENSEIGNE),
+            literal("Créé automatiquement par le système Aetheris IA."),
+            literal("actif"),
+            false(),
+            literal(maintenant),
+            literal(maintenant),
+        ).where(sans_dossier)
+        if patient_id is not None:
+            valeurs = valeurs.where(Patient.id == patient_id)
+        colonnes = [
+            "patient_id", "resume", "antecedents", "traitements", "allergies", "notes",
+            "statut", "est_critique", "created_at", "updated_at",
+        ]
+        return insert(DossierMedical).from_select(colonnes, valeurs, include_defaults=False)
+
+    @classmethod
+    def creer(cls, db: Session, patient_id: int) -> None:
+        """Dossier d'un patient qui vient d'être créé ; validé avec la transaction de `db`."""
+        db.execute(cls._instruction(patient_id))
+
+    @classmethod
+    def completer(cls) -> int:
+        """Nombre de dossiers créés."""
+        with engine.begin() as conn:
+            crees = conn.execute(cls._instruction()).rowcount
+        if crees:
+            log.info("🗂️ Dossiers médicaux créés pour %d patient(s) sans dossier", crees)
+        return crees
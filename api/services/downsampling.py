@@ -0,0 +1,162 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+
+class Downsampler:
+    """
+    📉 Réduction serveur des séries temporelles de constantes vitales.
+    - LTTB (Largest-Triangle-Three-Buckets) : conserve la forme visuelle
+    - Enveloppe min/max : conserve les extrêmes de chaque intervalle
+    """
+
+    MODES = ("lttb", "minmax")
+
+    @staticmethod
+    def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+        """Renvoie les indices des points retenus par l'algorithme LTTB."""
+        n = len(x)
+        if threshold >= n:
+            return np.arange(n)
+        if threshold < 3:
+            return np.array([0, n - 1][:max(threshold, 1)], dtype=np.int64)
+
+        every = (n - 2) / (threshold - 2)
+        edges = (np.floor(np.arange(threshold - 1) * every) + 1).astype(np.int64)
+        edges[-1] = n - 1
+
+        sampled = np.empty(threshold, dtype=np.int64)
+        sampled[0], sampled[-1] = 0, n - 1
+        a = 0
+
+        for i in range(threshold - 2):
+            start, end = edges[i], edges[i + 1]
+            # Intervalle suivant (le dernier point pour le dernier intervalle)
+            if i + 2 < len(edges):
+                next_start, next_end = edges[i + 1], edges[i + 2]
+            else:
+                next_start, next_end = n - 1, n
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+
+            bx, by = x[start:end], y[start:end]
+            area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+            a = start + int(np.argmax(area))
+            sampled[i + 1] = a
+
+        return sampled
+
+    @staticmethod
+    def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+        """Renvoie le min et le max de chaque intervalle, plus les extrémités."""
+        n = len(y)
+        if threshold >= n:
+            return np.arange(n)
+        if threshold < 4:
+            # Trop peu de points pour un couple min/max : extrémités, plus l'extremum le plus marqué
+            picked = [0, n - 1][:max(threshold, 1)]
+            if threshold == 3:
+                interieur = y[1:n - 1]
+                bas, haut = int(np.argmin(interieur)), int(np.argmax(interieur))
+                ecart_bas = abs(interieur[bas] - np.median(interieur))
+                ecart_haut = abs(interieur[haut] - np.median(interieur))
+                picked.append(1 + (bas if ecart_bas > ecart_haut else haut))
+            return np.unique(np.asarray(picked, dtype=np.int64))
+
+        buckets = np.array_split(np.arange(1, n - 1), (threshold - 2) // 2)
+        picked = [0, n - 1]
+        for bucket in buckets:
+            if len(bucket):
+                values = y[bucket]
+                picked.append(bucket[int(np.argmin(values))])
+                picked.append(bucket[int(np.argmax(values))])
+        return np.unique(np.asarray(picked, dtype=np.int64))
+
+    @classmethod
+    def indices(cls, x: np.ndarray, y: np.ndarray, points: int, mode: str = "lttb") -> np.ndarray:
+        if mode == "minmax":
+            return cls.minmax_indices(y, points)
+        return cls.lttb_indices(x, y, points)
+
+    # =======================
+    # 🗄️ Historique SQL
+    # =======================
+    @classmethod
+    def historique(
+        cls,
+        db: Session,
+        model: Any,
+        patient_id: int,
+        value_column: Any,
+        points: Optional[int] = None,
+        mode: str = "lttb",
+    ) -> List[Any]:
+        """
+        Historique d'un patient (du plus récent au plus ancien).
+        Si `points` est fourni, seules les colonnes (id, date, valeur) sont
+        lues pour choisir les points, puis seules les lignes retenues sont chargées.
+        """
+        base = db.query(model).filter(model.patient_id == patient_id)
+        if not points:
+            return base.order_by(desc(model.created_at)).all()
+
+        series = (
+            db.query(model.id, model.created_at, value_column)
+            .filter(model.patient_id == patient_id)
+            .order_by(model.created_at, model.id)
+            .all()
+        )
+        if len(series) <= points:
+            return base.order_by(desc(model.created_at)).all()
+
+        ids = np.fromiter((row[0] for row in series), dtype=np.int64, count=len(series))
+        x = np.array(
+            [row[1].timestamp() if row[1] else np.nan for row in series], dtype=np.float64
+        )
+        y = np.array(
+            [row[2] if row[2] is not None else np.nan for row in series], dtype=np.float64
+        )
+        x = cls._combler(x, fallback=np.arange(len(x), dtype=np.float64))
+        y = cls._combler(y, fallback=np.zeros(len(y)))
+
+        keep = ids[cls.indices(x, y, points, mode)].tolist()
+        return base.filter(model.id.in_(keep)).order_by(desc(model.created_at)).all()
+
+    @classmethod
+    def serie(
+        cls,
+        db: Session,
+        model: Any,
+        patient_id: int,
+        value_column: Any,
+        points: int,
+        mode: str = "lttb",
+    ) -> List[Tuple[datetime, float]]:
+        """Série (date, valeur) chronologique réduite à `points` points, sans charger les lignes."""
+        series = (
+            db.query(model.created_at, value_column)
+            .filter(model.patient_id == patient_id, model.created_at.isnot(None), value_column.isnot(None))
+            .order_by(model.created_at, model.id)
+            .all()
+        )
+        if len(series) <= points:
+            return [(t, float(v)) for t, v in series]
+
+        x = np.array([row[0].timestamp() for row in series], dtype=np.float64)
+        y = np.array([row[1] for row in series], dtype=np.float64)
+        return [(series[i][0], float(y[i])) for i in cls.indices(x, y, points, mode)]
+
+    @staticmethod
+    def _combler(values: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+        """Interpole les valeurs manquantes (NaN) pour ne pas exclure la ligne."""
+        mask = np.isnan(values)
+        if not mask.any():
+            return values
+        if mask.all():
+            return fallback
+        idx = np.arange(len(values))
+        values[mask] = np.interp(idx[mask], idx[~mask], values[~mask])
+        return values
@@ -0,0 +1,208 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# memoire:// (défaut, un seul worker) | sqlite:///chemin.db (workers d'un même nœud) | redis://hote:6379/0 (plusieurs nœuds)
+ETAT_PARTAGE_URL = os.getenv("ETAT_PARTAGE_URL", "memoire://")
+ETAT_PARTAGE_PREFIXE = os.getenv("ETAT_PARTAGE_PREFIXE", "aetheris:")
+
+
+class EtatPartage:
+    """
+    🗃️ Clé → valeur JSON avec expiration, partagée entre workers.
+    Interface commune aux trois backends : ce que les caches, limiteurs et
+    registres de tâches doivent voir identique quel que soit le worker qui
+    reçoit la requête.
+    """
+
+    nom = "abstrait"
+
+    def lire(self, cle: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def ecrire(self, cle: str, valeur: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def supprimer(self, cle: str) -> None:
+        raise NotImplementedError
+
+    def incrementer(self, cle: str, ttl: float) -> int:
+        """Incrément atomique ; l'expiration est fixée à la création (fenêtre fixe)."""
+        raise NotImplementedError
+
+
+class EtatMemoire(EtatPartage):
+    """Dans le processus : comportement historique, non partagé entre workers."""
+
+    nom = "memoire"
+
+    def __init__(self):
+        self._entrees: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._verrou = threading.Lock()
+        self._ecritures = 0
+
+    def _vivante(self, cle: str, maintenant: float) -> Optional[Tuple[Any, Optional[float]]]:
+        entree = self._entrees.get(cle)
+        if entree is not None and entree[1] is not None and entree[1] <= maintenant:
+            del self._entrees[cle]
+            return None
+        return entree
+
+    def _purger(self, maintenant: float) -> None:
+        self._ecritures += 1
+        if self._ecritures % 1000 == 0:
+            for cle in [c for c, (_, expire) in self._entrees.items() if expire is not None and expire <= maintenant]:
+                del self._entrees[cle]
+
+    def lire(self, cle: str) -> Optional[Any]:
+        with self._verrou:
+            entree = self._vivante(cle, time.time())
+            return json.loads(entree[0]) if entree is not None else None
+
+    def ecrire(self, cle: str, valeur: Any, ttl: Optional[float] = None) -> None:
+        maintenant = time.time()
+        with self._verrou:
+            self._entrees[cle] = (json.dumps(valeur), maintenant + ttl if ttl else None)
+            self._purger(maintenant)
+
+    def supprimer(self, cle: str) -> None:
+        with self._verrou:
+            self._entrees.pop(cle, None)
+
+    def incrementer(self, cle: str, ttl: float) -> int:
+        maintenant = time.time()
+        with self._verrou:
+            entree = self._vivante(cle, maintenant)
+            valeur = json.loads(entree[0]) + 1 if entree is not None else 1
+            self._entrees[cle] = (json.dumps(valeur), entree[1] if entree is not None else maintenant + ttl)
+            self._purger(maintenant)
+            return valeur
+
+
+class EtatSQLite(EtatPartage):
+    """
+    Fichier SQLite (WAL) partagé par les workers d'un même nœud.
+    Une connexion par thread ; les écritures sont sérialisées par SQLite.
+    """
+
+    nom = "sqlite"
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        dossier = os.path.dirname(os.path.abspath(chemin))
+        os.makedirs(dossier, exist_ok=True)
+        self._local = threading.local()
+        self._ecritures = 0
+        conn = self._connexion()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS etat (cle TEXT PRIMARY KEY, valeur TEXT NOT NULL, expire REAL)")
+
+    def _connexion(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.chemin, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _purger(self, conn: sqlite3.Connection, maintenant: float) -> None:
+        self._ecritures += 1
+        if self._ecritures % 1000 == 0:
+            conn.execute("DELETE FROM etat WHERE expire IS NOT NULL AND expire <= ?", (maintenant,))
+
+    def lire(self, cle: str) -> Optional[Any]:
+        ligne = self._connexion().execute(
+            "SELECT valeur FROM etat WHERE cle = ? AND (expire IS NULL OR expire > ?)", (cle, time.time())
+        ).fetchone()
+        return json.loads(ligne[0]) if ligne is not None else None
+
+    def ecrire(self, cle: str, valeur: Any, ttl: Optional[float] = None) -> None:
+        maintenant = time.time()
+        conn = self._connexion()
+        conn.execute(
+            "INSERT OR REPLACE INTO etat (cle, valeur, expire) VALUES (?, ?, ?)",
+            (cle, json.dumps(valeur), maintenant + ttl if ttl else None),
+        )
+        self._purger(conn, maintenant)
+
+    def supprimer(self, cle: str) -> None:
+        self._connexion().execute("DELETE FROM etat WHERE cle = ?", (cle,))
+
+    def incrementer(self, cle: str, ttl: float) -> int:
+        maintenant = time.time()
+        conn = self._connexion()
+        # Une seule instruction : atomique entre processus (clé expirée = nouvelle fenêtre)
+        (valeur,) = conn.execute(
+            """
+            INSERT INTO etat (cle, valeur, expire) VALUES (?, '1', ?)
+            ON CONFLICT(cle) DO UPDATE SET
+                valeur = CASE WHEN expire IS NOT NULL AND expire <= ? THEN '1' ELSE CAST(valeur AS INTEGER) + 1 END,
+                expire = CASE WHEN expire IS NOT NULL AND expire <= ? THEN excluded.expire ELSE expire END
+            RETURNING valeur
+            """,
+            (cle, maintenant + ttl, maintenant, maintenant),
+        ).fetchone()
+        self._purger(conn, maintenant)
+        return int(valeur)
+
+
+class EtatRedis(EtatPartage):
+    """Serveur parlant le protocole Redis (Redis, Valkey, KeyDB…) : partagé entre nœuds."""
+
+    nom = "redis"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def lire(self, cle: str) -> Optional[Any]:
+        valeur = self._client.get(ETAT_PARTAGE_PREFIXE + cle)
+        return json.loads(valeur) if valeur is not None else None
+
+    def ecrire(self, cle: str, valeur: Any, ttl: Optional[float] = None) -> None:
+        self._client.set(ETAT_PARTAGE_PREFIXE + cle, json.dumps(valeur), px=int(ttl * 1000) if ttl else None)
+
+    def supprimer(self, cle: str) -> None:
+        self._client.delete(ETAT_PARTAGE_PREFIXE + cle)
+
+    def incrementer(self, cle: str, ttl: float) -> int:
+        cle = ETAT_PARTAGE_PREFIXE + cle
+        pipe = self._client.pipeline()
+        pipe.set(cle, 0, px=int(ttl * 1000), nx=True)  # ouvre la fenêtre si la clé n'existe pas
+        pipe.incr(cle)
+        return int(pipe.execute()[1])
+
+
+def ouvrir(url: str) -> EtatPartage:
+    if url.startswith("memoire://"):
+        return EtatMemoire()
+    if url.startswith("sqlite:///"):
+        return EtatSQLite(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return EtatRedis(url)
+        except ImportError:
+            print("⚠️ ETAT_PARTAGE_URL redis mais le paquet 'redis' est absent — état local uniquement.")
+            return EtatMemoire()
+    raise ValueError(f"ETAT_PARTAGE_URL non reconnue : {url}")
+
+
+_etat: Optional[EtatPartage] = None
+_verrou = threading.Lock()
+
+
+def etat_partage() -> EtatPartage:
+    """Backend configuré par ETAT_PARTAGE_URL, ouvert au premier usage."""
+    global _etat
+    if _etat is None:
+        with _verrou:
+            if _etat is None:
+                _etat = ouvrir(ETAT_PARTAGE_URL)
+                if _etat.nom != "memoire":
+                    print(f"🗃️ État partagé : {_etat.nom}")
+    return _etat
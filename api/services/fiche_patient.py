@@ -0,0 +1,162 @@
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload, lazyload
+
+from api.services.cache_mesures import cache_dernieres_mesures
+from app.models import (
+    Patient,
+    CardiaqueData,
+    PulmonaryData,
+    RenalData,
+    DigestiveData,
+    MetaboliqueData,
+    NeurologiqueData,
+)
+from app.models.analyse_ia import AnalyseIA
+from app.models.document import Document
+from app.models.notification import Notification
+from app.models.rendezvous import RendezVous
+from app.models.synthese_ia import SyntheseIA
+from api.schemas.patient import PatientRead
+from api.schemas.dossier_medical import DossierMedicalRead
+from api.schemas.cardiaque import CardiaqueRead
+from api.schemas.pulmonary import PulmonaryRead
+from api.schemas.renal import RenalRead
+from api.schemas.digestive import DigestiveRead
+from api.schemas.metabolique import MetaboliqueRead
+from api.schemas.neurologique import NeurologiqueRead
+from api.schemas.synthese_ia import SyntheseIARead
+from api.schemas.analyse_ia import AnalyseIARead
+from api.schemas.rendezvous import RendezVousRead
+from api.schemas.document import DocumentRead
+from api.schemas.notification import NotificationRead
+
+# Nombre maximal d'éléments par liste de la fiche (les plus récents)
+FICHE_PATIENT_LIMITE = int(os.getenv("FICHE_PATIENT_LIMITE", "20"))
+
+# Dernière mesure par fonction vitale : mêmes clés de cache et schémas que les routes /{systeme}/{id}/latest
+MESURES = {
+    "cardiaque": (CardiaqueData, CardiaqueRead),
+    "pulmonaire": (PulmonaryData, PulmonaryRead),
+    "renale": (RenalData, RenalRead),
+    "digestive": (DigestiveData, DigestiveRead),
+    "metabolique": (MetaboliqueData, MetaboliqueRead),
+    "neurologique": (NeurologiqueData, NeurologiqueRead),
+}
+
+
+class _Absente(Exception):
+    """Aucune mesure pour ce système : rien à mettre en cache."""
+
+
+def _lire(schema: type, objets: List[Any]) -> List[Dict[str, Any]]:
+    return [schema.model_validate(o, from_attributes=True).model_dump() for o in objets]
+
+
+def _recents(db: Session, model: Any, patient_id: int, date: Any, limite: int) -> List[Any]:
+    """Les `limite` lignes les plus récentes du patient, sans les chargements joined du modèle."""
+    return (
+        db.query(model)
+        .options(lazyload("*"))
+        .filter(model.patient_id == patient_id)
+        .order_by(desc(date), desc(model.id))
+        .limit(limite)
+        .all()
+    )
+
+
+# =============================
+# 🧩 Sections
+# =============================
+def _mesures(db: Session, patient: Patient, limite: int) -> Dict[str, Optional[Dict[str, Any]]]:
+    mesures = {}
+    for systeme, (model, schema) in MESURES.items():
+        def charger(model=model):
+            mesure = (
+                db.query(model)
+                .filter(model.patient_id == patient.id)
+                .order_by(desc(model.created_at), desc(model.id))
+                .first()
+            )
+            if mesure is None:
+                raise _Absente()
+            return mesure
+
+        try:
+            mesures[systeme] = cache_dernieres_mesures.obtenir(systeme, patient.id, charger, schema)
+        except _Absente:
+            mesures[systeme] = None
+    return mesures
+
+
+def _hospitalisations(db: Session, patient: Patient, limite: int) -> List[Any]:
+    from api.routes.hospitalisation import build_hospitalisation_read, requete_lecture
+    from app.models.hospitalisation import Hospitalisation
+
+    lignes = (
+        requete_lecture(db)
+        .filter(Hospitalisation.patient_id == patient.id)
+        .order_by(desc(Hospitalisation.date_entree), desc(Hospitalisation.id))
+        .limit(limite)
+        .all()
+    )
+    return [build_hospitalisation_read(h).model_dump() for h in lignes]
+
+
+SECTIONS: Dict[str, Callable[[Session, Patient, int], Any]] = {
+    "patient": lambda db, p, n: PatientRead.model_validate(p, from_attributes=True).model_dump(),
+    "dossier": lambda db, p, n: (
+        DossierMedicalRead.model_validate(p.dossier_medical, from_attributes=True).model_dump()
+        if p.dossier_medical else None
+    ),
+    "mesures": _mesures,
+    "syntheses": lambda db, p, n: _lire(SyntheseIARead, _recents(db, SyntheseIA, p.id, SyntheseIA.created_at, n)),
+    "analyses": lambda db, p, n: _lire(AnalyseIARead, _recents(db, AnalyseIA, p.id, AnalyseIA.created_at, n)),
+    "rendezvous": lambda db, p, n: _lire(RendezVousRead, _recents(db, RendezVous, p.id, RendezVous.date_rdv, n)),
+    "hospitalisations": _hospitalisations,
+    "documents": lambda db, p, n: _lire(DocumentRead, _recents(db, Document, p.id, Document.created_at, n)),
+    "notifications": lambda db, p, n: _lire(
+        NotificationRead, _recents(db, Notification, p.id, Notification.created_at, n)
+    ),
+}
+
+
+class FichePatient:
+    """
+    🗂️ Fiche patient agrégée : ce que l'ouverture d'un patient demandait en
+    15 requêtes HTTP, en une seule réponse. Une requête SQL par section
+    (patient et dossier joints), listes bornées aux plus récents, dernières
+    mesures servies par le cache des routes /latest.
+    """
+
+    @staticmethod
+    def sections(selection: Optional[str]) -> List[str]:
+        """`sections=patient,mesures` → liste validée (défaut : toutes, dans l'ordre de SECTIONS)."""
+        if not selection:
+            return list(SECTIONS)
+        demandees = [s.strip() for s in selection.split(",") if s.strip()]
+        inconnues = [s for s in demandees if s not in SECTIONS]
+        if inconnues:
+            raise ValueError(
+                f"Section(s) inconnue(s) : {', '.join(inconnues)} — disponibles : {', '.join(SECTIONS)}"
+            )
+        return [s for s in SECTIONS if s in demandees]
+
+    @staticmethod
+    def construire(
+        db: Session, patient_id: int, sections: List[str], limite: int = FICHE_PATIENT_LIMITE
+    ) -> Optional[Dict[str, Any]]:
+        """None si le patient n'existe pas."""
+        requete = db.query(Patient).options(lazyload("*"))
+        if "dossier" in sections:
+            requete = requete.options(joinedload(Patient.dossier_medical).lazyload("*"))
+        patient = requete.filter(Patient.id == patient_id).first()
+        if patient is None:
+            return None
+
+        fiche: Dict[str, Any] = {"patient_id": patient_id}
+        for nom in sections:
+            fiche[nom] = SECTIONS[nom](db, patient, limite)
+        return fiche
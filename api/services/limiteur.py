@@ -0,0 +1,55 @@
+import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+from api.services.etat_partage import EtatPartage, etat_partage
+
+AUTH_TENTATIVES_MAX = int(os.getenv("AUTH_TENTATIVES_MAX", "10"))
+AUTH_TENTATIVES_FENETRE = int(os.getenv("AUTH_TENTATIVES_FENETRE_SECONDES", "300"))
+
+
+class LimiteurDebit:
+    """
+    🚦 Limiteur à fenêtre fixe adossé à l'état partagé.
+    Le compteur vit dans ETAT_PARTAGE_URL : avec sqlite ou redis, la limite
+    vaut pour l'ensemble des workers et non pour chacun.
+    """
+
+    def __init__(self, espace: str, limite: int, fenetre: int, etat: Optional[EtatPartage] = None):
+        self.espace = espace
+        self.limite = limite
+        self.fenetre = fenetre
+        self._etat = etat
+
+    @property
+    def etat(self) -> EtatPartage:
+        return self._etat or etat_partage()
+
+    def _cle(self, identifiant: str) -> str:
+        # Clé datée par fenêtre : une nouvelle fenêtre repart de zéro sans dépendre des horloges des workers
+        return f"limite:{self.espace}:{int(time.time() // self.fenetre)}:{identifiant}"
+
+    def compter(self, identifiant: str) -> int:
+        return self.etat.incrementer(self._cle(identifiant), self.fenetre)
+
+    def depasse(self, identifiant: str) -> bool:
+        return (self.etat.lire(self._cle(identifiant)) or 0) >= self.limite
+
+    def verifier(self, identifiant: str) -> None:
+        """429 + Retry-After si la limite de la fenêtre courante est atteinte."""
+        if self.depasse(identifiant):
+            reste = self.fenetre - int(time.time() % self.fenetre)
+            raise HTTPException(
+                status_code=429,
+                detail="Trop de tentatives, réessayez plus tard",
+                headers={"Retry-After": str(reste)},
+            )
+
+    def reinitialiser(self, identifiant: str) -> None:
+        self.etat.supprimer(self._cle(identifiant))
+
+
+# Échecs de connexion par (IP du client, email)
+limiteur_connexions = LimiteurDebit("connexion", AUTH_TENTATIVES_MAX, AUTH_TENTATIVES_FENETRE)
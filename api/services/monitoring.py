@@ -0,0 +1,145 @@
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from api.database import SessionLocal
+from app.models.patient import Patient
+from app.models.cardiaque import CardiaqueData
+from app.models.pulmonary import PulmonaryData
+from app.models.analyse_ia import AnalyseIA
+from app.models.notification import Notification
+
+SNAPSHOT_TTL_SECONDES = float(os.getenv("MONITORING_SNAPSHOT_TTL_SECONDES", "30"))
+
+
+class Instantane:
+    """
+    🕒 Agrégat calculé en SQL, gardé en mémoire et rafraîchi au plus
+    toutes les `ttl` secondes. Un seul calcul à la fois : pendant un
+    rafraîchissement, les autres appels reçoivent la version précédente.
+    """
+
+    def __init__(self, calcul: Callable[[Session], Optional[Dict[str, Any]]], ttl: float = SNAPSHOT_TTL_SECONDES):
+        self.calcul = calcul
+        self.ttl = ttl
+        self.valeur: Optional[Dict[str, Any]] = None
+        self.genere_le: Optional[datetime] = None
+        self._verrou = threading.Lock()
+
+    def age(self) -> float:
+        if self.genere_le is None:
+            return float("inf")
+        return (datetime.utcnow() - self.genere_le).total_seconds()
+
+    def rafraichir(self) -> None:
+        db = SessionLocal()
+        try:
+            self.valeur = self.calcul(db)
+            self.genere_le = datetime.utcnow()
+        finally:
+            db.close()
+
+    def lire(self) -> Optional[Dict[str, Any]]:
+        if self.age() < self.ttl:
+            return self.valeur
+        # Premier calcul : on attend. Ensuite : on sert la valeur précédente
+        bloquant = self.genere_le is None
+        if self._verrou.acquire(blocking=bloquant):
+            try:
+                if self.age() >= self.ttl:
+                    self.rafraichir()
+            finally:
+                self._verrou.release()
+        return self.valeur
+
+    def invalider(self) -> None:
+        self.genere_le = None
+
+
+# =============================
+# 🩺 Surveillance globale
+# =============================
+def _derniere_valeur(model: Any, colonne: Any):
+    """Sous-requête : dernière valeur de `colonne` par patient (ROW_NUMBER)."""
+    rang = func.row_number().over(
+        partition_by=model.patient_id, order_by=(model.created_at.desc(), model.id.desc())
+    ).label("rang")
+    sub = select(model.patient_id.label("patient_id"), colonne.label("valeur"), rang).subquery()
+    return select(sub.c.patient_id, sub.c.valeur).where(sub.c.rang == 1).subquery()
+
+
+def calculer_monitoring(db: Session) -> Optional[Dict[str, Any]]:
+    cardio = _derniere_valeur(CardiaqueData, CardiaqueData.frequence_cardiaque)
+    pulmo = _derniere_valeur(PulmonaryData, PulmonaryData.spo2)
+
+    hr = func.coalesce(cardio.c.valeur, Patient.rythme_cardiaque)
+    spo2 = func.coalesce(pulmo.c.valeur, Patient.spo2)
+    temp = Patient.temperature
+
+    anormal = or_(
+        spo2 < 94,
+        hr > 100,
+        hr < 50,
+        temp >= 38,
+        temp < 35,
+    )
+
+    total, spo2_moy, hr_moy, temp_moy, anomalies = (
+        db.query(
+            func.count(Patient.id),
+            func.avg(spo2),
+            func.avg(hr),
+            func.avg(temp),
+            func.sum(case((anormal, 1), else_=0)),
+        )
+        .select_from(Patient)
+        .outerjoin(cardio, cardio.c.patient_id == Patient.id)
+        .outerjoin(pulmo, pulmo.c.patient_id == Patient.id)
+        .one()
+    )
+    if not total:
+        return None
+
+    alertes_critiques = (
+        db.query(func.count(Notification.id))
+        .filter(and_(Notification.niveau == "Critique", Notification.lu.is_(False)))
+        .scalar()
+    )
+
+    return {
+        "patients_surveillés": total,
+        "SpO₂ moyenne (%)": round(spo2_moy, 1) if spo2_moy is not None else None,
+        "Fréquence cardiaque moyenne (bpm)": round(hr_moy, 1) if hr_moy is not None else None,
+        "Température moyenne (°C)": round(temp_moy, 1) if temp_moy is not None else None,
+        "Anomalies détectées": int(anomalies or 0),
+        "Alertes critiques actives": int(alertes_critiques or 0),
+    }
+
+
+# =============================
+# 📊 Risques IA globaux
+# =============================
+def calculer_risques(db: Session) -> Optional[Dict[str, Any]]:
+    score = AnalyseIA.score_gravite
+    total, eleve, modere, faible = db.query(
+        func.count(AnalyseIA.id),
+        func.sum(case((score >= 70, 1), else_=0)),
+        func.sum(case((and_(score >= 40, score < 70), 1), else_=0)),
+        func.sum(case((score < 40, 1), else_=0)),
+    ).one()
+    if not total:
+        return None
+    return {
+        "total_analyses": total,
+        "risque_eleve": int(eleve or 0),
+        "risque_modere": int(modere or 0),
+        "risque_faible": int(faible or 0),
+    }
+
+
+monitoring_hopital = Instantane(calculer_monitoring)
+risques_globaux = Instantane(calculer_risques)
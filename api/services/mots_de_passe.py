@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# Coût bcrypt (2^n itérations) : les empreintes d'un autre coût sont recalculées à la connexion
+AUTH_BCRYPT_COUT = int(os.getenv("AUTH_BCRYPT_COUT", "12"))
+HACHAGE_WORKERS = int(os.getenv("HACHAGE_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+# Opérations admises à la fois (en cours + en attente) ; au-delà : 503
+HACHAGE_FILE_MAX = int(os.getenv("HACHAGE_FILE_MAX", str(HACHAGE_WORKERS * 8)))
+HACHAGE_RETRY_AFTER = os.getenv("HACHAGE_RETRY_AFTER", "2")
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=AUTH_BCRYPT_COUT,
+    bcrypt__min_rounds=AUTH_BCRYPT_COUT,
+    bcrypt__max_rounds=AUTH_BCRYPT_COUT,
+)
+
+
+class MotsDePasse:
+    """
+    🔑 Hachage et vérification bcrypt hors des threads de l'API.
+    Un pool de threads dédié et borné (bcrypt libère le GIL) : une vague de
+    connexions à la relève n'occupe plus le threadpool partagé des routes.
+    Au-delà de HACHAGE_FILE_MAX opérations admises, la demande est refusée
+    immédiatement (503 + Retry-After) plutôt que d'allonger la file.
+    """
+
+    _pool: Optional[ThreadPoolExecutor] = None
+    _verrou = threading.Lock()
+    _admises = 0
+    _stats: Dict[str, float] = {
+        "hachages": 0,
+        "verifications": 0,
+        "rehachages": 0,
+        "refus": 0,
+        "attente_totale": 0.0,
+        "attente_max": 0.0,
+        "calcul_total": 0.0,
+    }
+
+    @classmethod
+    def pool(cls) -> ThreadPoolExecutor:
+        with cls._verrou:
+            if cls._pool is None:
+                cls._pool = ThreadPoolExecutor(max_workers=HACHAGE_WORKERS, thread_name_prefix="hachage")
+            return cls._pool
+
+    @classmethod
+    def arreter(cls) -> None:
+        with cls._verrou:
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=False, cancel_futures=True)
+                cls._pool = None
+
+    # -----------------------------
+    # Admission et exécution
+    # -----------------------------
+    @classmethod
+    async def _executer(cls, fonction: Callable[..., Any], *args: Any) -> Any:
+        with cls._verrou:
+            if cls._admises >= HACHAGE_FILE_MAX:
+                cls._stats["refus"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Service d'authentification saturé, réessayez dans un instant",
+                    headers={"Retry-After": HACHAGE_RETRY_AFTER},
+                )
+            cls._admises += 1
+
+        soumis = time.perf_counter()
+
+        def mesurer() -> Any:
+            debut = time.perf_counter()
+            try:
+                return fonction(*args)
+            finally:
+                fin = time.perf_counter()
+                with cls._verrou:
+                    cls._stats["attente_totale"] += debut - soumis
+                    cls._stats["attente_max"] = max(cls._stats["attente_max"], debut - soumis)
+                    cls._stats["calcul_total"] += fin - debut
+
+        try:
+            return await asyncio.wrap_future(cls.pool().submit(mesurer))
+        finally:
+            with cls._verrou:
+                cls._admises -= 1
+
+    @classmethod
+    async def hacher(cls, mot_de_passe: str) -> str:
+        empreinte = await cls._executer(pwd_context.hash, mot_de_passe)
+        cls._compter("hachages")
+        return empreinte
+
+    @classmethod
+    async def verifier(cls, mot_de_passe: str, empreinte: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """(valide, nouvelle empreinte à enregistrer si le coût a changé, sinon None)."""
+        if not empreinte:
+            return False, None
+        try:
+            valide, nouvelle = await cls._executer(pwd_context.verify_and_update, mot_de_passe, empreinte)
+        except ValueError:
+            return False, None  # empreinte illisible (ancien format, valeur en clair…)
+        cls._compter("verifications")
+        if nouvelle is not None:
+            cls._compter("rehachages")
+        return valide, nouvelle
+
+    @classmethod
+    def _compter(cls, nom: str) -> None:
+        with cls._verrou:
+            cls._stats[nom] += 1
+
+    @classmethod
+    def statistiques(cls) -> Dict[str, Any]:
+        with cls._verrou:
+            stats = dict(cls._stats)
+            admises = cls._admises
+        operations = stats["hachages"] + stats["verifications"]
+        return {
+            "workers": HACHAGE_WORKERS,
+            "file_max": HACHAGE_FILE_MAX,
+            "cout_bcrypt": AUTH_BCRYPT_COUT,
+            "en_cours": admises,
+            "hachages": int(stats["hachages"]),
+            "verifications": int(stats["verifications"]),
+            "rehachages": int(stats["rehachages"]),
+            "refus": int(stats["refus"]),
+            "attente_moyenne_ms": round(stats["attente_totale"] / operations * 1000, 1) if operations else None,
+            "attente_max_ms": round(stats["attente_max"] * 1000, 1),
+            "calcul_moyen_ms": round(stats["calcul_total"] / operations * 1000, 1) if operations else None,
+        }
@@ -0,0 +1,270 @@
+import re
+import unicodedata
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect
+from sqlalchemy.orm import Session
+
+from app.models.patient import Patient
+from app.models.nom_patient import NomPatient, TrigrammeNom
+
+# Trigrammes retenus au plus par recherche approchée (intérieurs des mots d'abord)
+TRIGRAMMES_MAX = 12
+# Part minimale des trigrammes de la saisie qu'un candidat doit partager
+SEUIL_TRIGRAMMES = 0.4
+_FIN = "\U0010ffff"  # borne haute des recherches par préfixe sur index
+
+
+# =============================
+# 🔤 Clés
+# =============================
+def normaliser(texte: Optional[str]) -> str:
+    """« N'Diaye-Kouassi  Hélène » → « n diaye kouassi helene » (sans accents, minuscules, séparateurs unifiés)."""
+    if not texte:
+        return ""
+    sans_accents = "".join(c for c in unicodedata.normalize("NFKD", texte) if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[^\W_]+", sans_accents.lower()))
+
+
+# Règles appliquées dans l'ordre à chaque mot normalisé. Approximation du
+# français (ch, ou, eau, an/en, lettres finales muettes) étendue aux
+# transcriptions courantes des noms d'Afrique de l'Ouest (ou+voyelle → w, dj → j).
+_REGLES_PHONETIQUES: List[Tuple[str, str]] = [
+    (r"x", "ks"),
+    (r"tch|sch|ch|sh", "X"),
+    (r"dj", "j"),
+    (r"ph", "f"),
+    (r"th", "t"),
+    (r"ou(?=[aeiy])", "w"),
+    (r"ou|oo", "u"),
+    (r"gu(?=[eiy])", "G"),
+    (r"g(?=[eiy])", "j"),
+    (r"gn", "n"),
+    (r"c(?=[eiy])", "s"),
+    (r"qu|ck|q|c", "k"),
+    (r"z", "s"),
+    (r"y", "i"),
+    (r"eau|au", "o"),
+    (r"ai|ei|eu|oe", "e"),
+    (r"[ae]n(?![aeiou])|[ae]m(?=[bp])", "A"),
+    (r"h", ""),
+    (r"(.)\1+", r"\1"),
+    (r"(?<=..)(?:e?[stdx]|e)$", ""),
+]
+_REGLES_COMPILEES = [(re.compile(motif), remplacement) for motif, remplacement in _REGLES_PHONETIQUES]
+
+
+def phonetique(texte: Optional[str]) -> str:
+    """Clé phonétique mot à mot : Dupont / Dupond, Ouattara / Watara, Djibril / Jibril."""
+    mots = []
+    for mot in normaliser(texte).split():
+        for motif, remplacement in _REGLES_COMPILEES:
+            mot = motif.sub(remplacement, mot)
+        mots.append(mot.lower())
+    return " ".join(m for m in mots if m)
+
+
+def trigrammes(texte: str, partiel: bool = False) -> Set[str]:
+    """Trigrammes des mots (bords marqués par des espaces) ; `partiel` : dernier mot en cours de saisie."""
+    mots = normaliser(texte).split()
+    resultat: Set[str] = set()
+    for i, mot in enumerate(mots):
+        borne = "" if partiel and i == len(mots) - 1 else " "
+        bloc = f"  {mot}{borne}"
+        resultat.update(bloc[j:j + 3] for j in range(len(bloc) - 2))
+    return resultat
+
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+def cles(nom: Optional[str], prenom: Optional[str]) -> Dict[str, str]:
+    return {
+        "cle": normaliser(f"{nom or ''} {prenom or ''}"),
+        "cle_inverse": normaliser(f"{prenom or ''} {nom or ''}"),
+        "phonetique": phonetique(f"{nom or ''} {prenom or ''}"),
+        "phonetique_inverse": phonetique(f"{prenom or ''} {nom or ''}"),
+    }
+
+
+def _lignes(patients: List[Tuple[int, Optional[str], Optional[str]]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    noms, tris = [], []
+    for pid, nom, prenom in patients:
+        noms.append({"patient_id": pid, **cles(nom, prenom)})
+        tris.extend({"trigramme": t, "patient_id": pid} for t in trigrammes(f"{nom or ''} {prenom or ''}"))
+    return noms, tris
+
+
+def _ecrire(conn: Any, patients: List[Tuple[int, Optional[str], Optional[str]]]) -> None:
+    noms, tris = _lignes(patients)
+    if noms:
+        conn.execute(insert(NomPatient.__table__), noms)
+    if tris:
+        conn.execute(insert(TrigrammeNom.__table__), tris)
+
+
+def _effacer(conn: Any, ids: Set[int]) -> None:
+    conn.execute(delete(NomPatient.__table__).where(NomPatient.__table__.c.patient_id.in_(ids)))
+    conn.execute(delete(TrigrammeNom.__table__).where(TrigrammeNom.__table__.c.patient_id.in_(ids)))
+
+
+# =============================
+# 🪝 Maintenance à chaque flush
+# =============================
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    a_indexer: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+    supprimes: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Patient) and obj.id is not None:
+            a_indexer[obj.id] = (obj.nom, obj.prenom)
+    for obj in session.dirty:
+        if isinstance(obj, Patient):
+            etat = inspect(obj)
+            if etat.attrs.nom.history.has_changes() or etat.attrs.prenom.history.has_changes():
+                a_indexer[obj.id] = (obj.nom, obj.prenom)
+    for obj in session.deleted:
+        if isinstance(obj, Patient):
+            supprimes.add(obj.id)
+
+    if not (a_indexer or supprimes):
+        return
+
+    # Même connexion / même transaction que les écritures métier
+    conn = session.connection()
+    _effacer(conn, set(a_indexer) | supprimes)
+    _ecrire(conn, [(pid, nom, prenom) for pid, (nom, prenom) in a_indexer.items() if pid not in supprimes])
+
+
+if not event.contains(Session, "after_flush", _apres_flush):
+    event.listen(Session, "after_flush", _apres_flush)
+
+
+class IndexNoms:
+    """
+    🔤 Index des noms de patients tolérant aux accents et aux variantes
+    d'orthographe : clés normalisées (préfixe sur index), clés phonétiques,
+    puis trigrammes pour les fautes de frappe. Tenu à jour par le hook
+    `after_flush`, vérifié à l'amorçage.
+    """
+
+    @staticmethod
+    def doublon(db: Session, nom: Optional[str], prenom: Optional[str]) -> bool:
+        """Même nom et prénom aux accents, à la casse et à la ponctuation près."""
+        cle = cles(nom, prenom)["cle"]
+        return db.query(NomPatient.patient_id).filter(NomPatient.cle == cle).first() is not None
+
+    @staticmethod
+    def _prefixe(db: Session, colonnes: Tuple[Any, ...], valeur: str, limite: int) -> List[int]:
+        ids: List[int] = []
+        for colonne in colonnes:
+            ids.extend(
+                pid for (pid,) in db.query(NomPatient.patient_id)
+                .filter(colonne >= valeur, colonne < valeur + _FIN)
+                .order_by(colonne)
+                .limit(limite)
+            )
+        return ids
+
+    @classmethod
+    def chercher(cls, db: Session, saisie: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Les k meilleurs patients pour une saisie partielle (autocomplétion)."""
+        saisie_norm = normaliser(saisie)
+        if not saisie_norm:
+            return []
+
+        # 3 : préfixe exact (normalisé) — 2 : préfixe phonétique — 1 : trigrammes
+        niveaux: Dict[int, int] = {}
+        for pid in cls._prefixe(db, (NomPatient.cle, NomPatient.cle_inverse), saisie_norm, k):
+            niveaux.setdefault(pid, 3)
+
+        cle_phonetique = phonetique(saisie)
+        if len(niveaux) < k and cle_phonetique:
+            colonnes = (NomPatient.phonetique, NomPatient.phonetique_inverse)
+            for pid in cls._prefixe(db, colonnes, cle_phonetique, k):
+                niveaux.setdefault(pid, 2)
+
+        tris_saisie = trigrammes(saisie_norm, partiel=True)
+        if len(niveaux) < k and tris_saisie:
+            # Trigrammes les plus discriminants d'abord : ceux qui ne touchent pas le début des mots
+            retenus = sorted(tris_saisie, key=lambda t: (t.startswith(" "), t))[:TRIGRAMMES_MAX]
+            minimum = max(2, round(len(retenus) * SEUIL_TRIGRAMMES))
+            partages = func.count().label("partages")
+            for pid, _ in (
+                db.query(TrigrammeNom.patient_id, partages)
+                .filter(TrigrammeNom.trigramme.in_(retenus))
+                .group_by(TrigrammeNom.patient_id)
+                .having(partages >= minimum)
+                .order_by(partages.desc())
+                .limit(k * 4)
+            ):
+                niveaux.setdefault(pid, 1)
+
+        if not niveaux:
+            return []
+
+        lignes = (
+            db.query(NomPatient.patient_id, NomPatient.cle, NomPatient.cle_inverse, Patient.nom, Patient.prenom)
+            .join(Patient, Patient.id == NomPatient.patient_id)
+            .filter(NomPatient.patient_id.in_(niveaux))
+            .all()
+        )
+
+        nb_mots = len(saisie_norm.split())
+        resultats = []
+        for pid, cle, cle_inverse, nom, prenom in lignes:
+            # Similarité sur autant de mots que la saisie, dans les deux ordres
+            similarite = max(
+                _dice(tris_saisie, trigrammes(" ".join(c.split()[:nb_mots]), partiel=True))
+                for c in (cle, cle_inverse)
+            )
+            resultats.append({
+                "patient_id": pid,
+                "nom": nom,
+                "prenom": prenom,
+                "correspondance": {3: "prefixe", 2: "phonetique", 1: "approchee"}[niveaux[pid]],
+                "score": round(niveaux[pid] + similarite, 4),
+            })
+        resultats.sort(key=lambda r: (-r["score"], r["nom"] or "", r["prenom"] or ""))
+        return resultats[:k]
+
+    # -----------------------------
+    # Reconstruction
+    # -----------------------------
+    @staticmethod
+    def _patients(db: Session, lot: int) -> Iterator[List[Tuple[int, Optional[str], Optional[str]]]]:
+        dernier = 0
+        while True:
+            patients = (
+                db.query(Patient.id, Patient.nom, Patient.prenom)
+                .filter(Patient.id > dernier)
+                .order_by(Patient.id)
+                .limit(lot)
+                .all()
+            )
+            if not patients:
+                return
+            dernier = patients[-1][0]
+            yield [tuple(p) for p in patients]
+
+    @classmethod
+    def reconstruire(cls, db: Session, lot: int = 5000) -> int:
+        conn = db.connection()
+        conn.execute(delete(NomPatient.__table__))
+        conn.execute(delete(TrigrammeNom.__table__))
+        total = 0
+        for patients in cls._patients(db, lot):
+            _ecrire(conn, patients)
+            total += len(patients)
+        db.commit()
+        print(f"🔤 Index des noms de patients reconstruit : {total} patient(s)")
+        return total
+
+    @classmethod
+    def verifier(cls, db: Session) -> None:
+        """Reconstruit l'index s'il ne couvre pas exactement la table patients (imports hors ORM)."""
+        patients = db.query(func.count(Patient.id)).scalar()
+        indexes = db.query(func.count(NomPatient.patient_id)).scalar()
+        if patients != indexes:
+            cls.reconstruire(db)
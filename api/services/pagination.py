@@ -0,0 +1,197 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import DateTime, String, and_, or_, type_coerce
+from sqlalchemy.orm import Query as SAQuery, lazyload
+
+from api.database import SessionLocal, engine
+
+# =============================
+# CONFIG
+# =============================
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGINATION_DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", "500"))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    📑 Dépendance FastAPI commune aux listes paginées par curseur.
+    - `cursor` : curseur opaque renvoyé dans l'en-tête X-Next-Cursor
+    - `limit`  : taille de page (bornée par MAX_PAGE_SIZE)
+    - `Accept: application/x-ndjson` : flux NDJSON de toutes les lignes restantes
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        cursor: Optional[str] = Query(None, description="Curseur opaque de la page suivante"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Taille de page"),
+    ):
+        self.request = request
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+
+    @property
+    def stream(self) -> bool:
+        return NDJSON_MEDIA_TYPE in self.request.headers.get("accept", "")
+
+
+# =============================
+# CURSEURS
+# =============================
+def valeur_stockee(colonne: Any) -> Any:
+    """
+    Colonne de date lue et comparée telle qu'elle est stockée. Sous SQLite,
+    une date est un texte dont le format dépend de l'écrivain
+    ('2025-11-03 15:43:26' importé, '2025-11-03 15:43:26.000000' écrit par
+    SQLAlchemy) : relue en datetime puis réécrite, la valeur d'un curseur ne
+    serait plus égale à celle de sa ligne. Le texte brut l'est toujours, et
+    la comparaison reste servie par l'index de la colonne.
+    """
+    if isinstance(colonne.type, DateTime) and engine.dialect.name == "sqlite":
+        return type_coerce(colonne, String)
+    return colonne
+
+
+def apres_curseur(cle: Any, id_column: Any, valeur: Any, dernier_id: int, descending: bool) -> List[Any]:
+    """
+    Conditions « strictement après (valeur, dernier_id) », en segments à lire
+    dans l'ordre : chacun est un intervalle d'index (pas de OR sur la clé,
+    qui forcerait un parcours depuis le début). Les NULL forment leur propre
+    segment : en fin d'ordre décroissant, en tête d'ordre croissant.
+    """
+    if cle is None:
+        return [id_column < dernier_id if descending else id_column > dernier_id]
+    if valeur is None:
+        nulls = and_(cle.is_(None), id_column < dernier_id if descending else id_column > dernier_id)
+        return [nulls] if descending else [nulls, cle.isnot(None)]
+    if descending:
+        return [and_(cle <= valeur, or_(cle < valeur, id_column < dernier_id)), cle.is_(None)]
+    return [and_(cle >= valeur, or_(cle > valeur, id_column > dernier_id))]
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, is_date: bool) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if is_date and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+
+# =============================
+# PAGINATION
+# =============================
+def paginate(
+    query: SAQuery,
+    page: PageParams,
+    id_column: Any,
+    order_column: Any = None,
+    descending: bool = True,
+    serialize: Optional[Callable[[Any], Any]] = None,
+    schema: Optional[Type[BaseModel]] = None,
+) -> Union[List[Any], StreamingResponse]:
+    """
+    Pagination par clé (keyset) sur (order_column, id) — coût O(page) quel
+    que soit l'offset, chaque segment étant un intervalle d'index (les
+    index (patient_id, date) des historiques). `query` ne doit pas déjà être triée et sélectionne
+    une seule entité. Les NULL de order_column viennent en dernier en ordre
+    décroissant (en premier en croissant) ; la page qui passe des dates aux
+    NULL coûte une requête de plus.
+
+    En mode JSON, renvoie la liste de la page et pose X-Next-Cursor / Link.
+    En mode NDJSON, renvoie un StreamingResponse lisant les lignes par lots
+    (`yield_per`) à partir du curseur.
+    """
+    cle = valeur_stockee(order_column) if order_column is not None else None
+    is_date = cle is not None and isinstance(cle.type, DateTime)
+
+    segments: List[Any] = [None]
+    if page.cursor:
+        value, last_id = decode_cursor(page.cursor, is_date)
+        segments = apres_curseur(cle, id_column, value, last_id, descending)
+
+    if order_column is None:
+        order = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order = [order_column.desc().nulls_last(), id_column.desc()]
+    else:
+        order = [order_column.asc().nulls_first(), id_column.asc()]
+
+    if page.stream:
+        if segments != [None]:
+            query = query.filter(or_(*segments))
+        return _stream_ndjson(query.order_by(*order), page.limit, serialize, schema)
+
+    if cle is not None:
+        # Valeur de tri telle que stockée, pour le curseur de la page suivante
+        query = query.add_columns(cle.label("cle_curseur"))
+
+    rows: List[Any] = []
+    for condition in segments:
+        segment = query if condition is None else query.filter(condition)
+        rows += segment.order_by(*order).limit(page.limit + 1 - len(rows)).all()
+        if len(rows) > page.limit:
+            break
+
+    has_next = len(rows) > page.limit
+    rows = rows[: page.limit]
+    values = [None] * len(rows)
+    if cle is not None:
+        values = [r[-1] for r in rows]
+        rows = [r[0] for r in rows]
+
+    if has_next and rows:
+        next_cursor = encode_cursor(values[-1], getattr(rows[-1], id_column.key))
+        next_url = page.request.url.include_query_params(cursor=next_cursor, limit=page.limit)
+        page.response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        page.response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    return [serialize(r) for r in rows] if serialize else rows
+
+
+def _stream_ndjson(
+    query: SAQuery,
+    batch_size: int,
+    serialize: Optional[Callable[[Any], Any]],
+    schema: Optional[Type[BaseModel]],
+) -> StreamingResponse:
+    def lines() -> Iterator[str]:
+        # Session dédiée : celle de la requête est fermée avant la fin du flux
+        db = SessionLocal()
+        try:
+            # (chargements "joined" implicites remplacés par du lazy : incompatibles avec yield_per ;
+            #  les contains_eager explicites des formes de lecture restent actifs, sans N+1)
+            rows = query.with_session(db).options(lazyload("*")).yield_per(batch_size)
+            for row in rows:
+                item = serialize(row) if serialize else row
+                if schema is not None and not isinstance(item, BaseModel):
+                    item = schema.model_validate(item, from_attributes=True)
+                if isinstance(item, BaseModel):
+                    yield item.model_dump_json() + "\n"
+                else:
+                    yield json.dumps(jsonable_encoder(item), ensure_ascii=False) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
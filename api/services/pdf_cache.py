@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+PDF_CACHE_DIR = os.path.join("exports", "pdf", "cache")
+PDF_CACHE_MAX_OCTETS = int(float(os.getenv("PDF_CACHE_MAX_MO", "500")) * 1024 * 1024)
+# 0 : les rendus synchrones restent en mémoire et ne sont jamais écrits sur disque
+PDF_CACHE_PERSISTANT = os.getenv("PDF_CACHE_PERSISTANT", "1") == "1"
+os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+# À incrémenter à chaque modification visuelle d'un gabarit de pdf_rendu (invalide le cache PDF).
+# Défini ici et non dans pdf_rendu : calculer une clé ne doit pas importer ReportLab.
+VERSION_GABARITS: Dict[str, int] = {
+    "analyse": 2,
+    "facture": 1,
+    "historique": 2,
+    "synthese": 2,
+    "dossier": 1,
+}
+
+
+class PdfCache:
+    """
+    🗄️ Cache des PDF adressé par contenu.
+    Clé = SHA-256(type de rapport, version du gabarit, versions des lignes
+    sources). Même clé ⇒ même document : servi depuis le disque, avec ETag.
+    Le répertoire est borné (PDF_CACHE_MAX_MO) et purgé en LRU (mtime).
+    """
+
+    _verrou = threading.Lock()
+    _taille: Optional[int] = None  # estimation courante (octets), recalculée à la purge
+
+    # -----------------------------
+    # Clés
+    # -----------------------------
+    @staticmethod
+    def empreinte(valeur: Any) -> str:
+        brut = json.dumps(jsonable_encoder(valeur), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(brut.encode()).hexdigest()
+
+    @classmethod
+    def version_ligne(cls, table: str, obj: Any, colonnes: Dict[str, Any]) -> List[Any]:
+        """[table, id, updated_at] ; à défaut d'updated_at, empreinte des colonnes exportées."""
+        updated_at = getattr(obj, "updated_at", None)
+        return [table, getattr(obj, "id", None), updated_at or cls.empreinte(colonnes)]
+
+    @classmethod
+    def cle(cls, type_rendu: str, sources: Any) -> str:
+        return cls.empreinte({"type": type_rendu, "gabarit": VERSION_GABARITS[type_rendu], "sources": sources})
+
+    @staticmethod
+    def chemin(cle: str) -> str:
+        return os.path.join(PDF_CACHE_DIR, f"{cle}.pdf")
+
+    # -----------------------------
+    # Lecture / purge
+    # -----------------------------
+    @classmethod
+    def trouver(cls, cle: str) -> Optional[str]:
+        """Chemin du PDF en cache (et le marque comme récemment utilisé), sinon None."""
+        chemin = cls.chemin(cle)
+        try:
+            os.utime(chemin)
+        except FileNotFoundError:
+            return None
+        return chemin
+
+    @classmethod
+    def enregistrer(cls, cle: str, contenu: bytes) -> str:
+        """Persiste un PDF rendu en mémoire (écriture atomique)."""
+        chemin = cls.chemin(cle)
+        temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(temporaire, "wb") as f:
+            f.write(contenu)
+        os.replace(temporaire, chemin)
+        cls.ajouter(chemin)
+        return chemin
+
+    @classmethod
+    def ajouter(cls, chemin: str) -> None:
+        """À appeler quand un rendu vient d'être écrit dans le cache."""
+        try:
+            taille = os.path.getsize(chemin)
+        except OSError:
+            return
+        with cls._verrou:
+            if cls._taille is None:
+                cls._taille = cls._mesurer()
+            else:
+                cls._taille += taille
+            depasse = cls._taille > PDF_CACHE_MAX_OCTETS
+        if depasse:
+            cls.purger()
+
+    @staticmethod
+    def _fichiers() -> List[os.DirEntry]:
+        return [e for e in os.scandir(PDF_CACHE_DIR) if e.is_file() and e.name.endswith(".pdf")]
+
+    @classmethod
+    def _mesurer(cls) -> int:
+        return sum(e.stat().st_size for e in cls._fichiers())
+
+    @classmethod
+    def purger(cls, cible: Optional[int] = None) -> int:
+        """Supprime les PDF les moins récemment utilisés jusqu'à 90 % du plafond."""
+        cible = int(PDF_CACHE_MAX_OCTETS * 0.9) if cible is None else cible
+        with cls._verrou:
+            fichiers = sorted(cls._fichiers(), key=lambda e: e.stat().st_mtime)
+            taille = sum(e.stat().st_size for e in fichiers)
+            supprimes = 0
+            for entree in fichiers:
+                if taille <= cible:
+                    break
+                try:
+                    taille -= entree.stat().st_size
+                    os.remove(entree.path)
+                    supprimes += 1
+                except FileNotFoundError:
+                    pass
+            cls._taille = taille
+        if supprimes:
+            print(f"🗄️ Cache PDF purgé : {supprimes} fichier(s) supprimé(s)")
+        return supprimes
@@ -0,0 +1,97 @@
+"""
+📈 Graphiques de tendance des constantes vitales pour les rapports PDF.
+
+Exécuté dans les processus du pool PDF, jamais dans l'API : Matplotlib est
+importé à la demande et utilisé sans pyplot (Figure + canevas Agg), donc
+sans état global partagé. Les images sont mises en cache sur disque sous la
+clé de version des données calculée par la route : un même historique
+n'est dessiné qu'une fois, quel que soit le processus qui le demande.
+"""
+import os
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+GRAPHIQUES_DIR = os.path.join("exports", "pdf", "graphiques")
+GRAPHIQUES_MAX = int(os.getenv("PDF_GRAPHIQUES_MAX", "2000"))
+GRAPHIQUE_DPI = 150
+COULEURS = ["#1e3a8a", "#0891b2", "#d97706", "#b91c1c", "#15803d", "#7c3aed"]
+
+
+def _date(valeur: Any) -> datetime:
+    return valeur if isinstance(valeur, datetime) else datetime.fromisoformat(str(valeur))
+
+
+def dessiner_tendances(series: list) -> bytes:
+    """PNG : un panneau par constante, axe des temps partagé."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+
+    fig = Figure(figsize=(7.5, 1.6 * len(series)), dpi=GRAPHIQUE_DPI)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(len(series), 1, sharex=True, squeeze=False)[:, 0]
+
+    for i, (ax, serie) in enumerate(zip(axes, series)):
+        dates = [_date(t) for t, _ in serie["points"]]
+        valeurs = [v for _, v in serie["points"]]
+        couleur = COULEURS[i % len(COULEURS)]
+        ax.plot(dates, valeurs, color=couleur, linewidth=1.2)
+        ax.fill_between(dates, valeurs, min(valeurs), color=couleur, alpha=0.08)
+        ax.set_ylabel(serie["unite"], fontsize=7)
+        ax.set_title(serie["titre"], fontsize=8, loc="left")
+        ax.tick_params(labelsize=7)
+        ax.grid(alpha=0.3, linewidth=0.5)
+
+    locator = AutoDateLocator()
+    axes[-1].xaxis.set_major_locator(locator)
+    axes[-1].xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    fig.tight_layout()
+
+    tampon = BytesIO()
+    fig.savefig(tampon, format="png")
+    return tampon.getvalue()
+
+
+def graphique_tendances(tendances: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Chemin du PNG des tendances (depuis le cache ou dessiné), None si aucune série."""
+    if not tendances or not tendances.get("series"):
+        return None
+
+    chemin = os.path.join(GRAPHIQUES_DIR, f"{tendances['cle']}.png")
+    try:
+        os.utime(chemin)
+        return chemin
+    except FileNotFoundError:
+        pass
+
+    contenu = dessiner_tendances(tendances["series"])
+    os.makedirs(GRAPHIQUES_DIR, exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.part"
+    with open(temporaire, "wb") as f:
+        f.write(contenu)
+    os.replace(temporaire, chemin)
+    _purger()
+    return chemin
+
+
+def _purger() -> None:
+    """Garde les GRAPHIQUES_MAX images les plus récemment utilisées."""
+    fichiers = [e for e in os.scandir(GRAPHIQUES_DIR) if e.is_file() and e.name.endswith(".png")]
+    if len(fichiers) <= GRAPHIQUES_MAX:
+        return
+    fichiers.sort(key=lambda e: e.stat().st_mtime)
+    for entree in fichiers[: len(fichiers) - GRAPHIQUES_MAX]:
+        try:
+            os.remove(entree.path)
+        except FileNotFoundError:
+            pass
+
+
+def prechauffer() -> None:
+    """Charge Matplotlib (backend Agg) et ses polices dans le processus."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(1, 1))
+    FigureCanvasAgg(fig).draw()
@@ -0,0 +1,143 @@
+"""
+📚 Rendu Platypus de l'historique des analyses IA.
+
+Exécuté dans les processus du pool PDF. Contrairement aux autres gabarits,
+les lignes ne transitent pas par la route : le processus les lit lui-même
+par lots (`yield_per`) et chaque analyse devient un flowable produit à la
+demande puis oublié une fois dessiné. La mémoire reste constante quelle que
+soit la longueur de l'historique ; le texte est renvoyé à la ligne et
+paginé par ReportLab.
+"""
+import os
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Union
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Flowable, KeepTogether, Paragraph, SimpleDocTemplate, Spacer
+
+PDF_HISTORIQUE_LOT = int(os.getenv("PDF_HISTORIQUE_LOT", "500"))
+
+_STYLES = getSampleStyleSheet()
+TITRE = ParagraphStyle("HistoriqueTitre", parent=_STYLES["Title"], textColor=colors.HexColor("#1e3a8a"), fontSize=18)
+ENTETE = ParagraphStyle("HistoriqueEntete", parent=_STYLES["Heading3"], spaceBefore=10, spaceAfter=4)
+TEXTE = ParagraphStyle("HistoriqueTexte", parent=_STYLES["BodyText"], fontSize=10, leading=13, leftIndent=20)
+
+
+class FluxFlowables:
+    """
+    Liste paresseuse pour `doc.build` : ReportLab ne consulte que la tête
+    (lecture, suppression, réinsertion des morceaux d'un flowable coupé),
+    les flowables sont donc tirés de la source au fur et à mesure.
+    """
+
+    def __init__(self, source: Iterable[Flowable]):
+        self._tete: deque = deque()
+        self._source: Iterator[Flowable] = iter(source)
+
+    def _remplir(self, n: int) -> bool:
+        while len(self._tete) < n:
+            try:
+                self._tete.append(next(self._source))
+            except StopIteration:
+                return False
+        return True
+
+    def __len__(self) -> int:
+        # Nombre d'éléments déjà tirés : non nul tant que la source n'est pas épuisée
+        self._remplir(1)
+        return len(self._tete)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            if i.stop is not None:
+                self._remplir(i.stop)
+            return list(self._tete)[i]
+        if not self._remplir(i + 1):
+            raise IndexError(i)
+        return self._tete[i]
+
+    def __delitem__(self, i) -> None:
+        if isinstance(i, slice):
+            for _ in range(len(self[i])):
+                del self._tete[i.start or 0]
+            return
+        self._remplir(i + 1)
+        del self._tete[i]
+
+    def __setitem__(self, i, valeurs) -> None:
+        if not (isinstance(i, slice) and (i.start or 0) == 0 and (i.stop or 0) == 0):
+            raise NotImplementedError("Seule la réinsertion en tête est prise en charge")
+        self._tete.extendleft(reversed(list(valeurs)))
+
+    def insert(self, i: int, flowable: Flowable) -> None:
+        self._tete.insert(i, flowable)
+
+
+def _paragraphe(texte: Any, style: ParagraphStyle, etiquette: str = "") -> Paragraph:
+    contenu = escape(str(texte)).replace("\n", "<br/>") if texte else "—"
+    return Paragraph(f"<b>{etiquette}</b>{contenu}" if etiquette else contenu, style)
+
+
+def _flowables(patient: SimpleNamespace, total: int, lignes: Iterable[Any]) -> Iterator[Flowable]:
+    yield Paragraph(escape(f"Historique d’Analyses IA — {patient.prenom or ''} {patient.nom}"), TITRE)
+    yield Paragraph(f"{total} analyse(s), de la plus récente à la plus ancienne", _STYLES["Italic"])
+    yield Spacer(1, 0.4 * cm)
+
+    for i, (created_at, diagnostic, prediction, plan) in enumerate(lignes, start=1):
+        date = created_at.strftime("%d/%m/%Y %H:%M") if created_at else "—"
+        # Petits blocs gardés ensemble ; un bloc plus haut qu'une page est coupé normalement
+        yield KeepTogether([
+            Paragraph(f"Analyse #{i} — {date}", ENTETE),
+            _paragraphe(diagnostic, TEXTE, "Diagnostic : "),
+            _paragraphe(prediction, TEXTE, "Prédiction : "),
+            _paragraphe(plan, TEXTE, "Plan : "),
+        ])
+
+
+def _pied_de_page(c, doc) -> None:
+    c.saveState()
+    c.setFont("Helvetica-Oblique", 9)
+    c.setFillColor(colors.grey)
+    c.drawString(doc.leftMargin, 30, "Signature numérique : AETHERIS IA Santé")
+    c.drawRightString(A4[0] - doc.rightMargin, 30, f"Page {c.getPageNumber()}")
+    c.restoreState()
+
+
+def rendre_historique(donnees: Dict[str, Any], chemin: Union[str, BinaryIO]) -> None:
+    from sqlalchemy import desc
+
+    from api.database import SessionLocal
+    from app.models.analyse_ia import AnalyseIA
+
+    patient = SimpleNamespace(**donnees["patient"])
+    doc = SimpleDocTemplate(
+        chemin,
+        pagesize=A4,
+        leftMargin=50,
+        rightMargin=50,
+        topMargin=50,
+        bottomMargin=60,
+        title=f"Historique IA — {patient.nom}",
+    )
+
+    db = SessionLocal()
+    try:
+        # Colonnes seules (pas d'entités dans la session) lues par lots
+        lignes = (
+            db.query(AnalyseIA.created_at, AnalyseIA.diagnostic, AnalyseIA.prediction, AnalyseIA.plan)
+            .filter(AnalyseIA.patient_id == patient.id, AnalyseIA.id <= donnees["dernier_id"])
+            .order_by(desc(AnalyseIA.created_at), desc(AnalyseIA.id))
+            .yield_per(PDF_HISTORIQUE_LOT)
+        )
+        doc.build(
+            FluxFlowables(_flowables(patient, donnees["total"], lignes)),
+            onFirstPage=_pied_de_page,
+            onLaterPages=_pied_de_page,
+        )
+    finally:
+        db.close()
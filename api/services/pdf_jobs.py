@@ -0,0 +1,202 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from api.services.etat_partage import etat_partage
+from api.services.pdf_cache import PdfCache
+from api.services.reponse_fichier import disposition_piece_jointe
+
+PDF_DIR = "exports/pdf"
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+PDF_JOBS_MAX = int(os.getenv("PDF_JOBS_MAX", "1000"))
+# Durée de conservation du statut d'un job dans l'état partagé (visible des autres workers)
+PDF_JOBS_TTL = int(os.getenv("PDF_JOBS_TTL_SECONDES", "86400"))
+# Taille des blocs envoyés au client pour un PDF rendu en mémoire
+PDF_TAILLE_BLOC = int(os.getenv("PDF_TAILLE_BLOC", str(64 * 1024)))
+
+# Écritures dans l'état partagé (SQLite, Redis) : jamais sur la boucle d'événements ni sur le
+# thread de gestion du pool PDF ; un seul thread, donc publiées dans l'ordre des statuts
+_publications = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-publication")
+
+
+def _dans_le_pool(fonction: str, *args: Any) -> Any:
+    """Point d'entrée des processus : ReportLab n'est importé que dans le pool, jamais dans l'API."""
+    from api.services import pdf_rendu
+
+    return getattr(pdf_rendu, fonction)(*args)
+
+
+class PdfJob:
+    """
+    Rendu PDF soumis au pool : statut consultable et fichier téléchargeable.
+    L'identifiant est la clé du cache PDF : deux demandes identiques
+    partagent le même job et le même fichier.
+    """
+
+    def __init__(self, type_rendu: str, nom_fichier: str, cle: str):
+        self.id = cle
+        self.type = type_rendu
+        self.nom_fichier = nom_fichier
+        self.chemin = PdfCache.chemin(cle)
+        self.statut = "en_attente"
+        self.erreur: Optional[str] = None
+        self.cree_le = datetime.utcnow()
+        self.termine_le: Optional[datetime] = None
+        self.future: Optional[Future] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "type": self.type,
+            "statut": self.statut,
+            "erreur": self.erreur,
+            "cree_le": self.cree_le,
+            "termine_le": self.termine_le,
+            "statut_url": f"/pdf/jobs/{self.id}",
+            "telechargement_url": f"/pdf/jobs/{self.id}/fichier",
+        }
+
+    def publier(self) -> None:
+        """Statut recopié dans l'état partagé : tout worker peut répondre pour ce job."""
+        _publications.submit(self._ecrire, jsonable_encoder({**self.to_dict(), "nom_fichier": self.nom_fichier}))
+
+    def _ecrire(self, statut: Dict[str, Any]) -> None:
+        try:
+            etat_partage().ecrire(f"pdf:job:{self.id}", statut, PDF_JOBS_TTL)
+        except Exception as e:
+            print(f"⚠️ Statut du job PDF {self.id[:12]}… non partagé : {e}")
+
+
+class PdfJobs:
+    """
+    🖨️ File de rendus PDF exécutés dans un ProcessPoolExecutor.
+    Les routes préparent les données (accès base), le pool fait le rendu
+    ReportLab hors des threads de l'API et sur tous les cœurs.
+    """
+
+    _pool: Optional[ProcessPoolExecutor] = None
+    _jobs: "OrderedDict[str, PdfJob]" = OrderedDict()
+    _verrou = threading.RLock()
+
+    @classmethod
+    def pool(cls) -> ProcessPoolExecutor:
+        with cls._verrou:
+            if cls._pool is None:
+                # "spawn" : pas de fork d'un processus qui possède threads et connexions
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_dans_le_pool,
+                    initargs=("prechauffer",),
+                )
+            return cls._pool
+
+    @classmethod
+    def demarrer(cls) -> None:
+        """Démarre et préchauffe les processus en arrière-plan (le démarrage de l'API n'attend pas)."""
+        pool = cls.pool()
+        prets = [pool.submit(_dans_le_pool, "prechauffer") for _ in range(PDF_WORKERS)]
+
+        def annoncer() -> None:
+            wait(prets)
+            print(f"🖨️ Pool PDF prêt : {PDF_WORKERS} processus")
+
+        threading.Thread(target=annoncer, name="pdf-prechauffage", daemon=True).start()
+
+    @classmethod
+    def arreter(cls) -> None:
+        with cls._verrou:
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=False, cancel_futures=True)
+                cls._pool = None
+
+    @classmethod
+    def soumettre(cls, type_rendu: str, donnees: Dict[str, Any], nom_fichier: str, cle: str) -> PdfJob:
+        with cls._verrou:
+            en_cours = cls._jobs.get(cle)
+            if en_cours is not None and en_cours.statut == "en_cours":
+                return en_cours  # même document déjà en cours de rendu
+
+            job = PdfJob(type_rendu, nom_fichier, cle)
+            job.statut = "en_cours"
+            job.publier()
+            job.future = cls.pool().submit(_dans_le_pool, "executer", type_rendu, donnees, job.chemin)
+            job.future.add_done_callback(lambda f: cls._terminer(job, f))
+
+            cls._jobs[job.id] = job
+            cls._jobs.move_to_end(job.id)
+            # Registre borné : on oublie les plus anciens jobs terminés
+            while len(cls._jobs) > PDF_JOBS_MAX:
+                ancien = next(iter(cls._jobs.values()))
+                if ancien.future is not None and not ancien.future.done():
+                    break
+                cls._jobs.popitem(last=False)
+        return job
+
+    @staticmethod
+    def _terminer(job: PdfJob, future: Future) -> None:
+        job.termine_le = datetime.utcnow()
+        if future.cancelled():
+            job.statut = "annule"
+        elif future.exception() is not None:
+            job.statut = "erreur"
+            job.erreur = str(future.exception())
+            print(f"❌ Rendu PDF {job.type} ({job.id}) en échec : {job.erreur}")
+        else:
+            job.statut = "termine"
+            PdfCache.ajouter(job.chemin)
+        job.publier()
+
+    @classmethod
+    def obtenir(cls, job_id: str) -> Optional[PdfJob]:
+        with cls._verrou:
+            return cls._jobs.get(job_id)
+
+    @staticmethod
+    def statut_partage(job_id: str) -> Optional[Dict[str, Any]]:
+        """Dernier statut publié par le worker qui a soumis le job."""
+        return etat_partage().lire(f"pdf:job:{job_id}")
+
+    @classmethod
+    async def rendre_en_memoire(cls, type_rendu: str, donnees: Dict[str, Any]) -> bytes:
+        """Rendu dans un tampon côté pool : aucun fichier temporaire."""
+        future = cls.pool().submit(_dans_le_pool, "rendre_en_memoire", type_rendu, donnees)
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def reponse_flux(contenu: bytes, nom_fichier: str, entetes: Optional[Dict[str, str]] = None) -> StreamingResponse:
+        """Diffuse un PDF en mémoire par blocs de PDF_TAILLE_BLOC octets."""
+
+        def blocs() -> Iterator[bytes]:
+            vue = memoryview(contenu)
+            for debut in range(0, len(vue), PDF_TAILLE_BLOC):
+                yield bytes(vue[debut:debut + PDF_TAILLE_BLOC])
+
+        return StreamingResponse(
+            blocs(),
+            media_type="application/pdf",
+            headers={
+                **(entetes or {}),
+                "Content-Length": str(len(contenu)),
+                "Content-Disposition": disposition_piece_jointe(nom_fichier),
+            },
+        )
+
+    @staticmethod
+    async def attendre(job: PdfJob, timeout: Optional[float] = None) -> PdfJob:
+        """Attend la fin du rendu sans bloquer la boucle d'événements."""
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except asyncio.TimeoutError:
+            pass
+        except Exception:
+            pass  # l'erreur est portée par job.statut / job.erreur
+        return job
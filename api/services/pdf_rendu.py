@@ -0,0 +1,335 @@
+"""
+🖨️ Rendu ReportLab des rapports PDF Aetheris.
+
+Ce module est exécuté dans les processus du pool PDF : il ne dépend ni de
+la base ni de FastAPI. Chaque rendu reçoit des données simples (dicts
+sérialisables) préparées par la route et écrit le document dans `chemin`
+(chemin de fichier ou tampon mémoire). Seul l'historique lit lui-même ses
+lignes en base (voir pdf_historique).
+"""
+import os
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Callable, Dict, Union
+
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+
+from api.services import pdf_graphiques
+from api.services.pdf_historique import rendre_historique
+
+LOGO_PATH = "assets/logo_aetheris.png"
+# Toute modification visuelle d'un gabarit : incrémenter pdf_cache.VERSION_GABARITS
+
+Destination = Union[str, BinaryIO]
+
+
+def _ns(donnees: Dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(**(donnees or {}))
+
+
+def _dessiner_tendances(c: canvas.Canvas, donnees: Dict[str, Any], y: float) -> float:
+    """Insère le graphique des constantes vitales sous le contenu (nouvelle page si besoin)."""
+    chemin = pdf_graphiques.graphique_tendances(donnees.get("tendances"))
+    if chemin is None:
+        return y
+
+    width, height = A4
+    image = ImageReader(chemin)
+    largeur_px, hauteur_px = image.getSize()
+    largeur = width - 100
+    hauteur = largeur * hauteur_px / largeur_px
+    if y - hauteur - 20 < 60:
+        c.showPage()
+        y = height - 60
+
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Tendances des constantes vitales :")
+    y -= 10 + hauteur
+    c.drawImage(image, 50, y, width=largeur, height=hauteur)
+    return y - 20
+
+
+# ============================================================
+# 🧠 Rapport d’analyse IA Aetheris
+# ============================================================
+def rendre_analyse(donnees: Dict[str, Any], chemin: Destination) -> None:
+    patient, analyse = _ns(donnees["patient"]), _ns(donnees["analyse"])
+
+    c = canvas.Canvas(chemin, pagesize=A4)
+    width, height = A4
+
+    # --- Bandeau bleu ---
+    c.setFillColor(colors.HexColor("#1e3a8a"))
+    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
+
+    if os.path.exists(LOGO_PATH):
+        c.drawImage(LOGO_PATH, 40, height - 70, width=90, height=50, mask="auto")
+
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(150, height - 45, "RAPPORT D’ANALYSE IA — AETHERIS")
+    c.setFont("Helvetica", 11)
+    c.drawString(150, height - 65, f"Dr {donnees['medecin']}  |  {donnees['genere_le']}")
+
+    y = height - 120
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, f"👤 Patient : {patient.prenom} {patient.nom} ({patient.age or '?'} ans, {patient.sexe or '-'})")
+
+    y -= 30
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Diagnostic :")
+    y -= 15
+    c.setFont("Helvetica", 11)
+    c.drawString(70, y, analyse.diagnostic or "—")
+
+    y -= 30
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Prédictions & Risques :")
+    y -= 15
+    c.setFont("Helvetica", 11)
+    for line in (analyse.prediction or "—").split("\n"):
+        c.drawString(70, y, f"- {line}")
+        y -= 15
+
+    y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Plan de prise en charge :")
+    y -= 15
+    c.setFont("Helvetica", 11)
+    for step in (analyse.plan or "—").split("\n"):
+        c.drawString(70, y, f"- {step}")
+        y -= 15
+
+    y -= 20
+    y = _dessiner_tendances(c, donnees, y)
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.setFillColor(colors.grey)
+    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé — Validation médicale requise.")
+    c.save()
+
+
+# ============================================================
+# 💳 Facture médicale
+# ============================================================
+def rendre_facture(donnees: Dict[str, Any], chemin: Destination) -> None:
+    facture, patient = _ns(donnees["facture"]), _ns(donnees["patient"])
+    medecin = _ns(donnees["medecin"]) if donnees.get("medecin") else None
+
+    c = canvas.Canvas(chemin, pagesize=A4)
+    width, height = A4
+
+    c.setFillColor(colors.HexColor("#0f172a"))
+    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 20)
+    c.drawCentredString(width / 2, height - 50, "FACTURE MÉDICALE — AETHERIS")
+
+    y = height - 120
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, f"Patient : {patient.prenom} {patient.nom}")
+    y -= 25
+    c.drawString(50, y, f"Médecin : {medecin.nom if medecin else '—'} ({medecin.specialite if medecin else '—'})")
+    y -= 35
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Détails de la Facture :")
+    y -= 20
+    c.setFont("Helvetica", 11)
+    data = [
+        ["Numéro", facture.numero_facture],
+        ["Date émission", facture.date_emission.strftime("%d/%m/%Y") if facture.date_emission else "—"],
+        ["Montant HT", f"{facture.montant_ht:.2f} €"],
+        ["Taxe", f"{facture.taxe:.2f} €"],
+        ["Total TTC", f"{facture.montant_total:.2f} €"],
+        ["Statut", facture.statut],
+        ["Paiement", facture.methode_paiement or "—"],
+    ]
+    for k, v in data:
+        c.drawString(70, y, f"{k} : {v}")
+        y -= 15
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.setFillColor(colors.grey)
+    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé")
+    c.save()
+
+
+# ============================================================
+# 🧬 Synthèse IA (SyntheseDetail.tsx)
+# ============================================================
+def rendre_synthese(donnees: Dict[str, Any], chemin: Destination) -> None:
+    patient, synthese = _ns(donnees["patient"]), _ns(donnees["synthese"])
+
+    c = canvas.Canvas(chemin, pagesize=A4)
+    width, height = A4
+
+    # 🟦 Bandeau supérieur
+    c.setFillColor(colors.HexColor("#1e3a8a"))
+    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
+
+    if os.path.exists(LOGO_PATH):
+        c.drawImage(LOGO_PATH, 40, height - 70, width=90, height=50, mask="auto")
+
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(150, height - 45, "RAPPORT DE SYNTHÈSE IA — AETHERIS")
+    c.setFont("Helvetica", 11)
+    c.drawString(150, height - 65, f"Dr {donnees['medecin']} | {donnees['genere_le']}")
+
+    # 👤 Infos patient
+    y = height - 120
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 13)
+    c.drawString(50, y, f"👤 Patient : {patient.prenom} {patient.nom} ({patient.age or '?'} ans, {patient.sexe or '-'})")
+
+    # 📊 Score et gravité
+    y -= 30
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Score global IA :")
+    c.setFont("Helvetica", 11)
+    c.drawString(180, y, f"{(synthese.score_global or 0) * 100:.1f}%")
+
+    y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Niveau de gravité :")
+    c.setFont("Helvetica", 11)
+    c.drawString(180, y, synthese.niveau_gravite or "—")
+
+    # 🧠 Résumé clinique
+    y -= 40
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Résumé clinique IA :")
+    y -= 20
+    c.setFont("Helvetica", 11)
+    for line in (synthese.resume or "—").split("\n"):
+        c.drawString(70, y, line)
+        y -= 15
+
+    # ⚠️ Alertes & Anomalies
+    y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Alertes critiques :")
+    y -= 20
+    c.setFont("Helvetica", 11)
+    alertes = synthese.alertes_critiques
+    if isinstance(alertes, str):
+        alertes = [alertes]
+    for a in (alertes or ["Aucune alerte détectée."]):
+        c.drawString(70, y, f"- {a}")
+        y -= 15
+
+    y -= 10
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Anomalies détectées :")
+    y -= 20
+    c.setFont("Helvetica", 11)
+    anomalies = synthese.anomalies_detectees
+    if isinstance(anomalies, str):
+        anomalies = [anomalies]
+    for a in (anomalies or ["Aucune anomalie détectée."]):
+        c.drawString(70, y, f"- {a}")
+        y -= 15
+
+    # 🧩 Recommandations IA
+    y -= 20
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, y, "Recommandations IA :")
+    y -= 20
+    c.setFont("Helvetica", 11)
+    if synthese.recommandations_ia:
+        try:
+            for r in synthese.recommandations_ia:
+                if isinstance(r, dict):
+                    c.drawString(70, y, f"• [{r.get('urgence', 'Standard')}] {r.get('texte', '')}")
+                else:
+                    c.drawString(70, y, f"• {r}")
+                y -= 15
+        except Exception:
+            c.drawString(70, y, "Erreur de parsing recommandations.")
+            y -= 15
+    else:
+        c.drawString(70, y, "Aucune recommandation enregistrée.")
+        y -= 15
+
+    # 📈 Tendances des constantes vitales
+    y -= 20
+    y = _dessiner_tendances(c, donnees, y)
+
+    # 🕓 Footer
+    c.setFont("Helvetica-Oblique", 10)
+    c.setFillColor(colors.grey)
+    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé — Rapport généré automatiquement.")
+    c.save()
+
+
+# ============================================================
+# 📑 Fiche dossier patient
+# ============================================================
+def rendre_dossier(donnees: Dict[str, Any], chemin: Destination) -> None:
+    patient = _ns(donnees["patient"])
+
+    c = canvas.Canvas(chemin, pagesize=A4)
+    width, height = A4
+
+    c.setFillColor(colors.HexColor("#1e3a8a"))
+    c.rect(0, height - 80, width, 80, stroke=0, fill=1)
+    c.setFillColor(colors.white)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(50, height - 50, f"Dossier du patient {patient.prenom or ''} {patient.nom}")
+
+    y = height - 120
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica", 11)
+    lignes = [
+        f"Âge : {patient.age if patient.age is not None else '—'} ans",
+        f"Téléphone : {patient.telephone or '—'}",
+        f"Adresse : {patient.adresse or '—'}",
+        f"Créé le : {patient.created_at.strftime('%d/%m/%Y %H:%M') if patient.created_at else '—'}",
+    ]
+    for ligne in lignes:
+        c.drawString(50, y, ligne)
+        y -= 18
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.setFillColor(colors.grey)
+    c.drawString(50, 40, "Signature numérique : AETHERIS IA Santé")
+    c.save()
+
+
+RENDUS: Dict[str, Callable[[Dict[str, Any], Destination], None]] = {
+    "analyse": rendre_analyse,
+    "facture": rendre_facture,
+    "historique": rendre_historique,
+    "synthese": rendre_synthese,
+    "dossier": rendre_dossier,
+}
+
+
+def executer(type_rendu: str, donnees: Dict[str, Any], chemin: str) -> str:
+    """Point d'entrée des processus du pool : écrit le PDF puis renvoie son chemin."""
+    temporaire = f"{chemin}.{os.getpid()}.part"
+    RENDUS[type_rendu](donnees, temporaire)
+    os.replace(temporaire, chemin)  # le fichier n'apparaît qu'une fois complet
+    return chemin
+
+
+def rendre_en_memoire(type_rendu: str, donnees: Dict[str, Any]) -> bytes:
+    """Point d'entrée des processus du pool : rendu dans un tampon, sans fichier."""
+    tampon = BytesIO()
+    RENDUS[type_rendu](donnees, tampon)
+    return tampon.getvalue()
+
+
+def prechauffer() -> int:
+    """Initialiseur des processus : charge ReportLab, Matplotlib et leurs polices une fois pour toutes."""
+    from reportlab.pdfbase.pdfmetrics import getFont
+
+    getFont("Helvetica")
+    pdf_graphiques.prechauffer()
+    return os.getpid()
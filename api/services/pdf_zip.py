@@ -0,0 +1,181 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from datetime import datetime
+from io import RawIOBase
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from api.services.etat_partage import etat_partage
+from api.services.pdf_cache import PdfCache
+from api.services.pdf_jobs import PdfJobs, PDF_WORKERS
+
+# Rendus simultanés au plus : borne la mémoire (PDF terminés en attente d'écriture)
+PDF_ZIP_FENETRE = int(os.getenv("PDF_ZIP_FENETRE", str(PDF_WORKERS * 2)))
+EXPORTS_MAX = 200
+EXPORTS_TTL = 3600
+# Intervalle minimal entre deux publications de la progression dans l'état partagé
+EXPORTS_PUBLICATION_SECONDES = 0.5
+
+# (nom dans l'archive, clé de cache, type de rendu, données)
+Entree = Tuple[str, str, str, Dict[str, Any]]
+
+
+class _TamponZip(RawIOBase):
+    """Flux non positionnable : zipfile y écrit, le générateur vide au fur et à mesure."""
+
+    def __init__(self):
+        self._morceaux: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._morceaux.append(bytes(b))
+        return len(b)
+
+    def vider(self) -> bytes:
+        contenu = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return contenu
+
+
+class ExportGroupe:
+    """Progression d'un export ZIP (consultable pendant la diffusion)."""
+
+    def __init__(self, total: int, erreurs: Dict[str, str]):
+        self.id = uuid.uuid4().hex
+        self.total = total
+        self.erreurs = dict(erreurs)  # patients écartés avant rendu : déjà comptés
+        self.termines = len(self.erreurs)
+        self.statut = "en_cours"
+        self.cree_le = datetime.utcnow()
+        self.termine_le: Optional[datetime] = None
+        self._publie_le = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "export_id": self.id,
+            "statut": self.statut,
+            "total": self.total,
+            "termines": self.termines,
+            "erreurs": len(self.erreurs),
+            "progression": round(self.termines / self.total, 3) if self.total else 1.0,
+            "cree_le": self.cree_le,
+            "termine_le": self.termine_le,
+        }
+
+    def publier(self, forcer: bool = False) -> None:
+        """Progression recopiée dans l'état partagé (au plus toutes les EXPORTS_PUBLICATION_SECONDES)."""
+        maintenant = time.monotonic()
+        if not forcer and maintenant - self._publie_le < EXPORTS_PUBLICATION_SECONDES:
+            return
+        self._publie_le = maintenant
+        try:
+            etat_partage().ecrire(f"pdf:export:{self.id}", jsonable_encoder(self.to_dict()), EXPORTS_TTL)
+        except Exception as e:
+            print(f"⚠️ Progression de l'export {self.id[:12]}… non partagée : {e}")
+
+
+class ExportsGroupes:
+    """
+    📦 Archive ZIP de rapports PDF diffusée à la volée.
+    Les rendus partent en parallèle dans le pool PDF (fenêtre bornée) et
+    chaque document est ajouté à l'archive dès qu'il est prêt : l'archive
+    complète n'est jamais en mémoire.
+    """
+
+    _exports: "OrderedDict[str, ExportGroupe]" = OrderedDict()
+    _verrou = threading.Lock()
+
+    @classmethod
+    def creer(cls, total: int, erreurs: Dict[str, str]) -> ExportGroupe:
+        export = ExportGroupe(total, erreurs)
+        with cls._verrou:
+            cls._exports[export.id] = export
+            while len(cls._exports) > EXPORTS_MAX:
+                cls._exports.popitem(last=False)
+        export.publier(forcer=True)
+        return export
+
+    @classmethod
+    def obtenir(cls, export_id: str) -> Optional[ExportGroupe]:
+        with cls._verrou:
+            return cls._exports.get(export_id)
+
+    @classmethod
+    def progression(cls, export_id: str) -> Optional[Dict[str, Any]]:
+        """Progression locale, sinon celle publiée par le worker qui diffuse l'archive."""
+        export = cls.obtenir(export_id)
+        if export is not None:
+            return export.to_dict()
+        return etat_partage().lire(f"pdf:export:{export_id}")
+
+    @staticmethod
+    def _lire_cache(cle: str) -> Optional[bytes]:
+        chemin = PdfCache.trouver(cle)
+        if chemin is None:
+            return None
+        with open(chemin, "rb") as f:
+            return f.read()
+
+    @classmethod
+    async def _contenu(cls, cle: str, type_rendu: str, donnees: Dict[str, Any]) -> bytes:
+        # Lecture disque hors de la boucle d'événements : un gros export ne bloque pas les autres requêtes
+        contenu = await run_in_threadpool(cls._lire_cache, cle)
+        if contenu is not None:
+            return contenu
+        return await PdfJobs.rendre_en_memoire(type_rendu, donnees)
+
+    @classmethod
+    async def diffuser(cls, export: ExportGroupe, entrees: List[Entree]) -> AsyncIterator[bytes]:
+        tampon = _TamponZip()
+        # Les PDF sont déjà compressés : stockage sans recompression
+        archive = zipfile.ZipFile(tampon, mode="w", compression=zipfile.ZIP_STORED)
+        a_faire = iter(entrees)
+        en_vol: Dict[asyncio.Task, str] = {}
+
+        def lancer() -> None:
+            for nom, cle, type_rendu, donnees in a_faire:
+                en_vol[asyncio.ensure_future(cls._contenu(cle, type_rendu, donnees))] = nom
+                if len(en_vol) >= PDF_ZIP_FENETRE:
+                    return
+
+        try:
+            lancer()
+            while en_vol:
+                finis, _ = await asyncio.wait(en_vol, return_when=asyncio.FIRST_COMPLETED)
+                for tache in finis:
+                    nom = en_vol.pop(tache)
+                    if tache.exception() is not None:
+                        export.erreurs[nom] = str(tache.exception())
+                    else:
+                        archive.writestr(nom, tache.result())
+                    export.termines += 1
+                await run_in_threadpool(export.publier)
+                lancer()
+                yield tampon.vider()
+
+            if export.erreurs:
+                rapport = "\n".join(f"{nom} : {erreur}" for nom, erreur in export.erreurs.items())
+                archive.writestr("erreurs.txt", rapport)
+            archive.close()
+            yield tampon.vider()
+            export.statut = "termine"
+        except BaseException:
+            export.statut = "interrompu"
+            for tache in en_vol:
+                tache.cancel()
+            raise
+        finally:
+            export.termine_le = datetime.utcnow()
+            # Publiée même si le client a coupé la connexion (portée annulée)
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(export.publier, True)
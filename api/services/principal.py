@@ -0,0 +1,178 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+AUTH_CACHE_TTL_SECONDES = float(os.getenv("AUTH_CACHE_TTL_SECONDES", "30"))
+AUTH_CACHE_TAILLE = int(os.getenv("AUTH_CACHE_TAILLE", "10000"))
+
+# Colonnes lues pour l'identité de l'appelant (jamais l'objet User complet)
+COLONNES = (User.id, User.email, User.nom, User.prenom, User.role, User.is_active, User.est_admin)
+# Modifications d'un utilisateur qui invalident ses entrées
+CHAMPS_IDENTITE = ("email", "nom", "prenom", "role", "is_active", "est_admin")
+
+Cle = Tuple[int, str]
+
+
+def version_jeton(role: Optional[str], is_active: Optional[bool]) -> str:
+    """Empreinte courte de l'état d'autorisation, portée par le JWT (claim `ver`)."""
+    return hashlib.sha1(f"{role}|{is_active is not False}".encode()).hexdigest()[:8]
+
+
+class Principal:
+    """
+    👤 Identité de l'appelant authentifié.
+    Instantané des colonnes utiles aux routes (id, nom, rôle…),
+    détaché de toute session : aucune requête SQL ni chargement paresseux.
+    Partagé entre requêtes via le cache : à ne pas modifier.
+    """
+
+    __slots__ = ("id", "email", "nom", "prenom", "role", "is_active", "est_admin", "version")
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        nom: str,
+        prenom: Optional[str],
+        role: Optional[str],
+        is_active: Optional[bool],
+        est_admin: Optional[bool],
+    ):
+        self.id = id
+        self.email = email
+        self.nom = nom
+        self.prenom = prenom
+        self.role = role
+        self.is_active = is_active is not False
+        self.est_admin = bool(est_admin)
+        self.version = version_jeton(role, is_active)
+
+    def __repr__(self) -> str:
+        return f"<Principal(id={self.id}, email={self.email}, role={self.role})>"
+
+
+class CachePrincipaux:
+    """
+    🔐 Cache LRU à durée de vie courte des principaux, par (utilisateur, version du jeton).
+    - un succès ne fait aucune requête SQL
+    - invalidé au commit d'un changement de rôle, d'activation ou d'identité,
+      et à la suppression de l'utilisateur
+    - la durée de vie borne le décalage entre workers et les mises à jour SQL
+      directes (query.update) qui échappent aux hooks de session
+    La version vient du jeton : un jeton émis après un changement de rôle ne
+    réutilise jamais l'instantané d'un jeton plus ancien.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_SECONDES, taille_max: int = AUTH_CACHE_TAILLE):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._entrees: "OrderedDict[Cle, Tuple[float, Principal]]" = OrderedDict()
+        self._verrou = threading.Lock()
+        self._invalidations = 0  # incrémenté à chaque invalidation (anti-écriture périmée)
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+
+    def obtenir(self, user_id: int, version: str, charger: Callable[[], Optional[Principal]]) -> Optional[Principal]:
+        """Principal en cache, sinon `charger()` ; None (utilisateur introuvable) n'est pas mis en cache."""
+        cle = (user_id, version)
+        maintenant = time.monotonic()
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] > maintenant:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return entree[1]
+            if entree is not None:
+                del self._entrees[cle]
+            self.echecs += 1
+            invalidations = self._invalidations
+
+        principal = charger()
+        if principal is None or self.ttl <= 0:
+            return principal
+
+        with self._verrou:
+            # Un changement a été validé pendant la lecture : on ne met pas en cache
+            if invalidations == self._invalidations:
+                self._entrees[cle] = (maintenant + self.ttl, principal)
+                self._entrees.move_to_end(cle)
+                while len(self._entrees) > self.taille_max:
+                    self._entrees.popitem(last=False)
+                    self.evictions += 1
+        return principal
+
+    def invalider(self, user_ids: Set[int]) -> None:
+        """Retire toutes les versions en cache des utilisateurs donnés."""
+        if not user_ids:
+            return
+        with self._verrou:
+            self._invalidations += 1
+            for cle in [c for c in self._entrees if c[0] in user_ids]:
+                del self._entrees[cle]
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._invalidations += 1
+            self._entrees.clear()
+
+    def statistiques(self) -> Dict[str, Any]:
+        total = self.succes + self.echecs
+        return {
+            "entrees": len(self._entrees),
+            "taille_max": self.taille_max,
+            "ttl_secondes": self.ttl,
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux_succes": round(self.succes / total, 3) if total else None,
+            "evictions": self.evictions,
+            "invalidations": self._invalidations,
+        }
+
+
+cache_principaux = CachePrincipaux()
+
+
+def charger_principal(db: Session, user_id: int) -> Optional[Principal]:
+    ligne = db.query(*COLONNES).filter(User.id == user_id).first()
+    return Principal(*ligne) if ligne is not None else None
+
+
+# =============================
+# 🪝 Invalidation au commit
+# =============================
+def _apres_flush(session: Session, flush_context: Any) -> None:
+    ids: Set[int] = session.info.setdefault("principaux_modifies", set())
+    for obj in session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, User) and obj.id is not None:
+            etat = inspect(obj)
+            if any(etat.attrs[champ].history.has_changes() for champ in CHAMPS_IDENTITE):
+                ids.add(obj.id)
+
+
+def _apres_commit(session: Session) -> None:
+    cache_principaux.invalider(session.info.pop("principaux_modifies", set()))
+
+
+def _apres_rollback(session: Session) -> None:
+    session.info.pop("principaux_modifies", None)
+
+
+for _nom, _hook in (
+    ("after_flush", _apres_flush),
+    ("after_commit", _apres_commit),
+    ("after_rollback", _apres_rollback),
+):
+    if not event.contains(Session, _nom, _hook):
+        event.listen(Session, _nom, _hook)
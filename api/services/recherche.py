@@ -0,0 +1,222 @@
+import base64
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from api.database import engine
+
+TABLE_FTS = "recherche_fts"
+# Balises des extraits (snippet) autour des termes trouvés
+MARQUE_DEBUT, MARQUE_FIN = "<mark>", "</mark>"
+# Poids bm25 : titre (nom du patient, motif, titre du document) puis contenu
+POIDS_TITRE, POIDS_CONTENU = 5.0, 1.0
+
+
+class _Source:
+    """
+    Table indexée : `code` < 8 distingue les sources dans le rowid FTS
+    (rowid = id * 8 + code), ce qui rend les triggers de mise à jour et de
+    suppression directs (pas de parcours de l'index).
+    """
+
+    def __init__(self, code: int, table: str, patient: str, titre: Tuple[str, ...], contenu: Tuple[str, ...]):
+        self.code = code
+        self.table = table
+        self.patient = patient
+        self.titre = titre
+        self.contenu = contenu
+
+    @staticmethod
+    def _texte(colonnes: Tuple[str, ...], prefixe: str) -> str:
+        return "TRIM(" + " || ' ' || ".join(f"COALESCE({prefixe}{c}, '')" for c in colonnes) + ")"
+
+    def valeurs(self, nom: str, prefixe: str = "") -> str:
+        """Expressions SQL (rowid, type, ref_id, patient_id, titre, contenu) ; prefixe 'NEW.' dans les triggers."""
+        return (
+            f"{prefixe}id * 8 + {self.code}, '{nom}', {prefixe}id, {prefixe}{self.patient}, "
+            f"{self._texte(self.titre, prefixe)}, {self._texte(self.contenu, prefixe)}"
+        )
+
+
+SOURCES: Dict[str, _Source] = {
+    "patient": _Source(
+        1, "patients", "id", ("prenom", "nom"),
+        ("pathologie", "antecedents", "allergies", "traitement", "observation_medecin"),
+    ),
+    "dossier": _Source(
+        2, "dossiers_medicaux", "patient_id", ("resume",),
+        ("antecedents", "traitements", "allergies", "pathologies", "chirurgies", "notes"),
+    ),
+    "consultation": _Source(
+        3, "consultations", "patient_id", ("motif",),
+        ("diagnostic", "diagnostic_secondaire", "traitement", "observations_medecin", "commentaire"),
+    ),
+    "document": _Source(4, "documents", "patient_id", ("titre",), ("type_document", "description")),
+    "synthese": _Source(5, "syntheses_ia", "patient_id", ("niveau_gravite", "tags"), ("resume",)),
+}
+
+
+# =============================
+# 🧱 Index et triggers (amorçage)
+# =============================
+def _ddl(nom: str, source: _Source) -> List[str]:
+    colonnes = ", ".join(source.titre + source.contenu + (source.patient,))
+    inserer = f"INSERT INTO {TABLE_FTS} (rowid, type, ref_id, patient_id, titre, contenu) VALUES ({source.valeurs(nom, 'NEW.')});"
+    supprimer = f"DELETE FROM {TABLE_FTS} WHERE rowid = OLD.id * 8 + {source.code};"
+    prefixe = f"{TABLE_FTS}_{nom}"
+    return [
+        f"DROP TRIGGER IF EXISTS {prefixe}_ai",
+        f"DROP TRIGGER IF EXISTS {prefixe}_au",
+        f"DROP TRIGGER IF EXISTS {prefixe}_ad",
+        f"CREATE TRIGGER {prefixe}_ai AFTER INSERT ON {source.table} BEGIN {inserer} END",
+        # Réindexé seulement si une colonne indexée change
+        f"CREATE TRIGGER {prefixe}_au AFTER UPDATE OF {colonnes} ON {source.table} BEGIN {supprimer} {inserer} END",
+        f"CREATE TRIGGER {prefixe}_ad AFTER DELETE ON {source.table} BEGIN {supprimer} END",
+    ]
+
+
+def _remplir(conn: Connection) -> int:
+    conn.exec_driver_sql(f"DELETE FROM {TABLE_FTS}")
+    for nom, source in SOURCES.items():
+        conn.exec_driver_sql(
+            f"INSERT INTO {TABLE_FTS} (rowid, type, ref_id, patient_id, titre, contenu) "
+            f"SELECT {source.valeurs(nom)} FROM {source.table}"
+        )
+    conn.exec_driver_sql(f"INSERT INTO {TABLE_FTS} ({TABLE_FTS}) VALUES ('optimize')")
+    return conn.exec_driver_sql(f"SELECT count(*) FROM {TABLE_FTS}").scalar()
+
+
+def installer_recherche() -> None:
+    """Crée l'index FTS5 et ses triggers ; remplit l'index à sa création."""
+    if engine.dialect.name != "sqlite":
+        print("⚠️ Recherche plein texte : FTS5 requiert SQLite — index non créé.")
+        return
+    with engine.begin() as conn:
+        existe = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLE_FTS,)
+        ).first()
+        if not existe:
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {TABLE_FTS} USING fts5("
+                "type UNINDEXED, ref_id UNINDEXED, patient_id UNINDEXED, titre, contenu, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        # Recréés à chaque démarrage : la définition des sources fait foi
+        for nom, source in SOURCES.items():
+            for instruction in _ddl(nom, source):
+                conn.exec_driver_sql(instruction)
+        if not existe:
+            print(f"🔎 Index de recherche créé : {_remplir(conn)} entrée(s)")
+
+
+# =============================
+# 🔎 Requête
+# =============================
+def expression(saisie: str) -> Optional[str]:
+    """Saisie libre → requête FTS5 sûre : chaque mot en préfixe, tous requis."""
+    mots = re.findall(r"\w+", saisie)
+    return " ".join(f'"{m}"*' for m in mots) or None
+
+
+def encoder_curseur(score: float, rowid: int) -> str:
+    raw = json.dumps([score, rowid], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decoder_curseur(curseur: str) -> Tuple[float, int]:
+    try:
+        score, rowid = json.loads(base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4)))
+        return float(score), int(rowid)
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e))
+
+
+class Recherche:
+    """
+    🔎 Recherche plein texte (SQLite FTS5) sur patients, dossiers,
+    consultations, documents et synthèses IA. Index tenu à jour par
+    triggers ; une requête renvoie une page classée (bm25) avec extraits,
+    le nom du patient joint, paginée par curseur (score, rowid).
+    """
+
+    @staticmethod
+    def types(selection: Optional[str]) -> List[str]:
+        if not selection:
+            return list(SOURCES)
+        demandes = [t.strip() for t in selection.split(",") if t.strip()]
+        inconnus = [t for t in demandes if t not in SOURCES]
+        if inconnus:
+            raise ValueError(f"Type(s) inconnu(s) : {', '.join(inconnus)} — disponibles : {', '.join(SOURCES)}")
+        return demandes
+
+    @staticmethod
+    def chercher(
+        db: Session,
+        requete: str,
+        types: List[str],
+        limite: int,
+        curseur: Optional[Tuple[float, int]] = None,
+        patient_id: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """(résultats, curseur suivant) ; seuls les extraits de la page sont calculés."""
+        filtres = [f"{TABLE_FTS} MATCH :q"]
+        params: Dict[str, Any] = {"q": requete, "n": limite + 1, "debut": MARQUE_DEBUT, "fin": MARQUE_FIN}
+        if len(types) < len(SOURCES):
+            filtres.append("type IN (" + ", ".join(f":t{i}" for i in range(len(types))) + ")")
+            params.update({f"t{i}": t for i, t in enumerate(types)})
+        if patient_id is not None:
+            filtres.append("patient_id = :patient_id")
+            params["patient_id"] = patient_id
+        apres = ""
+        if curseur is not None:
+            apres = "WHERE score > :score OR (score = :score AND rid > :rid)"
+            params.update({"score": curseur[0], "rid": curseur[1]})
+
+        lignes = db.execute(text(f"""
+            WITH classement AS (
+                SELECT rowid AS rid, bm25({TABLE_FTS}, 0, 0, 0, {POIDS_TITRE}, {POIDS_CONTENU}) AS score
+                FROM {TABLE_FTS} WHERE {' AND '.join(filtres)}
+            ),
+            page AS (
+                SELECT rid, score FROM classement {apres} ORDER BY score, rid LIMIT :n
+            )
+            SELECT f.type, f.ref_id, f.patient_id, page.rid, page.score,
+                   snippet({TABLE_FTS}, 3, :debut, :fin, '…', 8) AS titre,
+                   snippet({TABLE_FTS}, 4, :debut, :fin, '…', 16) AS extrait,
+                   p.nom, p.prenom
+            FROM page
+            JOIN {TABLE_FTS} f ON f.rowid = page.rid
+            LEFT JOIN patients p ON p.id = f.patient_id
+            WHERE {TABLE_FTS} MATCH :q
+            ORDER BY page.score, page.rid
+        """), params).all()
+
+        suivant = None
+        if len(lignes) > limite:
+            lignes = lignes[:limite]
+            suivant = encoder_curseur(lignes[-1].score, lignes[-1].rid)
+
+        return [
+            {
+                "type": l.type,
+                "id": l.ref_id,
+                "patient_id": l.patient_id,
+                "patient_nom": l.nom,
+                "patient_prenom": l.prenom,
+                "titre": l.titre,
+                "extrait": l.extrait,
+                "score": round(-l.score, 4),  # bm25 : plus petit = plus pertinent
+            }
+            for l in lignes
+        ], suivant
+
+    @staticmethod
+    def reconstruire() -> int:
+        with engine.begin() as conn:
+            total = _remplir(conn)
+        print(f"🔎 Index de recherche reconstruit : {total} entrée(s)")
+        return total
@@ -0,0 +1,169 @@
+import mimetypes
+import mmap
+import os
+import re
+import unicodedata
+from email.utils import formatdate
+from typing import Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+TAILLE_BLOC = int(os.getenv("FICHIERS_TAILLE_BLOC", str(256 * 1024)))
+CACHE_IMMUABLE = "public, max-age=31536000, immutable"
+
+_PLAGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def disposition_piece_jointe(nom: str) -> str:
+    """
+    En-tête Content-Disposition sûr pour tout nom de fichier : repli ASCII
+    dans filename= (accents retirés, guillemets et caractères non
+    imprimables remplacés), nom exact encodé RFC 5987 dans filename*.
+    """
+    encode = quote(nom, safe="")
+    if encode == nom:
+        return f'attachment; filename="{nom}"'
+    repli = unicodedata.normalize("NFKD", nom).encode("ascii", "ignore").decode()
+    repli = re.sub(r'[^\x20-\x7e]|["\\]', "_", repli) or "fichier"
+    return f'attachment; filename="{repli}"; filename*=utf-8\'\'{encode}'
+
+
+class PlageInvalide(Exception):
+    """Plage hors du fichier : 416."""
+
+
+class FichierResponse(Response):
+    """
+    📤 Réponse fichier avec plages HTTP (206 / 416), ETag et 304.
+    Le corps part sans copie par le serveur quand il le permet (extensions
+    ASGI zerocopysend / pathsend), sinon depuis une projection mémoire (mmap)
+    par blocs de TAILLE_BLOC : une visionneuse peut se positionner dans un
+    gros examen sans tout retélécharger.
+    """
+
+    def __init__(
+        self,
+        chemin: str,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        etag: Optional[str] = None,
+        immuable: bool = False,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        self.chemin = chemin
+        stat = os.stat(chemin)
+        self.taille = stat.st_size
+        self.status_code = 200
+        self.media_type = media_type or mimetypes.guess_type(chemin)[0] or "application/octet-stream"
+        self.background = None
+        self.init_headers(headers)
+
+        self.etag = etag or f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.derniere_modif = formatdate(stat.st_mtime, usegmt=True)
+        self.headers.setdefault("etag", self.etag)
+        self.headers.setdefault("last-modified", self.derniere_modif)
+        self.headers.setdefault("accept-ranges", "bytes")
+        self.headers.setdefault("content-type", self.media_type)
+        if immuable:
+            self.headers.setdefault("cache-control", CACHE_IMMUABLE)
+        if filename:
+            self.headers.setdefault("content-disposition", disposition_piece_jointe(filename))
+
+    # -----------------------------
+    # Préconditions et plages
+    # -----------------------------
+    def _correspond(self, if_none_match: str) -> bool:
+        etag = self.etag.removeprefix("W/")
+        return any(v.strip() in ("*", etag) or v.strip().removeprefix("W/") == etag for v in if_none_match.split(","))
+
+    def _plage(self, entetes: Headers) -> Optional[Tuple[int, int]]:
+        """(début, fin incluse) demandés, None pour le fichier entier."""
+        valeur = entetes.get("range")
+        if not valeur or "," in valeur:
+            return None  # absente ou multiple : fichier entier (autorisé par la RFC 9110)
+        if_range = entetes.get("if-range")
+        if if_range and if_range not in (self.etag, self.derniere_modif):
+            return None  # le fichier a changé depuis la première réponse
+
+        trouve = _PLAGE.match(valeur.strip())
+        if trouve is None or trouve.groups() == ("", ""):
+            return None
+        debut, fin = trouve.groups()
+        if debut == "":  # suffixe : les n derniers octets
+            n = int(fin)
+            if n == 0 or self.taille == 0:
+                raise PlageInvalide()
+            return max(self.taille - n, 0), self.taille - 1
+        debut = int(debut)
+        fin = min(int(fin), self.taille - 1) if fin else self.taille - 1
+        if debut >= self.taille or fin < debut:
+            raise PlageInvalide()
+        return debut, fin
+
+    # -----------------------------
+    # Envoi
+    # -----------------------------
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        entetes = Headers(scope=scope)
+        debut, fin = 0, self.taille - 1
+
+        if self._correspond(entetes.get("if-none-match", "")):
+            self.status_code = 304
+            for nom in ("content-type", "content-disposition"):
+                if nom in self.headers:
+                    del self.headers[nom]
+            await self._entetes(send)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        try:
+            plage = self._plage(entetes)
+        except PlageInvalide:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{self.taille}"
+            self.headers["content-length"] = "0"
+            await self._entetes(send)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if plage is not None:
+            debut, fin = plage
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {debut}-{fin}/{self.taille}"
+        longueur = fin - debut + 1
+        self.headers["content-length"] = str(longueur)
+        await self._entetes(send)
+
+        if scope.get("method") == "HEAD" or longueur == 0:
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            await self._corps(scope, send, debut, longueur)
+
+        if self.background is not None:
+            await self.background()
+
+    async def _entetes(self, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+    async def _corps(self, scope: Scope, send: Send, debut: int, longueur: int) -> None:
+        extensions = scope.get("extensions") or {}
+        with open(self.chemin, "rb") as f:
+            if "http.response.zerocopysend" in extensions:
+                await send({"type": "http.response.zerocopysend", "file": f, "offset": debut, "count": longueur})
+                return
+            if "http.response.pathsend" in extensions and longueur == self.taille:
+                await send({"type": "http.response.pathsend", "path": os.path.abspath(self.chemin)})
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as carte:
+                position, fin = debut, debut + longueur
+                while position < fin:
+                    suivant = min(position + TAILLE_BLOC, fin)
+                    # Copie du bloc hors de la boucle d'événements (défauts de page = lectures disque)
+                    bloc = await anyio.to_thread.run_sync(carte.__getitem__, slice(position, suivant))
+                    await send({"type": "http.response.body", "body": bloc, "more_body": suivant < fin})
+                    position = suivant
@@ -0,0 +1,222 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+from app.models.fichier_stocke import FichierStocke
+
+UPLOAD_DIR = "static/uploads"
+UPLOAD_TMP_DIR = os.path.join(UPLOAD_DIR, "tmp")
+# Taille des écritures sur disque (les morceaux reçus sont regroupés jusqu'à ce seuil)
+UPLOAD_TAILLE_BLOC = int(os.getenv("UPLOAD_TAILLE_BLOC", str(1024 * 1024)))
+UPLOAD_MAX_OCTETS = int(float(os.getenv("UPLOAD_MAX_MO", "50")) * 1024 * 1024)
+UPLOAD_IMAGERIE_MAX_OCTETS = int(float(os.getenv("UPLOAD_IMAGERIE_MAX_MO", "1024")) * 1024 * 1024)
+os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+
+# Documentation OpenAPI du corps multipart (la route lit le flux elle-même)
+OPENAPI_FICHIER = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+class FichierRecu:
+    """Fichier reçu dans un temporaire, empreinte calculée, pas encore stocké."""
+
+    def __init__(self, temporaire: str, sha256: str, taille: int, nom: Optional[str], type_mime: Optional[str]):
+        self.temporaire = temporaire
+        self.sha256 = sha256
+        self.taille = taille
+        self.nom = nom
+        self.type_mime = type_mime
+
+    def extension(self) -> str:
+        ext = os.path.splitext(self.nom or "")[1].lower()
+        if ext and len(ext) <= 10 and ext[1:].isalnum():
+            return ext
+        return mimetypes.guess_extension(self.type_mime or "") or ""
+
+
+class _Reception:
+    """État du parseur multipart : seul le champ fichier attendu est écrit sur disque."""
+
+    def __init__(self, champ: str, taille_max: int):
+        self.champ = champ
+        self.taille_max = taille_max
+        self.entetes: List[Tuple[bytes, bytes]] = []
+        self._champ_entete = b""
+        self._valeur_entete = b""
+        self.dans_fichier = False
+        self.nom: Optional[str] = None
+        self.type_mime: Optional[str] = None
+        self.trouve = False
+        self.taille = 0
+        self.attente = bytearray()  # octets reçus pas encore écrits
+        self.sha = hashlib.sha256()
+        self.fichier = tempfile.NamedTemporaryFile(dir=UPLOAD_TMP_DIR, suffix=".part", delete=False)
+
+    # --- callbacks python-multipart ---
+    def on_part_begin(self) -> None:
+        self.entetes = []
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._champ_entete += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._valeur_entete += data[start:end]
+
+    def on_header_end(self) -> None:
+        self.entetes.append((self._champ_entete.lower(), self._valeur_entete))
+        self._champ_entete, self._valeur_entete = b"", b""
+
+    def on_headers_finished(self) -> None:
+        entetes = dict(self.entetes)
+        _, options = parse_options_header(entetes.get(b"content-disposition", b""))
+        self.dans_fichier = (
+            not self.trouve
+            and options.get(b"name", b"").decode() == self.champ
+            and b"filename" in options
+        )
+        if self.dans_fichier:
+            self.trouve = True
+            self.nom = os.path.basename(options[b"filename"].decode("utf-8", "replace")) or None
+            type_mime = entetes.get(b"content-type", b"").decode("latin-1").strip()
+            self.type_mime = type_mime if type_mime and type_mime != "application/octet-stream" else None
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self.dans_fichier:
+            return
+        self.taille += end - start
+        if self.taille > self.taille_max:
+            raise HTTPException(status_code=413, detail=f"Fichier trop volumineux (max {self.taille_max // (1024 * 1024)} Mo)")
+        self.attente += data[start:end]
+
+    def on_part_end(self) -> None:
+        self.dans_fichier = False
+
+    # --- disque ---
+    def ecrire(self) -> None:
+        """Empreinte et écriture du bloc en attente (appelé hors boucle d'événements)."""
+        bloc = bytes(self.attente)
+        self.attente.clear()
+        self.sha.update(bloc)
+        self.fichier.write(bloc)
+
+
+class StockageFichiers:
+    """
+    📁 Téléversements en flux, adressés par contenu.
+    Le corps multipart est lu par morceaux : le fichier est écrit par blocs
+    dans un temporaire pendant que son SHA-256 est calculé, la taille est
+    contrôlée au fil de la lecture. Un contenu déjà connu n'est pas stocké
+    deux fois : tous les téléversements identiques pointent vers le même blob.
+    """
+
+    @staticmethod
+    async def recevoir(request: Request, taille_max: int = UPLOAD_MAX_OCTETS, champ: str = "file") -> FichierRecu:
+        type_contenu, options = parse_options_header(request.headers.get("content-type", ""))
+        if type_contenu != b"multipart/form-data" or b"boundary" not in options:
+            raise HTTPException(status_code=415, detail="Corps multipart/form-data attendu")
+
+        # Refus immédiat, avant toute lecture, si la taille annoncée dépasse déjà la limite
+        longueur = request.headers.get("content-length")
+        if longueur and longueur.isdigit() and int(longueur) > taille_max + 64 * 1024:
+            raise HTTPException(status_code=413, detail=f"Fichier trop volumineux (max {taille_max // (1024 * 1024)} Mo)")
+
+        reception = _Reception(champ, taille_max)
+        callbacks = {
+            nom: getattr(reception, nom)
+            for nom in (
+                "on_part_begin", "on_part_data", "on_part_end", "on_header_field",
+                "on_header_value", "on_header_end", "on_headers_finished",
+            )
+        }
+        parseur = multipart.MultipartParser(options[b"boundary"], callbacks)
+        try:
+            async for morceau in request.stream():
+                parseur.write(morceau)
+                if len(reception.attente) >= UPLOAD_TAILLE_BLOC:
+                    await run_in_threadpool(reception.ecrire)
+            parseur.finalize()
+            await run_in_threadpool(reception.ecrire)
+            reception.fichier.close()
+        except BaseException:
+            reception.fichier.close()
+            os.remove(reception.fichier.name)
+            raise
+
+        if not reception.trouve or not reception.taille:
+            os.remove(reception.fichier.name)
+            raise HTTPException(status_code=400, detail=f"Champ fichier '{champ}' manquant ou vide")
+
+        return FichierRecu(
+            reception.fichier.name, reception.sha.hexdigest(), reception.taille, reception.nom, reception.type_mime
+        )
+
+    @staticmethod
+    def chemin_absolu(fichier: FichierStocke) -> str:
+        return os.path.join(UPLOAD_DIR, fichier.chemin)
+
+    @classmethod
+    def stocker(cls, db: Session, recu: FichierRecu) -> FichierStocke:
+        """Range le temporaire sous son empreinte ; si le contenu existe déjà, le temporaire est supprimé."""
+        existant = db.query(FichierStocke).filter(FichierStocke.sha256 == recu.sha256).first()
+        if existant is not None and os.path.exists(cls.chemin_absolu(existant)):
+            os.remove(recu.temporaire)
+            return existant
+
+        chemin = existant.chemin if existant is not None else f"{recu.sha256[:2]}/{recu.sha256}{recu.extension()}"
+        destination = os.path.join(UPLOAD_DIR, chemin)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(recu.temporaire, destination)  # même contenu : un remplacement concurrent est sans effet
+        if existant is not None:
+            return existant  # blob disparu du disque : restauré
+
+        fichier = FichierStocke(
+            sha256=recu.sha256,
+            taille=recu.taille,
+            type_mime=recu.type_mime or mimetypes.guess_type(destination)[0],
+            nom_origine=recu.nom,
+            chemin=chemin,
+        )
+        db.add(fichier)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Même contenu téléversé en parallèle : la ligne de l'autre requête fait foi
+            db.rollback()
+            return db.query(FichierStocke).filter(FichierStocke.sha256 == recu.sha256).one()
+        db.refresh(fichier)
+        return fichier
+
+    @classmethod
+    async def televerser(cls, request: Request, db: Session, taille_max: int = UPLOAD_MAX_OCTETS) -> FichierStocke:
+        recu = await cls.recevoir(request, taille_max)
+        try:
+            return await run_in_threadpool(cls.stocker, db, recu)
+        finally:
+            if os.path.exists(recu.temporaire):
+                os.remove(recu.temporaire)
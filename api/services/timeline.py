@@ -0,0 +1,192 @@
+import base64
+import heapq
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import DateTime, and_, false, or_
+from sqlalchemy.orm import Session
+
+from api.services.dernieres_mesures import SYSTEMES
+from api.services.pagination import valeur_stockee
+from app.models.consultation import Consultation
+from app.models.etat_clinique import EtatClinique
+from app.models.biologie import Biologie
+from app.models.radiologie import Radiologie
+from app.models.soins import SoinsInfirmier
+from app.models.urgence import Urgence
+from app.models.hospitalisation import Hospitalisation
+from app.models.analyse_ia import AnalyseIA
+
+# Curseur : (date telle que stockée, source, id) du dernier événement renvoyé
+Curseur = Tuple[Any, str, int]
+
+
+class _Source:
+    """Table d'événements : colonne de date, colonnes projetées et titre affiché."""
+
+    def __init__(self, model: Any, date: Any, colonnes: Tuple[str, ...], titre: Callable[[Dict[str, Any]], str]):
+        self.model = model
+        self.date = date
+        self.tri = valeur_stockee(date)  # comparée et triée telle que stockée (cf. pagination)
+        self.colonnes = tuple(c for c in colonnes if hasattr(model, c))
+        self.titre = titre
+
+
+def _mesure(systeme: str) -> _Source:
+    definition = SYSTEMES[systeme]
+    return _Source(
+        definition.model, definition.model.created_at, definition.colonnes,
+        lambda v, s=systeme: f"Mesure {s} — {SYSTEMES[s].niveau(v)}",
+    )
+
+
+SOURCES: Dict[str, _Source] = {
+    "consultation": _Source(
+        Consultation, Consultation.date_consultation, ("motif", "diagnostic", "statut_consultation"),
+        lambda v: f"Consultation : {v['motif']}",
+    ),
+    **{systeme: _mesure(systeme) for systeme in SYSTEMES},
+    "etat_clinique": _Source(
+        EtatClinique, EtatClinique.created_at, ("spo2", "temperature", "rythme_cardiaque"),
+        lambda v: "État clinique",
+    ),
+    "biologie": _Source(
+        Biologie, Biologie.date_prelevement, ("type_analyse", "etat", "interpretation"),
+        lambda v: f"Biologie : {v['type_analyse']}",
+    ),
+    "radiologie": _Source(
+        Radiologie, Radiologie.date_examen, ("type_examen", "statut_validation", "niveau_risque"),
+        lambda v: f"Radiologie : {v['type_examen']}",
+    ),
+    "soins": _Source(
+        SoinsInfirmier, SoinsInfirmier.date, ("type_soin", "acte", "effectue_par"),
+        lambda v: f"Soin : {v['type_soin']}",
+    ),
+    "urgence": _Source(
+        Urgence, Urgence.date_signalement, ("type_urgence", "niveau_gravite", "statut"),
+        lambda v: f"Urgence : {v['type_urgence']}",
+    ),
+    "hospitalisation": _Source(
+        Hospitalisation, Hospitalisation.date_entree, ("service", "motif", "statut"),
+        lambda v: f"Hospitalisation : {v['service']}",
+    ),
+    "analyse_ia": _Source(
+        AnalyseIA, AnalyseIA.created_at, ("type_analyse", "niveau_gravite", "score_gravite", "resume"),
+        lambda v: f"Analyse IA : {v['niveau_gravite'] or v['type_analyse'] or ''}".rstrip(" :"),
+    ),
+}
+
+
+# =============================
+# Curseur composite opaque
+# =============================
+def encoder_curseur(curseur: Curseur) -> str:
+    date, source, id_ = curseur
+    raw = json.dumps([date.isoformat() if isinstance(date, datetime) else date, source, id_], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decoder_curseur(curseur: str) -> Curseur:
+    """ValueError si le curseur est illisible."""
+    try:
+        raw = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4))
+        date, source, id_ = json.loads(raw)
+        if source not in SOURCES or not (date is None or isinstance(date, str)):
+            raise ValueError(source)
+        if date is not None and isinstance(SOURCES[source].tri.type, DateTime):
+            date = datetime.fromisoformat(date)
+        return date, source, int(id_)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(str(e))
+
+
+def _cle(evenement: Dict[str, Any]) -> Tuple[bool, Any, str, int]:
+    """Ordre global décroissant : date stockée (NULL en dernier), puis source, puis id."""
+    tri = evenement["tri"]
+    return tri is not None, tri, evenement["type"], evenement["id"]
+
+
+# =============================
+# Lecture d'une source après le curseur
+# =============================
+def _apres(nom: str, source: _Source, curseur: Optional[Curseur]) -> Any:
+    """Condition SQL « strictement après le curseur » pour cette source (None : pas de filtre)."""
+    if curseur is None:
+        return None
+    date, source_c, id_c = curseur
+    id_col, tri = source.model.id, source.tri
+    if date is None:
+        # Curseur dans la zone des dates NULL (fin de la frise)
+        if nom > source_c:
+            return false()
+        if nom == source_c:
+            return and_(tri.is_(None), id_col < id_c)
+        return tri.is_(None)
+    if nom == source_c:
+        return or_(tri < date, and_(tri == date, id_col < id_c), tri.is_(None))
+    if nom < source_c:
+        return or_(tri <= date, tri.is_(None))
+    return or_(tri < date, tri.is_(None))
+
+
+def _evenements(db: Session, nom: str, patient_id: int, curseur: Optional[Curseur], limite: int) -> Iterator[Dict[str, Any]]:
+    """Au plus `limite` événements de la source, triés comme la frise (index patient_id, date)."""
+    source = SOURCES[nom]
+    colonnes = [getattr(source.model, c) for c in source.colonnes]
+    requete = (
+        db.query(source.model.id, source.date, source.tri.label("tri"), *colonnes)
+        .filter(source.model.patient_id == patient_id)
+    )
+    condition = _apres(nom, source, curseur)
+    if condition is not None:
+        requete = requete.filter(condition)
+    lignes = requete.order_by(source.date.desc().nulls_last(), source.model.id.desc()).limit(limite).all()
+
+    for ligne in lignes:
+        valeurs = dict(zip(source.colonnes, ligne[3:]))
+        yield {
+            "type": nom,
+            "id": ligne[0],
+            "date": ligne[1],
+            "tri": ligne[2],
+            "titre": source.titre(valeurs),
+            "details": valeurs,
+        }
+
+
+class Timeline:
+    """
+    🕰️ Frise chronologique d'un patient sur toutes les sources d'événements.
+    Chaque page lit au plus `limite + 1` lignes par source, après le curseur
+    composite (date, source, id), et les fusionne par tas (heapq.merge) :
+    coût O(limite × sources) quelle que soit la longueur de l'historique.
+    """
+
+    @staticmethod
+    def types(selection: Optional[str]) -> List[str]:
+        if not selection:
+            return list(SOURCES)
+        demandes = [t.strip() for t in selection.split(",") if t.strip()]
+        inconnus = [t for t in demandes if t not in SOURCES]
+        if inconnus:
+            raise ValueError(f"Type(s) inconnu(s) : {', '.join(inconnus)} — disponibles : {', '.join(SOURCES)}")
+        return [t for t in SOURCES if t in demandes]
+
+    @staticmethod
+    def page(
+        db: Session, patient_id: int, types: List[str], limite: int, curseur: Optional[Curseur] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """(événements, curseur de la page suivante ou None)."""
+        flux = [_evenements(db, nom, patient_id, curseur, limite + 1) for nom in types]
+        evenements = list(islice(heapq.merge(*flux, key=_cle, reverse=True), limite + 1))
+
+        suivant = None
+        if len(evenements) > limite:
+            evenements = evenements[:limite]
+            dernier = evenements[-1]
+            suivant = encoder_curseur((dernier["tri"], dernier["type"], dernier["id"]))
+        for evenement in evenements:
+            del evenement["tri"]
+        return evenements, suivant
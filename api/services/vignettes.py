@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Set
+
+from api.services import vignettes_rendu
+from api.services.stockage import StockageFichiers, UPLOAD_DIR
+from app.models.fichier_stocke import FichierStocke
+
+DERIVES_DIR = os.path.join(UPLOAD_DIR, "derives")
+VIGNETTES_WORKERS = int(os.getenv("VIGNETTES_WORKERS", "1"))
+FICHIERS_URL = "/fichiers"
+
+# Chemin d'un blob adressé par contenu : "ab/ab…(64 hex).ext"
+_BLOB = re.compile(r"(?:^|/)([0-9a-f]{2})/(\1[0-9a-f]{62})(?:\.\w+)?$")
+
+
+class Vignettes:
+    """
+    🖼️ Vignettes et aperçus des fichiers d'imagerie.
+    Générés en arrière-plan dans un pool de processus après chaque
+    téléversement, rangés sous l'empreinte du fichier source : ils sont
+    partagés par tous les téléversements identiques. Les schémas de lecture
+    n'exposent leur URL qu'une fois le fichier présent.
+    """
+
+    _pool: Optional[ProcessPoolExecutor] = None
+    _en_cours: Set[str] = set()
+    _verrou = threading.Lock()
+
+    @classmethod
+    def pool(cls) -> ProcessPoolExecutor:
+        with cls._verrou:
+            if cls._pool is None:
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=VIGNETTES_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=vignettes_rendu.prechauffer,
+                )
+            return cls._pool
+
+    @classmethod
+    def arreter(cls) -> None:
+        with cls._verrou:
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=False, cancel_futures=True)
+                cls._pool = None
+
+    @staticmethod
+    def chemin(sha256: str, nom: str) -> str:
+        return os.path.join(DERIVES_DIR, sha256[:2], f"{sha256}_{vignettes_rendu.TAILLES[nom]}.jpg")
+
+    @classmethod
+    def url(cls, chemin_source: Optional[str], nom: str) -> Optional[str]:
+        """URL du dérivé `nom` d'un fichier stocké, None s'il n'existe pas (encore)."""
+        trouve = _BLOB.search(chemin_source or "")
+        if trouve is None:
+            return None
+        chemin = cls.chemin(trouve.group(2), nom)
+        if not os.path.exists(chemin):
+            return None
+        return f"{FICHIERS_URL}/{os.path.relpath(chemin, UPLOAD_DIR).replace(os.sep, '/')}"
+
+    @classmethod
+    def planifier(cls, fichier: FichierStocke) -> Optional[Future]:
+        """Soumet la génération des dérivés manquants d'une image (sans attendre)."""
+        if not vignettes_rendu.est_image(fichier.type_mime, fichier.chemin):
+            return None
+        destinations: Dict[str, str] = {nom: cls.chemin(fichier.sha256, nom) for nom in vignettes_rendu.TAILLES}
+        if all(os.path.exists(d) for d in destinations.values()):
+            return None
+
+        with cls._verrou:
+            if fichier.sha256 in cls._en_cours:
+                return None
+            cls._en_cours.add(fichier.sha256)
+
+        sha256 = fichier.sha256
+        future = cls.pool().submit(vignettes_rendu.generer, StockageFichiers.chemin_absolu(fichier), destinations)
+        future.add_done_callback(lambda f: cls._terminer(sha256, f))
+        return future
+
+    @classmethod
+    def _terminer(cls, sha256: str, future: Future) -> None:
+        with cls._verrou:
+            cls._en_cours.discard(sha256)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"⚠️ Vignettes non générées pour {sha256[:12]}… : {future.exception()}")
@@ -0,0 +1,99 @@
+"""
+🖼️ Génération des vignettes et aperçus d'imagerie.
+
+Exécuté dans les processus du pool de vignettes : ni base ni FastAPI.
+Les images sont décodées au plus près de la taille cible (draft JPEG,
+réduction NumPy par blocs pour les grandes matrices 16 bits et DICOM),
+puis réduites par Pillow et écrites en JPEG de façon atomique.
+"""
+import os
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Plus grand côté, en pixels, de chaque dérivé
+TAILLES: Dict[str, int] = {"apercu": 1280, "vignette": 256}
+QUALITE_JPEG = 80
+EXTENSIONS_DICOM = (".dcm", ".dicom")
+
+
+def est_image(type_mime: Optional[str], chemin: str) -> bool:
+    return (type_mime or "").startswith("image/") or type_mime == "application/dicom" or chemin.lower().endswith(EXTENSIONS_DICOM)
+
+
+def _est_dicom(source: str) -> bool:
+    with open(source, "rb") as f:
+        return f.read(132)[128:] == b"DICM"
+
+
+def _depuis_tableau(tableau: np.ndarray) -> Image.Image:
+    """Matrice brute (DICOM, 16 bits, flottants) → image 8 bits réduite près de la taille d'aperçu."""
+    tableau = np.asarray(tableau, dtype=np.float32)
+    if tableau.ndim == 3 and tableau.shape[-1] not in (3, 4):
+        tableau = tableau[tableau.shape[0] // 2]  # volume multi-coupes : coupe centrale
+
+    # Réduction par moyenne de blocs entiers : bien moins coûteuse qu'un rééchantillonnage complet
+    facteur = max(tableau.shape[:2]) // TAILLES["apercu"]
+    if facteur > 1:
+        h, w = (tableau.shape[0] // facteur) * facteur, (tableau.shape[1] // facteur) * facteur
+        tableau = tableau[:h, :w].reshape(h // facteur, facteur, w // facteur, facteur, *tableau.shape[2:]).mean(axis=(1, 3))
+
+    # Fenêtrage robuste aux valeurs extrêmes
+    bas, haut = np.percentile(tableau, (0.5, 99.5))
+    tableau = np.clip((tableau - bas) * (255.0 / max(haut - bas, 1e-6)), 0, 255).astype(np.uint8)
+    return Image.fromarray(tableau)
+
+
+def _lire_dicom(source: str) -> Image.Image:
+    try:
+        import pydicom
+    except ImportError:
+        raise ValueError("pydicom non installé : aperçu DICOM indisponible")
+    return _depuis_tableau(pydicom.dcmread(source).pixel_array)
+
+
+def _ouvrir(source: str) -> Image.Image:
+    if _est_dicom(source):
+        return _lire_dicom(source)
+
+    image = Image.open(source)
+    image.draft("RGB", (TAILLES["apercu"], TAILLES["apercu"]))  # JPEG : décodage directement réduit
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("I", "I;16", "I;16B", "I;16L", "F"):
+        return _depuis_tableau(np.asarray(image))
+    return image
+
+
+def _rvb(image: Image.Image) -> Image.Image:
+    """JPEG : niveaux de gris conservés, transparence aplatie sur fond blanc."""
+    if image.mode == "L":
+        return image
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        fond = Image.new("RGB", image.size, "white")
+        fond.paste(image, mask=image.getchannel("A"))
+        return fond
+    return image.convert("RGB")
+
+
+def _enregistrer(image: Image.Image, destination: str) -> None:
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temporaire = f"{destination}.{os.getpid()}.part"
+    image.save(temporaire, format="JPEG", quality=QUALITE_JPEG, optimize=True, progressive=True)
+    os.replace(temporaire, destination)
+
+
+def generer(source: str, destinations: Dict[str, str]) -> Dict[str, str]:
+    """Point d'entrée des processus : aperçu puis vignette (tirée de l'aperçu)."""
+    image = _rvb(_ouvrir(source))
+    for nom in sorted(TAILLES, key=TAILLES.get, reverse=True):
+        image.thumbnail((TAILLES[nom], TAILLES[nom]), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        _enregistrer(image, destinations[nom])
+    return destinations
+
+
+def prechauffer() -> int:
+    """Initialiseur des processus : charge Pillow et ses greffons."""
+    Image.init()
+    return os.getpid()
@@ -59,6 +59,16 @@ from app.models.finance import Finance
 from app.models.visual_ia import VisualIA
 from app.models.visual_ia import  VisualIASettings
 
+# 📊 Compteurs matérialisés
+from app.models.compteur import Compteur
+from app.models.derniere_mesure import DerniereMesure
+
+# 📁 Fichiers téléversés
+from app.models.fichier_stocke import FichierStocke
+
+# 🔤 Index des noms de patients (recherche tolérante)
+from app.models.nom_patient import NomPatient, TrigrammeNom
+
 
 # =============================
 # Exposition
@@ -104,4 +114,9 @@ __all__ = [
     "Specialite",
     "Medecin",
     "VisualIASettings",
+    "Compteur",
+    "DerniereMesure",
+    "FichierStocke",
+    "NomPatient",
+    "TrigrammeNom",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Float, String, JSON
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Float, String, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from api.database import Base
@@ -6,7 +6,10 @@ from api.database import Base
 
 class AnalyseIA(Base):
     __tablename__ = "analyses_ia"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("idx_analyse_ia_patient_date", "patient_id", "created_at"),  # ⚡ frise chronologique (curseur par patient)
+        {"extend_existing": True},  # ⚠️ doit être en dernier
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from api.database import Base
 
 class Biologie(Base):
     __tablename__ = "biologies"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("idx_biologie_patient_date", "patient_id", "date_prelevement"),  # ⚡ frise chronologique (curseur par patient)
+        {"extend_existing": True},  # ⚠️ doit être en dernier
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Float, DateTime
+from datetime import datetime
+from api.database import Base
+
+
+class Compteur(Base):
+    """Compteur matérialisé (COUNT / SUM) maintenu à chaque écriture."""
+
+    __tablename__ = "compteurs"
+    __table_args__ = {"extend_existing": True}
+
+    cle = Column(String(100), primary_key=True)        # ex: "patients_total", "ambulances_etat:Disponible"
+    valeur = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
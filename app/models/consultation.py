@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from api.database import Base
@@ -6,7 +6,10 @@ from api.database import Base
 
 class Consultation(Base):
     __tablename__ = "consultations"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("idx_consultation_patient_date", "patient_id", "date_consultation"),  # ⚡ frise chronologique (curseur par patient)
+        {"extend_existing": True},  # ⚠️ doit être en dernier
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+from api.database import Base
+
+
+class DerniereMesure(Base):
+    """Dernière mesure connue d'un patient pour une fonction vitale (une ligne par couple)."""
+
+    __tablename__ = "dernieres_mesures"
+    __table_args__ = {"extend_existing": True}
+
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    systeme = Column(String(30), primary_key=True, index=True)   # ex: "cardiaque", "pulmonaire"
+
+    mesure_id = Column(Integer, nullable=False)                 # id de la ligne source
+    mesure_le = Column(DateTime, nullable=True)                 # created_at de la ligne source
+    valeurs = Column(JSON, nullable=True)                       # constantes suivies (fc, spo2, glucose...)
+    niveau = Column(String(20), nullable=False, default="normal")  # normal / alerte / critique
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
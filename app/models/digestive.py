@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from api.database import Base
@@ -6,7 +6,10 @@ from api.database import Base
 
 class DigestiveData(Base):
     __tablename__ = "digestive_data"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("idx_digestive_patient_date", "patient_id", "created_at"),  # ⚡ frise chronologique (curseur par patient)
+        {"extend_existing": True},  # ⚠️ doit être en dernier
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from api.database import Base
@@ -6,7 +6,10 @@ from api.database import Base
 
 class DossierMedical(Base):
     __tablename__ = "dossiers_medicaux"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("idx_dossier_patient", "patient_id"),  # ⚡ dossier d'un patient, complétion des dossiers manquants
+        {"extend_existing": True},  # ⚠️ doit être en dernier
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
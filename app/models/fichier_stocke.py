@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from datetime import datetime
+from api.database import Base
+
+
+class FichierStocke(Base):
+    """Fichier téléversé, stocké une seule fois par contenu (adressé par SHA-256)."""
+
+    __tablename__ = "fichiers_stockes"
+    __table_args__ = {"extend_existing": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    taille = Column(BigInteger, nullable=False)                 # octets
+    type_mime = Column(String, nullable=True)                   # ex: image/png, application/dicom
+    nom_origine = Column(String, nullable=True)                 # nom du premier téléversement
+    chemin = Column(String, nullable=False)                     # relatif à static/uploads : "ab/abcd…ef.png"
+
+    created_at = Column(DateTime, default=datetime.utcnow)
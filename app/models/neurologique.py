@@ -1,12 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from api.database import Base
 
 
 class NeurologiqueData(Base):
     __tablename__ = "neurologique_data"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("idx_neurologique_patient_date", "patient_id", "created_at"),  # ⚡ frise chronologique (curseur par patient)
+        {"extend_existing": True},  # ⚠️ doit être en dernier
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from api.database import Base
+
+
+class NomPatient(Base):
+    """Clés de recherche du nom d'un patient (une ligne par patient, tenue par api/services/noms_patients.py)."""
+
+    __tablename__ = "noms_patients"
+    __table_args__ = {"extend_existing": True}
+
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    cle = Column(String, nullable=False, index=True)                   # "nom prenom" sans accents, minuscules
+    cle_inverse = Column(String, nullable=False, index=True)           # "prenom nom"
+    phonetique = Column(String, nullable=False, index=True)            # clé phonétique de "nom prenom"
+    phonetique_inverse = Column(String, nullable=False, index=True)    # clé phonétique de "prenom nom"
+
+
+class TrigrammeNom(Base):
+    """Trigrammes des mots du nom normalisé : recherche approchée (fautes de frappe)."""
+
+    __tablename__ = "trigrammes_noms"
+    __table_args__ = {"extend_existing": True}
+
+    trigramme = Column(String(3), primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -33,4 +33,4 @@ class SyntheseIA(Base):
 
     # Relations
     patient = relationship("Patient", backref="syntheses_ia")
-    medecin = relationship("User", backref="syntheses_ia", lazy="joined")
+    medecin = relationship("User", backref="syntheses_ia")  # chargé à la demande : SyntheseIARead n'expose que medecin_id
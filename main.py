@@ -1,204 +1,170 @@
+from contextlib import asynccontextmanager
+import importlib
+import os
+import time
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
 from dotenv import load_dotenv
-import os
-# =============================
-# Initialisation de l'app
-# =============================
-app = FastAPI(
-    title="Aetheris IA Santé",
-    description="Plateforme médicale intelligente - API",
-    version="2.0.0",
-)
+
+load_dotenv()
+
+from api.services.amorcage import Amorcage
+from api.services.compteurs import Compteurs
+from api.services.cache_mesures import cache_dernieres_mesures
+from api.services.pdf_jobs import PdfJobs
+from api.services.vignettes import Vignettes
+from api.services.mots_de_passe import MotsDePasse
+from api.services.budget_requetes import BUDGET_REQUETES, BudgetRequetesMiddleware
+
+# 1 : affiche au démarrage le temps d'import de chaque routeur et des tâches d'amorçage
+PROFIL_DEMARRAGE = os.getenv("PROFIL_DEMARRAGE", "0") == "1"
 
 # ============================================================
 # ⚙️ CORS — Sécurisé (Render + Vercel + Domaine officiel)
 # ============================================================
-from fastapi.middleware.cors import CORSMiddleware
-
 origins = [
     "https://aetheris-frontend-cmxmtmr6p-ateba-ramses-projects.vercel.app",  # Frontend Vercel
     "https://aetheris.health",  # Domaine officiel à venir
     "https://www.aetheris.health",
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-
-# Import DB
-from api.database import Base, engine, SessionLocal
-from app import models  # ✅ charge tous les modèles via app/models/__init__.py
-
-load_dotenv()
-
-# Import des routes
-from api.routes import auth, patient, etat_clinique, consultation, diagnostic, rendezvous, dossier_medical,neurologique, bloc_operatoire, urgence, visual_ia, finance
-from api.routes.auth import get_password_hash
-from api.routes import admin
-from api.routes import aetheris
-from api.routes import synthese_ia
-from api.routes import user
-from api.routes import dashboard
-from api.routes import patient_critique
-from api.routes import document
-from api.routes import cardiaque
-from api.routes import pulmonary
-from api.routes import digestive
-from api.routes import metabolique
-from api.routes import renal
-from api.routes import aetheris_chat
-from api.routes import biologie
-from api.routes import pharmacie
-from api.routes import imagerie
-from api.routes import radiologie
-from api.routes import hospitalisation
-from api.routes import soins
-from api.routes import facture
-from api.routes import rh
-from api.routes import notification
-from api.routes import pdf_export
-from api.routes import ambulance
-from api.routes import specialite
-from api.routes import user
-from api.routes import analyse_ia
-from api.routes import aetheris_chat
-
-
-
-
-
-
-
-# ============================
-# Routes
 # =============================
-app.include_router(auth.router)
-app.include_router(patient.router)
-app.include_router(etat_clinique.router)
-app.include_router(consultation.router)
-app.include_router(diagnostic.router)
-app.include_router(rendezvous.router)
-app.include_router(dossier_medical.router)
-app.include_router(admin.router)
-app.include_router(aetheris.router)
-app.include_router(synthese_ia.router)
-app.include_router(analyse_ia.router)
-app.include_router(dashboard.router)
-app.include_router(patient_critique.router)
-app.include_router(document.router)
-app.include_router(cardiaque.router)
-app.include_router(pulmonary.router)
-app.include_router(neurologique.router)
-app.include_router(digestive.router)
-app.include_router(metabolique.router)
-app.include_router(renal.router)
-app.include_router(aetheris_chat.router)
-app.include_router(biologie.router)
-app.include_router(pharmacie.router)
-app.include_router(imagerie.router)
-app.include_router(radiologie.router)
-app.include_router(hospitalisation.router)
-app.include_router(bloc_operatoire.router)
-app.include_router(soins.router)
-app.include_router(facture.router)
-app.include_router(rh.router)
-app.include_router(notification.router)
-app.include_router(pdf_export.router)
-app.include_router(urgence.router)
-app.include_router(finance.router)
-app.include_router(ambulance.router)
-app.include_router(specialite.router)
-app.include_router(visual_ia.router)
-app.include_router(user.router)
-app.include_router(aetheris_chat.router)
-
-from api.routes import websockets
-app.include_router(websockets.router)
+# Routes (modules de api/routes, dans l'ordre d'inclusion)
+# =============================
+ROUTEURS = [
+    "auth",
+    "patient",
+    "etat_clinique",
+    "consultation",
+    "diagnostic",
+    "rendezvous",
+    "dossier_medical",
+    "admin",
+    "aetheris",
+    "synthese_ia",
+    "analyse_ia",
+    "dashboard",
+    "patient_critique",
+    "document",
+    "cardiaque",
+    "pulmonary",
+    "neurologique",
+    "digestive",
+    "metabolique",
+    "renal",
+    "aetheris_chat",
+    "biologie",
+    "pharmacie",
+    "imagerie",
+    "radiologie",
+    "hospitalisation",
+    "bloc_operatoire",
+    "soins",
+    "facture",
+    "rh",
+    "notification",
+    "pdf_export",
+    "urgence",
+    "finance",
+    "ambulance",
+    "specialite",
+    "visual_ia",
+    "fichiers",
+    "user",
+    "recherche",
+    "websockets",
+]
 
 
 # =============================
-# Root Endpoint
+# 📊 Services de chaque worker
 # =============================
-@app.get("/")
-def root():
-    return {
-        "status": "✅ API Aetheris IA Santé opérationnelle",
-        "version": "1.0.0",
-    }
+def demarrer_processus():
+    """
+    Ce qui vit dans chaque processus : l'abonnement aux invalidations du
+    cache des mesures. La réconciliation et la reconstruction initiales font
+    partie de l'amorçage (worker élu seul), tout comme la réconciliation
+    périodique.
+    """
+    if Amorcage.est_elu():
+        Compteurs.demarrer_reconciliation()
+    cache_dernieres_mesures.demarrer_invalidation()
 
 
 # =============================
-# Création auto des tables
+# 🔄 Cycle de vie
 # =============================
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables et comptes par défaut : une seule fois par processus, hors import
+    durees = await run_in_threadpool(Amorcage.executer)
+    await run_in_threadpool(demarrer_processus)
+    PdfJobs.demarrer()  # préchauffage du pool en arrière-plan
+    if PROFIL_DEMARRAGE:
+        for nom, duree in durees.items():
+            print(f"⏱️ Amorçage {nom} : {duree * 1000:.0f} ms")
+    yield
+    Compteurs.arreter_reconciliation()
+    PdfJobs.arreter()
+    Vignettes.arreter()
+    MotsDePasse.arreter()
 
 
 # =============================
-# Création d’utilisateurs par défaut au démarrage
+# Initialisation de l'app
 # =============================
-from app.models.specialite import Specialite
-
-def get_or_create_specialite(db: Session, nom: str):
-    """Créer ou récupérer une spécialité par son nom"""
-    specialite = db.query(Specialite).filter(Specialite.nom == nom).first()
-    if not specialite:
-        specialite = Specialite(nom=nom)
-        db.add(specialite)
-        db.commit()
-        db.refresh(specialite)
-    return specialite
-
-
-def create_default_users():
-    db: Session = SessionLocal()
-    try:
-        # ✅ Utilisateur générique
-        default_email = "acces@aetheris.com"
-        user = db.query(models.User).filter(models.User.email == default_email).first()
-        if not user:
-            default_user = models.User(
-                nom="Accès",
-                prenom="Générique",
-                email=default_email,
-                hashed_password=get_password_hash("motdepasse123"),
-                role="acces",
-                specialite_id=None,   # pas de spécialité
-                is_active=True,
-                is_verified=True,
-            )
-            db.add(default_user)
-
-        # ✅ Super administrateur
-        admin_email = "superadmin@aetheris.com"
-        admin = db.query(models.User).filter(models.User.email == admin_email).first()
-        if not admin:
-            spec = get_or_create_specialite(db, "Administration")
-            superadmin = models.User(
-                nom="Admin",
-                prenom="Suprême",
-                email=admin_email,
-                hashed_password=get_password_hash("admin123"),
-                role="admin",
-                specialite_id=spec.id,  # ✅ relation propre avec la table spécialités
-                is_active=True,
-                is_verified=True,
-            )
-            db.add(superadmin)
-
-        db.commit()
-        print("✅ Utilisateurs par défaut créés : acces@aetheris.com et superadmin@aetheris.com")
-
-    finally:
-        db.close()
-
-
-# Appelé automatiquement au démarrage
-create_default_users()
+def create_app() -> FastAPI:
+    """
+    Fabrique de l'application : aucune écriture en base ni client externe
+    à l'import. Les bibliothèques lourdes (ReportLab, matplotlib, OpenAI)
+    sont chargées à leur première utilisation.
+    """
+    debut = time.perf_counter()
+    app = FastAPI(
+        title="Aetheris IA Santé",
+        description="Plateforme médicale intelligente - API",
+        version="2.0.0",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Link"],  # pagination par curseur
+    )
+    if BUDGET_REQUETES != "off":
+        # Détecteur de N+1 : requêtes SQL comptées par route (BUDGET_REQUETES=strict dans les tests)
+        app.add_middleware(BudgetRequetesMiddleware, mode=BUDGET_REQUETES)
+
+    profil = {}
+    for nom in ROUTEURS:
+        t0 = time.perf_counter()
+        module = importlib.import_module(f"api.routes.{nom}")
+        profil[nom] = time.perf_counter() - t0
+        app.include_router(module.router)
+
+    # =============================
+    # Root Endpoint
+    # =============================
+    @app.get("/")
+    def root():
+        return {
+            "status": "✅ API Aetheris IA Santé opérationnelle",
+            "version": "1.0.0",
+        }
+
+    total = time.perf_counter() - debut
+    app.state.profil_demarrage = {"total": total, "routeurs": profil}
+    if PROFIL_DEMARRAGE:
+        print(f"⏱️ Application créée en {total * 1000:.0f} ms — routeurs les plus lents :")
+        for nom, duree in sorted(profil.items(), key=lambda x: x[1], reverse=True)[:10]:
+            print(f"   {duree * 1000:7.1f} ms  api.routes.{nom}")
+    return app
+
+
+app = create_app()
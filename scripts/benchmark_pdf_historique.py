@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from sqlalchemy import create_engine, insert
+
+# --- 🔧 Import du projet ---
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api.database as database
+from app.models import Patient, AnalyseIA
+from api.services.pdf_historique import rendre_historique
+
+TAILLES = [1_000, 10_000]
+TEXTE_LONG = (
+    "Tachycardie sinusale persistante avec désaturation nocturne modérée ; "
+    "corrélation probable avec l'épisode infectieux récent et la déshydratation. "
+) * 4
+
+
+# ------------------------------------------
+# ⚙️ Base SQLite temporaire (jamais test.db)
+# ------------------------------------------
+def preparer_base(chemin: str) -> None:
+    engine = create_engine(f"sqlite:///{chemin}")
+    database.Base.metadata.create_all(engine, tables=[Patient.__table__, AnalyseIA.__table__])
+
+    debut = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        for patient_id, taille in enumerate(TAILLES, start=1):
+            conn.execute(insert(Patient), [{"id": patient_id, "nom": f"Bench{taille}", "prenom": "Patient"}])
+            conn.execute(insert(AnalyseIA), [
+                {
+                    "patient_id": patient_id,
+                    "diagnostic": f"Diagnostic {i} : {TEXTE_LONG}",
+                    "prediction": f"Évolution {i}\nRisque modéré\n{TEXTE_LONG}",
+                    "plan": f"Surveillance rapprochée, bilan sanguin, réévaluation J+{i % 7}.",
+                    "disclaimer": "-",
+                    "created_at": debut + timedelta(hours=i),
+                }
+                for i in range(taille)
+            ])
+
+
+def mesurer(chemin: str, patient_id: int, taille: int) -> None:
+    """Exécuté dans un processus neuf, comme dans le pool PDF : pic RSS propre à chaque taille."""
+    database.SessionLocal.configure(bind=create_engine(f"sqlite:///{chemin}"))
+    donnees = {
+        "patient": {"id": patient_id, "nom": f"Bench{taille}", "prenom": "Patient"},
+        "total": taille,
+        "dernier_id": 10 ** 9,
+    }
+    avant = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tampon = BytesIO()
+    debut = time.perf_counter()
+    rendre_historique(donnees, tampon)
+    duree = time.perf_counter() - debut
+    apres = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    taille_pdf = len(tampon.getvalue())
+    # ReportLab garde le document produit en mémoire jusqu'à save() : on le déduit du pic
+    pic = (apres - avant) * 1024
+    print(
+        f"📚 {taille:>6} analyses : {duree:6.1f} s | PDF {taille_pdf / 1e6:6.2f} Mo | "
+        f"pic RSS +{pic / 1e6:6.1f} Mo | hors document +{max(pic - taille_pdf, 0) / 1e6:6.1f} Mo",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    contexte = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "benchmark.db")
+        preparer_base(chemin)
+        for patient_id, taille in enumerate(TAILLES, start=1):
+            processus = contexte.Process(target=mesurer, args=(chemin, patient_id, taille))
+            processus.start()
+            processus.join()
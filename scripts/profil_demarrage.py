@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+# --- 🔧 Racine du projet ---
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliothèques qui ne doivent être chargées qu'à leur première utilisation
+LOURDES = ("openai", "reportlab", "matplotlib", "qrcode")
+TOP = int(os.getenv("PROFIL_TOP", "25"))
+
+CODE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import main\n"
+    "print(f'TOTAL {time.perf_counter() - t:.3f}')\n"
+    f"print('LOURDES', ','.join(m for m in {LOURDES!r} if m in sys.modules))\n"
+)
+
+
+# ------------------------------------------
+# ⏱️ Import de main dans un processus neuf (python -X importtime)
+# ------------------------------------------
+def profiler() -> None:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODE],
+        cwd=RACINE, env=env, capture_output=True, text=True, check=True,
+    )
+
+    modules = []
+    for ligne in res.stderr.splitlines():
+        if not ligne.startswith("import time:") or "|" not in ligne:
+            continue
+        try:
+            _, cumul, nom = ligne.split("|")
+            modules.append((int(cumul), nom.rstrip()))
+        except ValueError:
+            continue  # en-tête
+
+    sortie = dict(l.split(" ", 1) for l in res.stdout.splitlines() if l.startswith(("TOTAL", "LOURDES")))
+    print(f"⏱️ Import de main : {float(sortie['TOTAL']) * 1000:.0f} ms")
+    print(f"📦 Bibliothèques lourdes chargées : {sortie.get('LOURDES') or 'aucune ✅'}")
+    print(f"\n🔝 {TOP} imports les plus coûteux (cumulé, ms) :")
+    for cumul, nom in sorted(modules, reverse=True)[:TOP]:
+        print(f"   {cumul / 1000:8.1f}  {nom}")
+
+
+if __name__ == "__main__":
+    profiler()
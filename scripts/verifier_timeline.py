@@ -0,0 +1,101 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# --- 🔧 Import du projet ---
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api.database as database
+import app.models as models
+from api.services.timeline import SOURCES, Timeline, decoder_curseur
+
+LIMITES = [1, 2, 7, 50]
+# Formats de date réellement présents dans les bases importées (ORM, imports SQL, ISO « T »)
+FORMATS = ["%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M"]
+
+
+# ------------------------------------------
+# ⚙️ Base SQLite temporaire (jamais test.db)
+# ------------------------------------------
+def preparer_base(chemin: str) -> int:
+    engine = create_engine(f"sqlite:///{chemin}")
+    database.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    random.seed(47)
+    debut = datetime(2026, 1, 1)
+
+    with Session() as db:
+        patient = models.Patient(nom="Frise", prenom="Verification")
+        db.add(patient)
+        db.commit()
+        pid = patient.id
+
+        # Beaucoup d'égalités de date, entre sources et au sein d'une même source
+        def date():
+            return debut + timedelta(minutes=random.randint(0, 120), microseconds=random.choice([0, 0, 250000]))
+
+        objets = []
+        for _ in range(40):
+            objets += [
+                models.CardiaqueData(patient_id=pid, frequence_cardiaque=80, created_at=date()),
+                models.Consultation(patient_id=pid, medecin_id=1, motif="Contrôle", date_consultation=date()),
+                models.Biologie(patient_id=pid, type_analyse="NFS", date_prelevement=date()),
+                models.SoinsInfirmier(patient_id=pid, type_soin="Pansement", date=date()),
+                models.Hospitalisation(patient_id=pid, medecin_id=1, service="Cardiologie", date_entree=date()),
+                models.Radiologie(patient_id=pid, type_examen="IRM", date_examen=date()),
+            ]
+        db.add_all(objets)
+        db.commit()
+
+    # Réécriture des dates dans des formats texte mélangés, et quelques NULL
+    with engine.begin() as conn:
+        for nom in ("cardiaque", "consultation", "biologie", "hospitalisation", "radiologie"):
+            source = SOURCES[nom]
+            table, colonne = source.model.__tablename__, source.date.key
+            for (id_,) in conn.execute(text(f"SELECT id FROM {table}")).fetchall():
+                valeur = None if random.random() < 0.1 else date().strftime(random.choice(FORMATS))
+                conn.execute(text(f"UPDATE {table} SET {colonne} = :v WHERE id = :id"), {"v": valeur, "id": id_})
+    return pid
+
+
+def parcourir(db, pid: int, limite: int, total: int) -> list:
+    """Suit les curseurs jusqu'au bout ; s'arrête si la frise dépasse le total (curseur qui boucle)."""
+    vus, curseur = [], None
+    while len(vus) <= total:
+        evenements, suivant = Timeline.page(db, pid, list(SOURCES), limite, decoder_curseur(curseur) if curseur else None)
+        vus += [(e["type"], e["id"]) for e in evenements]
+        if not suivant:
+            return vus
+        curseur = suivant
+    return vus
+
+
+def verifier_timeline() -> bool:
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "timeline.db")
+        pid = preparer_base(chemin)
+        db = sessionmaker(bind=create_engine(f"sqlite:///{chemin}"))()
+        try:
+            complet, suivant = Timeline.page(db, pid, list(SOURCES), 10 ** 6)
+            attendu = [(e["type"], e["id"]) for e in complet]
+            print(f"🕰️ Frise complète : {len(attendu)} événement(s)")
+
+            ok = suivant is None and len(attendu) == len(set(attendu))
+            for limite in LIMITES:
+                vus = parcourir(db, pid, limite, len(attendu))
+                identique = vus == attendu
+                ok = ok and identique
+                print(f"{'✅' if identique else '❌'} Pages de {limite} : {len(vus)} événement(s), "
+                      f"{len(vus) - len(set(vus))} doublon(s), {len(set(attendu) - set(vus))} manquant(s)")
+            return ok
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verifier_timeline() else 1)